@@ -0,0 +1,87 @@
+"""
+Effect of the audio conditioning stage on transcription time and output.
+
+Transcribes each recorded fixture twice, as recorded and after AudioConditioner
+(fed in 10 ms blocks like the audio callback does), and prints the inference time,
+the conditioning cost per block and both transcriptions.
+
+    uv run bench\\bench_conditioning.py recordings\\quiet.wav recordings\\noisy.wav --model large-v3 --device cuda
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from scipy.io.wavfile import read as read_wav
+from scipy.signal import resample_poly
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from faster_whisper import WhisperModel  # noqa: E402
+from audio_conditioner import AudioConditioner  # noqa: E402
+
+SAMPLE_RATE = 16000
+BLOCK_SIZE = 160
+
+
+def load_fixture(path):
+    rate, data = read_wav(str(path))
+    if np.issubdtype(data.dtype, np.integer):
+        data = data.astype(np.float32) / np.iinfo(data.dtype).max
+    data = data.astype(np.float32)
+    if data.ndim > 1:
+        data = data.mean(axis=1)
+    if rate != SAMPLE_RATE:
+        data = resample_poly(data, SAMPLE_RATE, rate).astype(np.float32)
+    return data
+
+
+def condition(audio):
+    conditioner = AudioConditioner(SAMPLE_RATE)
+    blocks = []
+    start = time.perf_counter()
+    for offset in range(0, len(audio), BLOCK_SIZE):
+        blocks.append(conditioner.process(audio[offset : offset + BLOCK_SIZE]))
+    blocks.append(conditioner.flush())
+    per_block = (time.perf_counter() - start) / max(1, len(audio) // BLOCK_SIZE)
+    return np.concatenate(blocks), per_block
+
+
+def transcribe(model, audio, beam_size):
+    start = time.perf_counter()
+    segments, info = model.transcribe(audio, beam_size=beam_size)
+    text = " ".join(segment.text.strip() for segment in segments)
+    return text, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("fixtures", nargs="+", type=Path, help="WAV recordings to transcribe")
+    parser.add_argument("--model", default="tiny")
+    parser.add_argument("--device", default="cpu")
+    parser.add_argument("--compute-type", default="int8")
+    parser.add_argument("--beam-size", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=3, help="Best of N inference times")
+    args = parser.parse_args()
+
+    model = WhisperModel(args.model, device=args.device, compute_type=args.compute_type)
+    # Warm up, the first call includes one-time initialization
+    transcribe(model, np.zeros(SAMPLE_RATE, dtype=np.float32), args.beam_size)
+    for path in args.fixtures:
+        raw = load_fixture(path)
+        conditioned, per_block = condition(raw)
+        results = {}
+        for name, audio in (("raw", raw), ("conditioned", conditioned)):
+            runs = [transcribe(model, audio, args.beam_size) for _ in range(args.repeat)]
+            results[name] = (runs[0][0], min(seconds for _, seconds in runs))
+        print(f"{path.name} ({len(raw) / SAMPLE_RATE:.1f}s, conditioning {per_block * 1e6:.0f} us per {BLOCK_SIZE / SAMPLE_RATE * 1000:.0f} ms block)")
+        for name, (text, seconds) in results.items():
+            print(f"  {name:>11}: {seconds:6.2f}s  {text}")
+        speedup = results["raw"][1] / results["conditioned"][1]
+        print(f"  {'speedup':>11}: {speedup:6.2f}x")
+
+
+if __name__ == "__main__":
+    main()
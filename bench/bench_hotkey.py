@@ -0,0 +1,103 @@
+"""
+Microbenchmark of the per-keystroke overhead of the keyboard listener callbacks.
+
+Replays a stream of ordinary typing through the old string based key handling and
+through normalize_key + HotkeyEngine, and prints the cost per key event.
+
+    uv run bench\\bench_hotkey.py
+"""
+
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from pynput import keyboard  # noqa: E402
+from hotkeys import HotkeyBinding, HotkeyEngine, normalize_key  # noqa: E402
+
+HOTKEY = {"ctrl", "shift", "space"}
+
+
+def legacy_get_key_string(key):
+    """The key handling used before the lookup table, kept for comparison."""
+    if hasattr(key, "name"):
+        key_str = str(key).lower()
+        key_map = {
+            "key.shift": "shift",
+            "key.shift_l": "shift",
+            "key.shift_r": "shift",
+            "key.ctrl": "ctrl",
+            "key.ctrl_l": "ctrl",
+            "key.ctrl_r": "ctrl",
+            "key.alt": "alt",
+            "key.alt_l": "alt",
+            "key.alt_r": "alt",
+        }
+        mapped_key = key_map.get(key_str)
+        if mapped_key:
+            return mapped_key
+        return key_str.replace("key.", "")
+    if hasattr(key, "vk") and key.vk is not None and ((65 <= key.vk <= 90) or (48 <= key.vk <= 57)):
+        return chr(key.vk).lower()
+    if hasattr(key, "char") and key.char:
+        if key.char.isprintable():
+            return key.char.lower()
+    return None
+
+
+def legacy_check_hotkey(pressed_keys, hotkey):
+    modifier_keys = {"ctrl", "shift", "alt"}
+    has_non_modifier = any(key not in modifier_keys for key in hotkey)
+    return len(pressed_keys) == len(hotkey) and pressed_keys == hotkey and has_non_modifier
+
+
+def typing_events():
+    """Press/release pairs for a sentence of typing with a few special keys."""
+    events = []
+    for char in "The quick brown fox jumps over the lazy dog 0123456789":
+        key = keyboard.Key.space if char == " " else keyboard.KeyCode(vk=ord(char.upper()), char=char)
+        events.append((True, key))
+        events.append((False, key))
+    for key in (keyboard.Key.shift_l, keyboard.Key.backspace, keyboard.Key.enter):
+        events.append((True, key))
+        events.append((False, key))
+    return events
+
+
+def run_legacy(events):
+    pressed_keys = set()
+    for is_press, key in events:
+        key_str = legacy_get_key_string(key)
+        if not key_str:
+            continue
+        if is_press:
+            pressed_keys.add(key_str)
+            legacy_check_hotkey(pressed_keys, HOTKEY)
+        else:
+            pressed_keys.discard(key_str)
+
+
+def run_engine(events, engine):
+    for is_press, key in events:
+        key_str = normalize_key(key)
+        if not key_str:
+            continue
+        if is_press:
+            engine.press(key_str)
+        else:
+            engine.release(key_str)
+
+
+def main():
+    events = typing_events()
+    engine = HotkeyEngine([HotkeyBinding(HOTKEY), HotkeyBinding({"ctrl", "alt", "g"}, mode="hold", profile="german")])
+    repeats = 2000
+    for name, func in (("legacy", lambda: run_legacy(events)), ("engine", lambda: run_engine(events, engine))):
+        best = min(timeit.repeat(func, number=repeats, repeat=5))
+        per_event_ns = best / (repeats * len(events)) * 1e9
+        print(f"{name:>8}: {per_event_ns:8.1f} ns per key event")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Wall-clock speedup of decoding long dictations as parallel chunks split at pauses.
+
+Transcribes each fixture once with a single transcribe call and once split with
+split_on_silence and decoded by ParallelDecoder, then prints both times, the speedup
+and how similar the two transcriptions are (word-level ratio, 1.0 = identical).
+Use multi-minute recordings, shorter ones are not split.
+
+    uv run bench\\bench_parallel.py recordings\\meeting.wav --model small --workers 4
+"""
+
+import argparse
+import difflib
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from scipy.io.wavfile import read as read_wav
+from scipy.signal import resample_poly
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from faster_whisper import WhisperModel  # noqa: E402
+from parallel_decode import ParallelDecoder, split_on_silence  # noqa: E402
+
+SAMPLE_RATE = 16000
+
+
+def load_fixture(path):
+    rate, data = read_wav(str(path))
+    if np.issubdtype(data.dtype, np.integer):
+        data = data.astype(np.float32) / np.iinfo(data.dtype).max
+    data = data.astype(np.float32)
+    if data.ndim > 1:
+        data = data.mean(axis=1)
+    if rate != SAMPLE_RATE:
+        data = resample_poly(data, SAMPLE_RATE, rate).astype(np.float32)
+    return data
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("fixtures", nargs="+", type=Path, help="WAV recordings, a few minutes long")
+    parser.add_argument("--model", default="small")
+    parser.add_argument("--device", default="cpu")
+    parser.add_argument("--compute-type", default="int8")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--beam-size", type=int, default=5)
+    args = parser.parse_args()
+
+    cpu_threads = max(1, (os.cpu_count() or 4) // args.workers) if args.device == "cpu" else 0
+    # The sequential run gets all cores, the parallel one shares them between its workers
+    sequential_model = WhisperModel(args.model, device=args.device, compute_type=args.compute_type)
+    parallel_model = WhisperModel(args.model, device=args.device, compute_type=args.compute_type, num_workers=args.workers, cpu_threads=cpu_threads)
+    decoder = ParallelDecoder(args.workers)
+    for path in args.fixtures:
+        audio = load_fixture(path)
+        start = time.perf_counter()
+        segments, _ = sequential_model.transcribe(audio, beam_size=args.beam_size)
+        sequential_text = " ".join(segment.text for segment in segments)
+        sequential_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        chunks = split_on_silence(audio, SAMPLE_RATE)
+        split_seconds = time.perf_counter() - start
+        texts, _ = decoder.transcribe(parallel_model, audio, chunks, beam_size=args.beam_size)
+        parallel_text = " ".join(text for text in texts if text)
+        parallel_seconds = time.perf_counter() - start
+
+        similarity = difflib.SequenceMatcher(None, sequential_text.split(), parallel_text.split()).ratio()
+        print(f"{path.name}: {len(audio) / SAMPLE_RATE:.0f}s audio, {len(chunks)} chunks (split in {split_seconds * 1000:.1f} ms)")
+        print(f"  sequential: {sequential_seconds:7.2f}s")
+        print(f"  parallel:   {parallel_seconds:7.2f}s ({args.workers} workers)")
+        print(f"  speedup:    {sequential_seconds / parallel_seconds:7.2f}x, word similarity {similarity:.3f}")
+    decoder.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Per-block CPU cost of the streaming resampler used by the audio callback.
+
+Feeds ten seconds of noise at common device rates and block sizes through
+StreamingResampler and prints the cost per block next to the block's duration,
+plus the level meter cost. Also checks that block-wise output matches resampling
+the whole signal in one call.
+
+    uv run bench\\bench_resampler.py
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from audio_input import LevelMeter, StreamingResampler  # noqa: E402
+
+CONFIGS = [(48000, 2), (48000, 1), (44100, 2), (44100, 1), (32000, 1), (16000, 1)]
+BLOCK_SIZES = [256, 512, 1024]
+
+
+def run(rate, channels, block_size, signal):
+    resampler = StreamingResampler(rate, 16000)
+    meter = LevelMeter()
+    resample_seconds = 0.0
+    meter_seconds = 0.0
+    blocks = 0
+    output = []
+    for start in range(0, len(signal), block_size):
+        block = signal[start : start + block_size]
+        t0 = time.perf_counter()
+        out = resampler.process(block)
+        t1 = time.perf_counter()
+        meter.update(out)
+        t2 = time.perf_counter()
+        resample_seconds += t1 - t0
+        meter_seconds += t2 - t1
+        blocks += 1
+        output.append(out)
+    output.append(resampler.flush())
+    return np.concatenate(output), resample_seconds / blocks, meter_seconds / blocks
+
+
+def main():
+    rng = np.random.default_rng(0)
+    print(f"{'rate':>6} {'ch':>2} {'block':>5} {'block ms':>9} {'resample us':>12} {'meter us':>9} {'cpu %':>6} {'max diff':>9}")
+    for rate, channels in CONFIGS:
+        signal = (rng.standard_normal((rate * 10, channels)) * 0.1).astype(np.float32)
+        whole, _, _ = run(rate, channels, len(signal), signal)
+        for block_size in BLOCK_SIZES:
+            output, per_block, per_meter = run(rate, channels, block_size, signal)
+            block_ms = block_size / rate * 1000
+            max_diff = float(np.max(np.abs(output - whole))) if len(output) == len(whole) else float("nan")
+            cpu = (per_block + per_meter) * 1000 / block_ms * 100
+            print(f"{rate:>6} {channels:>2} {block_size:>5} {block_ms:>9.2f} {per_block * 1e6:>12.1f} {per_meter * 1e6:>9.1f} {cpu:>6.2f} {max_diff:>9.2e}")
+        expected = -(-len(signal) * 16000 // rate)
+        print(f"{'':>6} output length {len(whole)}, expected {expected}")
+
+
+if __name__ == "__main__":
+    main()
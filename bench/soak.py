@@ -0,0 +1,362 @@
+"""
+Headless soak test: thousands of dictations through the real app, watching for leaks and latency drift.
+
+Runs HotkeyApp offscreen with a stub model and a fixture recording instead of the
+microphone, and replays hotkey press/release cycles (hold-to-talk) from a separate
+thread, like the keyboard listener does. Everything between the hotkey and the
+delivered text is the real code: recording callback, resampling, the transcription
+thread, decode guards, prompt building, history, tray updates and the config store.
+
+Every --sample-every cycles it records the process RSS, open handles (file descriptors
+on Linux/macOS), native and Python threads, files in the temp directory and the median
+latency from hotkey release to the finished transcription. After the run, the last
+window is compared with the first one (taken after --warmup cycles) and the script
+exits with status 1 if any of them drifted beyond its limit.
+
+The config, history and model folder live in a temporary directory, the user's setup is
+not touched. psutil is used for handles and native threads if it is installed.
+
+    uv run bench\\soak.py fixtures\\dictation_48k.wav --cycles 5000 --speed 20
+    uv run bench\\soak.py fixtures\\dictation_48k.wav --hours 8 --record-seconds 5
+"""
+
+import argparse
+import gc
+import json
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+from scipy.io.wavfile import read as read_wav
+
+# No tray or window has to be visible for the app to run
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+SOAK_DIR = Path(tempfile.mkdtemp(prefix="vibekey-soak-"))
+# Models folder, history and latency log of the app go to LOCALAPPDATA
+os.environ["LOCALAPPDATA"] = str(SOAK_DIR)
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from pynput import keyboard  # noqa: E402
+from PySide6.QtCore import QThread  # noqa: E402
+import main as app_main  # noqa: E402
+from main import HotkeyApp  # noqa: E402
+from output_sinks import OUTPUT_SINKS, OutputSink  # noqa: E402
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+HOTKEY = [keyboard.Key.ctrl, keyboard.Key.shift, keyboard.Key.space]
+
+
+class NullSink(OutputSink):
+    """Drops the text, nothing is pasted or typed while the soak test runs."""
+
+    name = "soak"
+    description = "Discarded (soak test)"
+
+    def finish(self, text):
+        pass
+
+    def replace(self, old, new):
+        return True
+
+
+OUTPUT_SINKS[NullSink.name] = NullSink
+
+
+class StubModel:
+    """Stands in for a WhisperModel: takes seconds_per_audio_second per second of audio and returns fixed text."""
+
+    def __init__(self, seconds_per_audio_second):
+        self.seconds_per_audio_second = seconds_per_audio_second
+        self.calls = 0
+
+    def transcribe(self, audio, language=None, **options):
+        self.calls += 1
+        duration = len(audio) / 16000
+        info = SimpleNamespace(language=language or "en", language_probability=1.0, duration=duration)
+
+        def segments():
+            time.sleep(duration * self.seconds_per_audio_second)
+            text = f" Soak test dictation number {self.calls}."
+            yield SimpleNamespace(id=0, seek=0, start=0.0, end=duration, text=text, tokens=list(range(8)), temperature=0.0)
+
+        return segments(), info
+
+
+class FixtureStream:
+    """Stands in for sounddevice.InputStream: feeds the fixture to the callback in 10 ms blocks, looping."""
+
+    def __init__(self, audio, samplerate, callback, speed):
+        self.audio = audio
+        self.samplerate = samplerate
+        self.callback = callback
+        self.speed = speed
+        self.position = 0
+        self._running = False
+        self._thread = None
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._feed, name="FixtureStream", daemon=True)
+        self._thread.start()
+
+    def _feed(self):
+        block = self.samplerate // 100
+        while self._running:
+            indices = (self.position + np.arange(block)) % len(self.audio)
+            self.position = (self.position + block) % len(self.audio)
+            self.callback(self.audio[indices], block, None, None)
+            time.sleep(0.01 / self.speed)
+
+    def stop(self):
+        self._running = False
+        if self._thread:
+            self._thread.join()
+
+    def close(self):
+        self._thread = None
+
+
+class SoakApp(HotkeyApp):
+    """HotkeyApp without the keyboard hook or a real model, see use_fixture for the microphone."""
+
+    def __init__(self, model):
+        self.stub_model = model
+        super().__init__()
+
+    def setup_listener(self):
+        # Key events are replayed by the driver thread
+        pass
+
+    def resolve_profile(self, name=None):
+        profile = super().resolve_profile(name)
+        profile["output_sink"] = NullSink.name
+        return profile
+
+    def load_whisper_model(self, *args, **kwargs):
+        self.on_model_loaded(self.stub_model)
+
+
+def use_fixture(fixture, fixture_rate, speed, config_path):
+    """Point the app at the soak config and replace the microphone by the fixture, for the whole process."""
+    app_main.get_config_path = lambda: config_path
+    app_main.resolve_input_device = lambda name: (None, fixture_rate, fixture.shape[1])
+    app_main.sd.InputStream = lambda samplerate, callback, **kwargs: FixtureStream(fixture, samplerate, callback, speed)
+
+
+def load_fixture(path):
+    """The fixture at its own rate and channel count, it plays the role of the microphone."""
+    rate, data = read_wav(str(path))
+    if np.issubdtype(data.dtype, np.integer):
+        data = data.astype(np.float32) / np.iinfo(data.dtype).max
+    data = data.astype(np.float32)
+    if data.ndim == 1:
+        data = data[:, np.newaxis]
+    return data, rate
+
+
+def write_config(path):
+    config = {
+        "hotkey": ["ctrl", "shift", "space"],
+        "hotkey_mode": "hold",
+        "model": "tiny",
+        "language": "en",
+        "device_mode": "cpu",
+        "auto_paste": False,
+        "sound_settings": {"start_record": False, "stop_record": False, "transcription_done": False, "transcription_empty": False},
+        "idle_unload": {"enabled": False, "minutes": 15, "mode": "unload"},
+        "history": {"enabled": True, "save_audio": False, "hotkey": None},
+    }
+    path.write_text(json.dumps(config, indent=2), encoding="utf-8")
+
+
+def rss_mb():
+    if psutil:
+        return psutil.Process().memory_info().rss / 2**20
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        pass
+    if os.name == "nt":
+        return None
+    import resource
+
+    # Peak instead of current RSS, still shows steady growth
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (2**20 if sys.platform == "darwin" else 2**10)
+
+
+def handle_count():
+    if psutil:
+        process = psutil.Process()
+        return process.num_handles() if os.name == "nt" else process.num_fds()
+    fd_dir = Path("/proc/self/fd")
+    return len(list(fd_dir.iterdir())) if fd_dir.exists() else None
+
+
+def native_thread_count():
+    return psutil.Process().num_threads() if psutil else None
+
+
+def temp_dir_count(temp_dir):
+    try:
+        return sum(1 for _ in Path(temp_dir).iterdir())
+    except OSError:
+        return None
+
+
+def take_sample(cycle, latencies, temp_dir):
+    return {
+        "cycle": cycle,
+        "time": time.time(),
+        "rss_mb": rss_mb(),
+        "handles": handle_count(),
+        "native_threads": native_thread_count(),
+        "python_threads": threading.active_count(),
+        "temp_files": temp_dir_count(temp_dir),
+        "latency_p50_ms": statistics.median(latencies) * 1000 if latencies else None,
+    }
+
+
+def check_drift(first, last, args):
+    """Descriptions of every measurement that drifted beyond its limit."""
+    limits = {
+        "rss_mb": args.max_rss_growth_mb,
+        "handles": args.max_handle_growth,
+        "native_threads": args.max_thread_growth,
+        "python_threads": args.max_thread_growth,
+        "temp_files": args.max_temp_growth,
+    }
+    failures = []
+    for name, limit in limits.items():
+        if first[name] is None or last[name] is None:
+            continue
+        if last[name] - first[name] > limit:
+            failures.append(f"{name} grew from {first[name]:.1f} to {last[name]:.1f} (limit +{limit})")
+    if first["latency_p50_ms"] and last["latency_p50_ms"] and last["latency_p50_ms"] > first["latency_p50_ms"] * args.max_latency_drift:
+        failures.append(f"median latency drifted from {first['latency_p50_ms']:.1f} ms to {last['latency_p50_ms']:.1f} ms (limit x{args.max_latency_drift})")
+    return failures
+
+
+def drive(app, args, result):
+    """Replay hotkey cycles like the keyboard listener thread would, then quit the app."""
+    done = threading.Event()
+    app.transcribing_thread.transcribed.connect(lambda text: done.set())
+    temp_dir = tempfile.gettempdir()
+    latencies = []
+    samples = []
+    start = time.time()
+    cycle = 0
+    try:
+        while cycle < args.cycles and time.time() - start < args.hours * 3600:
+            cycle += 1
+            done.clear()
+            for key in HOTKEY:
+                app.on_press(key)
+            time.sleep(args.record_seconds / args.speed)
+            released = time.perf_counter()
+            for key in reversed(HOTKEY):
+                app.on_release(key)
+            if not done.wait(timeout=60):
+                result["failures"].append(f"cycle {cycle}: no transcription within 60 s")
+                break
+            latencies.append(time.perf_counter() - released)
+            # The next hotkey press is ignored until the tray is back to idle
+            while app.transcribing or app.is_recording:
+                time.sleep(0.001)
+            if cycle == args.warmup or (cycle > args.warmup and cycle % args.sample_every == 0):
+                samples.append(take_sample(cycle, latencies[-args.sample_every :], temp_dir))
+                sample = samples[-1]
+                print(
+                    f"[soak] cycle {cycle}: rss {sample['rss_mb']:.1f} MB, handles {sample['handles']}, "
+                    f"threads {sample['native_threads']}/{sample['python_threads']}, temp files {sample['temp_files']}, "
+                    f"latency p50 {sample['latency_p50_ms']:.1f} ms",
+                    flush=True,
+                )
+        if len(samples) >= 2:
+            result["failures"].extend(check_drift(samples[0], samples[-1], args))
+        result["samples"] = samples
+        result["cycles"] = cycle
+    finally:
+        app.gui_invoker.invoke.emit(app.quit_application)
+
+
+def shut_down(app, threads):
+    """
+    Stop the app's threads and delete its Qt objects while the interpreter is still intact.
+
+    Left to interpreter shutdown, the QApplication and the objects holding Python callbacks
+    are destroyed in arbitrary order, which can abort with "Fatal Python error: bool_dealloc".
+    """
+    if app.listener:
+        app.listener.stop()
+        app.listener.join()
+    # quit_application lets go of the transcription thread without waiting for it
+    threads = threads + [value for value in vars(app).values() if isinstance(value, QThread)] + list(app.profile_loaders.values())
+    for thread in threads:
+        if thread is not None:
+            thread.wait(10000)
+    qt_app = app.app
+    vars(app).clear()
+    gc.collect()
+    qt_app.shutdown()
+    del qt_app
+    gc.collect()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("fixture", type=Path, help="WAV recording, played at its own rate and channel count like a microphone")
+    parser.add_argument("--cycles", type=int, default=2000)
+    parser.add_argument("--hours", type=float, default=24.0, help="stop after this long, even if not all cycles ran")
+    parser.add_argument("--record-seconds", type=float, default=3.0, help="length of each dictation")
+    parser.add_argument("--speed", type=float, default=10.0, help="feed the fixture this many times faster than real time")
+    parser.add_argument("--model-rtf", type=float, default=0.05, help="seconds the stub model takes per second of audio")
+    parser.add_argument("--warmup", type=int, default=50, help="cycles before the baseline sample")
+    parser.add_argument("--sample-every", type=int, default=100)
+    parser.add_argument("--max-rss-growth-mb", type=float, default=50.0)
+    parser.add_argument("--max-handle-growth", type=int, default=20)
+    parser.add_argument("--max-thread-growth", type=int, default=2)
+    parser.add_argument("--max-temp-growth", type=int, default=5)
+    parser.add_argument("--max-latency-drift", type=float, default=1.5, help="allowed ratio of the last to the first median latency")
+    parser.add_argument("--report", type=Path, help="write all samples and failures as JSON")
+    args = parser.parse_args()
+
+    fixture, fixture_rate = load_fixture(args.fixture)
+    config_path = SOAK_DIR / "config.json"
+    write_config(config_path)
+    use_fixture(fixture, fixture_rate, args.speed, config_path)
+    app = SoakApp(StubModel(args.model_rtf))
+    # Without listening on the single-instance socket, a running instance of the app is left alone
+    app.start()
+    result = {"failures": [], "samples": [], "cycles": 0}
+    driver = threading.Thread(target=drive, args=(app, args, result), name="SoakDriver", daemon=True)
+    driver.start()
+    transcriber = app.transcribing_thread
+    app.run()
+    driver.join()
+    shut_down(app, [transcriber])
+    del app, transcriber
+
+    if args.report:
+        args.report.write_text(json.dumps(result, indent=2), encoding="utf-8")
+    print(f"[soak] {result['cycles']} cycles, data in {SOAK_DIR}")
+    if result["failures"]:
+        for failure in result["failures"]:
+            print(f"[soak] FAIL: {failure}")
+        sys.exit(1)
+    print("[soak] PASS: no drift beyond the limits")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+from typing import Optional
+import numpy as np
+from scipy.signal import butter, sosfilt, sosfilt_zi
+
+
+class AudioConditioner:
+    """
+    Cleans up recorded audio block by block, before it reaches the model.
+
+    Three optional stages, all carrying their state from one block to the next so the
+    work is spread over the recording and stopping only flushes a few milliseconds:
+
+    - A high-pass filter that removes rumble, hum and DC offset
+    - A spectral noise gate that attenuates frequency bins staying near the estimated
+      noise floor (overlap-add over 32 ms frames, the floor follows the minimum of the smoothed
+      spectrum, corrected for the minimum lying below the average noise power)
+    - Automatic gain control that brings speech to a target level, so quiet microphones
+      don't look like silence to the model. Only blocks clearly above the background level
+      adapt the gain, so a recording of just noise is left as it is.
+
+    Attributes:
+        sample_rate (int): Sample rate of the blocks
+        high_pass_hz (Optional[float]): Cutoff of the high-pass filter, None to disable
+        noise_reduction_db (Optional[float]): Maximum attenuation of noise bins, None to disable the gate
+        target_dbfs (Optional[float]): Speech level the gain control aims for, None to disable it
+        max_gain_db (float): Upper limit of the gain control
+    """
+
+    FRAME_SIZE: int = 512
+    HOP_SIZE: int = 256
+    # Smoothing of the spectrum the noise floor is tracked on, and how far its minimum lies below the average
+    NOISE_SMOOTHING: float = 0.9
+    NOISE_BIAS: float = 2.0
+    # Frames averaged for the first estimate, before the minimum tracking takes over (about 150 ms)
+    NOISE_INIT_FRAMES: int = 10
+    # Blocks this far above the background level count as speech for the gain control
+    SPEECH_MARGIN_DB: float = 10.0
+    # Samples below this (-100 dBFS) count as muted, only frames and blocks with at least AUDIBLE_FRACTION
+    # samples above it update the noise floor and the levels of the gain control
+    MUTED_LEVEL: float = 1e-5
+    AUDIBLE_FRACTION: float = 0.9
+
+    def __init__(
+        self,
+        sample_rate: int = 16000,
+        high_pass_hz: Optional[float] = 80.0,
+        noise_reduction_db: Optional[float] = 12.0,
+        target_dbfs: Optional[float] = -20.0,
+        max_gain_db: float = 20.0,
+    ) -> None:
+        self.sample_rate: int = sample_rate
+        self.high_pass_hz: Optional[float] = high_pass_hz
+        self.noise_reduction_db: Optional[float] = noise_reduction_db
+        self.target_dbfs: Optional[float] = target_dbfs
+        self.max_gain_db: float = max_gain_db
+        if high_pass_hz:
+            self._sos: np.ndarray = butter(2, high_pass_hz, btype="highpass", fs=sample_rate, output="sos")
+            self._sos_zi_template: np.ndarray = sosfilt_zi(self._sos)
+        # Square root Hann window for analysis and synthesis, sums to one at 50% overlap
+        self._window: np.ndarray = np.sqrt(np.hanning(self.FRAME_SIZE + 1)[:-1]).astype(np.float32)
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget all state, call before every recording."""
+        if self.high_pass_hz:
+            self._sos_zi: np.ndarray = self._sos_zi_template * 0.0
+        self._pending: np.ndarray = np.zeros(self.FRAME_SIZE - self.HOP_SIZE, dtype=np.float32)
+        self._overlap: np.ndarray = np.zeros(self.FRAME_SIZE - self.HOP_SIZE, dtype=np.float32)
+        self._noise_power: Optional[np.ndarray] = None
+        self._noise_frames: int = 0
+        self._gains: np.ndarray = np.ones(self.FRAME_SIZE // 2 + 1, dtype=np.float32)
+        self._speech_level: Optional[float] = None
+        self._background_level: Optional[float] = None
+        self._gain: float = 1.0
+        # The gate's output starts one frame minus one hop late, those first samples are dropped
+        self._gate_delay: int = self.FRAME_SIZE - self.HOP_SIZE
+        self._samples_in: int = 0
+        self._samples_out: int = 0
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        """Condition one mono float32 block. With the noise gate enabled, up to one frame of output is held back."""
+        if not len(block):
+            return block
+        if self.high_pass_hz:
+            block, self._sos_zi = sosfilt(self._sos, block, zi=self._sos_zi)
+            block = block.astype(np.float32, copy=False)
+        if self.noise_reduction_db:
+            self._samples_in += len(block)
+            block = self._gate(block)
+        if self.target_dbfs is not None:
+            block = self._apply_gain(block)
+        return block
+
+    def flush(self) -> np.ndarray:
+        """Output still held back by the noise gate, call once at the end. All output together is as long as the input."""
+        if not self.noise_reduction_db:
+            return np.zeros(0, dtype=np.float32)
+        # A frame of silence pushes the rest of the input out, the silence itself is cut off
+        tail: np.ndarray = self._gate(np.zeros(self.FRAME_SIZE, dtype=np.float32))
+        tail = tail[: max(0, self._samples_in - self._samples_out + len(tail))]
+        return self._apply_gain(tail) if self.target_dbfs is not None else tail
+
+    def _gate(self, block: np.ndarray) -> np.ndarray:
+        """The noise gate with its delay removed, output sample i belongs to input sample i."""
+        output: np.ndarray = self._noise_gate(block)
+        if self._gate_delay:
+            skipped: int = min(self._gate_delay, len(output))
+            self._gate_delay -= skipped
+            output = output[skipped:]
+        self._samples_out += len(output)
+        return output
+
+    def _noise_gate(self, block: np.ndarray) -> np.ndarray:
+        buffer: np.ndarray = np.concatenate((self._pending, block))
+        frame_count: int = (len(buffer) - self.FRAME_SIZE) // self.HOP_SIZE + 1
+        if frame_count <= 0:
+            self._pending = buffer
+            return np.zeros(0, dtype=np.float32)
+        # All complete frames of the block at once
+        starts: np.ndarray = np.arange(frame_count) * self.HOP_SIZE
+        frames: np.ndarray = buffer[starts[:, np.newaxis] + np.arange(self.FRAME_SIZE)]
+        audible: np.ndarray = np.count_nonzero(np.abs(frames) > self.MUTED_LEVEL, axis=1) >= self.AUDIBLE_FRACTION * self.FRAME_SIZE
+        frames = frames * self._window
+        spectrum: np.ndarray = np.fft.rfft(frames, axis=1)
+        power: np.ndarray = spectrum.real**2 + spectrum.imag**2
+        gains: np.ndarray = np.ones_like(power)
+        floor_power: float = 10 ** (-self.noise_reduction_db / 10)
+        for i in range(frame_count):
+            # Muted frames (while a sound cue plays) say nothing about the noise, they keep the previous gains
+            if not audible[i]:
+                gains[i] = self._gains
+                continue
+            self._update_noise_floor(power[i])
+            # Spectral subtraction, limited to the configured reduction. Gains open fast and close smoothly,
+            # a single random peak of the noise only opens a bin part of the way.
+            frame_gains: np.ndarray = np.sqrt(np.clip(1.0 - 2.0 * self._noise_power / (power[i] + 1e-12), floor_power, 1.0))
+            rate: np.ndarray = np.where(frame_gains > self._gains, 0.5, 0.3)
+            self._gains = self._gains + rate * (frame_gains - self._gains)
+            gains[i] = self._gains
+        frames = np.fft.irfft(spectrum * gains, n=self.FRAME_SIZE, axis=1).astype(np.float32) * self._window
+        # Overlap-add, the second half of the last frame is completed by the next block
+        output: np.ndarray = np.zeros(frame_count * self.HOP_SIZE + self.FRAME_SIZE - self.HOP_SIZE, dtype=np.float32)
+        output[: len(self._overlap)] = self._overlap
+        for i in range(frame_count):
+            output[i * self.HOP_SIZE : i * self.HOP_SIZE + self.FRAME_SIZE] += frames[i]
+        self._overlap = output[frame_count * self.HOP_SIZE :].copy()
+        self._pending = buffer[frame_count * self.HOP_SIZE :]
+        return output[: frame_count * self.HOP_SIZE]
+
+    def _update_noise_floor(self, power: np.ndarray) -> None:
+        # Minimum tracking of the smoothed power per bin: speech pauses pull the floor down right away,
+        # it creeps up (doubling in about five seconds) so a louder background is learned as well.
+        # The minimum of a fluctuating spectrum lies well below its average, NOISE_BIAS makes up for that.
+        self._noise_frames += 1
+        if self._noise_frames <= self.NOISE_INIT_FRAMES:
+            # Start from the average of the first frames, the minimum of a single frame is far too low
+            # and would take many seconds to creep up
+            if self._noise_power is None:
+                self._smoothed_power: np.ndarray = power.copy()
+                self._noise_power = power.copy()
+            else:
+                self._smoothed_power = self.NOISE_SMOOTHING * self._smoothed_power + (1 - self.NOISE_SMOOTHING) * power
+                self._noise_power += (power - self._noise_power) / self._noise_frames
+            return
+        self._smoothed_power = self.NOISE_SMOOTHING * self._smoothed_power + (1 - self.NOISE_SMOOTHING) * power
+        self._noise_power = np.minimum(self._noise_power * 1.002, self.NOISE_BIAS * self._smoothed_power)
+
+    def _apply_gain(self, block: np.ndarray) -> np.ndarray:
+        if not len(block):
+            return block
+        # Samples muted while a sound cue played are far below any microphone's noise and say nothing about
+        # the levels. Partly muted blocks are skipped, otherwise they would drag the background level down
+        # until the noise after the cue counted as speech.
+        audible: np.ndarray = block[np.abs(block) > self.MUTED_LEVEL]
+        if len(audible) >= self.AUDIBLE_FRACTION * len(block):
+            rms_db: float = 10 * np.log10(float(np.dot(audible, audible)) / len(audible) + 1e-12)
+            # Level of the background, following quiet blocks right away and rising by 3 dB per second otherwise
+            rise_db: float = 3.0 * len(block) / self.sample_rate
+            if self._background_level is None:
+                self._background_level = rms_db
+            else:
+                self._background_level = min(rms_db, self._background_level + rise_db)
+            # Only blocks well above the background (and above digital silence) count as speech
+            if rms_db > max(-55.0, self._background_level + self.SPEECH_MARGIN_DB):
+                if self._speech_level is None:
+                    self._speech_level = rms_db
+                else:
+                    # Fast attack, slow release
+                    rate: float = 0.5 if rms_db > self._speech_level else 0.05
+                    self._speech_level += rate * (rms_db - self._speech_level)
+        if self._speech_level is None:
+            return block
+        gain_db: float = min(self.max_gain_db, self.target_dbfs - self._speech_level)
+        target_gain: float = 10 ** (gain_db / 20)
+        # Ramp across the block instead of jumping, and never clip
+        gains: np.ndarray = np.linspace(self._gain, target_gain, len(block), dtype=np.float32)
+        self._gain = target_gain
+        return np.clip(block * gains, -1.0, 1.0)
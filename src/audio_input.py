@@ -0,0 +1,145 @@
+from typing import Any, Dict, List, Optional, Tuple
+from math import gcd
+import time
+import numpy as np
+import sounddevice as sd
+from scipy.signal import firwin
+
+
+def list_input_devices() -> List[str]:
+    """Names of the devices that can record, without duplicates from multiple host APIs."""
+    names: List[str] = []
+    for device in sd.query_devices():
+        if device["max_input_channels"] > 0 and device["name"] not in names:
+            names.append(device["name"])
+    return names
+
+
+def resolve_input_device(name: Optional[str]) -> Tuple[Optional[int], int, int]:
+    """
+    Device index, native sample rate and channel count to record from.
+
+    `name` is matched against the device names, None (or a device that is gone) means
+    the system default input. At most two channels are opened, they are mixed down anyway.
+    """
+    index: Optional[int] = None
+    if name:
+        for i, device in enumerate(sd.query_devices()):
+            if device["max_input_channels"] > 0 and device["name"] == name:
+                index = i
+                break
+        else:
+            print(f"Input device '{name}' not found, using the default input")
+    info: Dict[str, Any] = sd.query_devices(index, "input")
+    return index, int(info["default_samplerate"]), min(int(info["max_input_channels"]), 2)
+
+
+def capture_time(time_info: Any, frames: int, samplerate: int) -> float:
+    """When the first frame of a block passed to an input callback was captured, in time.monotonic()."""
+    now: float = time.monotonic()
+    age: float = time_info.currentTime - time_info.inputBufferAdcTime if time_info is not None else -1.0
+    if not 0.0 <= age < 1.0:
+        # Host APIs without timestamps report 0, the block was complete just now
+        age = frames / samplerate
+    return now - age
+
+
+class StreamingResampler:
+    """
+    Mixes down and resamples audio blocks to mono at a fixed rate as they are recorded.
+
+    A polyphase FIR resampler that keeps the tail of the previous block, so consecutive
+    blocks give the same result as resampling the whole recording at once. Each output
+    sample is the dot product of one filter phase with the input samples it covers, so the
+    work per block is proportional to the output length and done inside the audio callback.
+
+    Attributes:
+        in_rate (int): Sample rate of the recorded blocks
+        out_rate (int): Sample rate of the output
+        up (int): Interpolation factor of the rational ratio out_rate / in_rate
+        down (int): Decimation factor of the rational ratio out_rate / in_rate
+    """
+
+    def __init__(self, in_rate: int, out_rate: int = 16000, taps_per_phase: Optional[int] = None) -> None:
+        self.in_rate: int = in_rate
+        self.out_rate: int = out_rate
+        divisor: int = gcd(in_rate, out_rate)
+        self.up: int = out_rate // divisor
+        self.down: int = in_rate // divisor
+        self.passthrough: bool = self.up == self.down
+        if taps_per_phase is None:
+            # Longer filters for stronger decimation, which needs a relatively narrower transition band
+            taps_per_phase = 16 * max(2, -(-self.down // self.up))
+        # Low-pass at the lower of both Nyquist frequencies, on the upsampled signal
+        taps_count: int = taps_per_phase * self.up
+        cutoff: float = 1.0 / max(self.up, self.down)
+        taps: np.ndarray = firwin(taps_count, cutoff * 0.95, window=("kaiser", 8.0)) * self.up
+        # phases[p, j] is the tap applied to input sample (t // up - j) for upsampled time t with t % up == p
+        self.phases: np.ndarray = np.zeros((self.up, taps_per_phase), dtype=np.float32)
+        for phase in range(self.up):
+            phase_taps: np.ndarray = taps[phase :: self.up]
+            self.phases[phase, : len(phase_taps)] = phase_taps
+        self.taps_per_phase: int = taps_per_phase
+        # Start half the filter late, so output sample 0 lines up with input sample 0
+        self._delay: int = (taps_count - 1) // 2
+        self._history: np.ndarray = np.zeros(taps_per_phase - 1, dtype=np.float32)
+        self._consumed: int = 0
+        self._produced: int = 0
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        """Resample one recorded block of shape (frames, channels) or (frames,), returns mono float32."""
+        mono: np.ndarray = block.mean(axis=1, dtype=np.float32) if block.ndim > 1 else block.astype(np.float32, copy=False)
+        if self.passthrough:
+            return mono.copy()
+        return self._resample(mono)
+
+    def flush(self) -> np.ndarray:
+        """Output still held back by the filter delay, call once at the end of the recording."""
+        if self.passthrough:
+            return np.zeros(0, dtype=np.float32)
+        expected: int = -(-self._consumed * self.up // self.down)
+        consumed: int = self._consumed
+        output: np.ndarray = self._resample(np.zeros(self.taps_per_phase, dtype=np.float32))
+        # The padding itself is not part of the recording
+        self._consumed = consumed
+        return output[: max(0, expected - (self._produced - len(output)))]
+
+    def _resample(self, mono: np.ndarray) -> np.ndarray:
+        buffer: np.ndarray = np.concatenate((self._history, mono))
+        # Absolute index of buffer[0]
+        buffer_start: int = self._consumed - len(self._history)
+        self._consumed += len(mono)
+        # Upsampled times of the outputs whose newest input sample is already available
+        first_time: int = self._produced * self.down + self._delay
+        last_input: int = self._consumed - 1
+        count: int = max(0, ((last_input + 1) * self.up - 1 - first_time) // self.down + 1)
+        times: np.ndarray = first_time + np.arange(count) * self.down
+        newest: np.ndarray = times // self.up - buffer_start
+        # Gather the inputs of every output sample, newest first, and apply its filter phase
+        indices: np.ndarray = newest[:, np.newaxis] - np.arange(self.taps_per_phase)
+        frames: np.ndarray = buffer[np.clip(indices, 0, None)]
+        frames[indices < 0] = 0.0
+        output: np.ndarray = np.einsum("ij,ij->i", frames, self.phases[times % self.up])
+        self._produced += count
+        self._history = buffer[len(buffer) - (self.taps_per_phase - 1) :]
+        return output.astype(np.float32, copy=False)
+
+
+class LevelMeter:
+    """RMS level of the most recent audio block, in dBFS, cheap enough to update from the audio callback."""
+
+    def __init__(self, floor_db: float = -60.0) -> None:
+        self.floor_db: float = floor_db
+        self.level_db: float = floor_db
+
+    def update(self, block: np.ndarray) -> None:
+        if len(block):
+            power: float = float(np.dot(block, block)) / len(block)
+            self.level_db = max(self.floor_db, 10.0 * np.log10(power + 1e-12))
+
+    def reset(self) -> None:
+        self.level_db = self.floor_db
+
+    def fraction(self) -> float:
+        """Level between the floor (0.0) and full scale (1.0)."""
+        return 1.0 - self.level_db / self.floor_db
@@ -0,0 +1,365 @@
+from typing import Any, ClassVar, Dict, List, Optional, Set, Tuple
+from pathlib import Path
+import copy
+import json
+import os
+import queue
+import re
+import threading
+from PySide6.QtCore import QFileSystemWatcher, QObject, QTimer, Signal
+
+DEFAULT_CONFIG: Dict[str, Any] = {
+    "sound_settings": {
+        "start_record": True,
+        "stop_record": True,
+        "transcription_done": True,
+        "transcription_empty": True,
+    },
+    "auto_paste": True,
+    "sound_volume": 1.0,
+    # Record silence for exactly as long as a cue is heard, so the microphone doesn't pick it up
+    "mute_input_during_cues": True,
+    "available_languages": [
+        {"code": "de", "name": "German"},
+        {"code": "en", "name": "English"},
+        {"code": "fr", "name": "French"},
+    ],
+    "language": "en",
+    "model": "tiny",
+    "device_mode": "cuda",
+    "cuda_device": 0,
+    "available_models": [
+        "tiny",
+        "tiny.en",
+        "base",
+        "base.en",
+        "small",
+        "small.en",
+        "distil-small.en",
+        "medium",
+        "medium.en",
+        "distil-medium.en",
+        "large-v1",
+        "large-v2",
+        "large-v3",
+        "large",
+        "distil-large-v2",
+        "distil-large-v3",
+        "large-v3-turbo",
+        "turbo",
+    ],
+    "hotkey": {"ctrl", "shift", "space"},
+    "initial_prompt": "The following is a transcription of spoken {language}:",
+    # Used with "language": "auto". Detection runs on the first seconds of a recording and is
+    # skipped while at least skip_confidence of the last recordings were in the same language.
+    "language_detection": {"window_seconds": 5.0, "history": 20, "skip_confidence": 0.9, "verify_every": 10},
+    # Context appended to initial_prompt: terms from the vocabulary file and the last transcriptions
+    "prompt_context": {"vocabulary_file": "vocabulary.txt", "recent_transcripts": 3, "max_tokens": 200},
+    # "toggle" starts/stops recording on each press of the hotkey, "hold" records while it is held down
+    "hotkey_mode": "toggle",
+    # Name of the microphone to record from, null for the system default
+    "input_device": None,
+    # Clean up the recording before transcription. Any stage can be disabled with null.
+    "audio_processing": {"enabled": False, "high_pass_hz": 80.0, "noise_reduction_db": 12.0, "target_dbfs": -20.0, "max_gain_db": 20.0},
+    # Extra hotkeys, e.g. {"keys": ["ctrl", "alt", "g"], "mode": "hold", "profile": "german"}
+    "bindings": [],
+    # Named settings used by bindings, any of: model, language, initial_prompt, beam_size, output_sink
+    "profiles": {},
+    # Searchable transcript history, "save_audio" also keeps the recordings, "hotkey" opens the picker
+    "history": {"enabled": True, "save_audio": False, "hotkey": ["ctrl", "alt", "h"]},
+    # Release the model after minutes without a hotkey press, off by default.
+    # mode: "unload" frees the model, "cpu" keeps an int8 copy in RAM, "int8" keeps it on the device with a smaller compute type
+    "idle_unload": {"enabled": False, "minutes": 15, "mode": "unload"},
+    # Deliver a draft from a small model right away, then replace it with the result of the main model.
+    # replace: "if_different" (ignoring whitespace and case), "always" (any change) or "never" (keep the draft)
+    "two_pass": {"enabled": False, "draft_model": "tiny", "replace": "if_different"},
+    # Split recordings longer than min_seconds at pauses and decode the pieces on num_workers threads at once.
+    # Changes apply when the model is loaded the next time.
+    "parallel_decoding": {"enabled": False, "num_workers": 4, "min_seconds": 60},
+    # Cap the tokens per window relative to the audio length, stop on repeated phrases or segments and limit temperature retries
+    "decode_guards": {"enabled": True, "tokens_per_second": 8.0, "max_fallbacks": 2, "min_repeats": 4},
+    # Keep the percentile of the latency of clips up to max_clip_seconds below target_seconds: switch to beam size 1,
+    # then to the warm fallback_model (null to skip that step) while it is missed, back once below headroom * target
+    "latency_slo": {"enabled": False, "target_seconds": 1.5, "percentile": 95, "max_clip_seconds": 30, "headroom": 0.5, "fallback_model": "base"},
+    # Time the stages of each dictation and sample the stacks of all threads, see "Performance Timeline" in the tray
+    "profiling": {"enabled": False, "sample_interval_ms": 5, "keep_dictations": 10},
+}
+
+# Expected JSON types of the top-level keys. Values of the wrong type are replaced by the default.
+# The settings inside the sections of DEFAULT_CONFIG are checked against their defaults, see validate_config.
+CONFIG_SCHEMA: Dict[str, Tuple[type, ...]] = {
+    "sound_settings": (dict,),
+    "auto_paste": (bool,),
+    "sound_volume": (int, float),
+    "mute_input_during_cues": (bool,),
+    "available_languages": (list,),
+    "language": (str,),
+    "model": (str,),
+    "device_mode": (str,),
+    "cuda_device": (int,),
+    "available_models": (list,),
+    "hotkey": (list, set),
+    "initial_prompt": (str,),
+    "language_detection": (dict,),
+    "prompt_context": (dict,),
+    "hotkey_mode": (str,),
+    "input_device": (str, type(None)),
+    "audio_processing": (dict,),
+    "bindings": (list,),
+    "profiles": (dict,),
+    "history": (dict,),
+    "idle_unload": (dict,),
+    "profiling": (dict,),
+    "two_pass": (dict,),
+    "parallel_decoding": (dict,),
+    "decode_guards": (dict,),
+    "latency_slo": (dict,),
+    "output_sink": (str,),
+}
+
+CONFIG_CHOICES: Dict[str, Set[str]] = {
+    "device_mode": {"cuda", "cpu"},
+    "hotkey_mode": {"toggle", "hold"},
+    "output_sink": {"clipboard", "paste", "paste_restore", "type", "stream"},
+}
+
+
+# Settings inside the nested sections are checked against the type of their default. These may also be null.
+NULLABLE_SETTINGS: Set[Tuple[str, str]] = {
+    ("audio_processing", "high_pass_hz"),
+    ("audio_processing", "noise_reduction_db"),
+    ("audio_processing", "target_dbfs"),
+    ("history", "hotkey"),
+    ("latency_slo", "fallback_model"),
+    ("prompt_context", "vocabulary_file"),
+}
+
+# Whole number defaults that aren't counts, fractions are fine for them
+FRACTIONAL_SETTINGS: Set[Tuple[str, str]] = {
+    ("idle_unload", "minutes"),
+    ("latency_slo", "percentile"),
+    ("latency_slo", "max_clip_seconds"),
+    ("parallel_decoding", "min_seconds"),
+}
+
+SETTING_CHOICES: Dict[Tuple[str, str], Set[str]] = {
+    ("idle_unload", "mode"): {"unload", "cpu", "int8"},
+    ("two_pass", "replace"): {"if_different", "always", "never"},
+}
+
+
+def _setting_types(default: Any, fractional: bool = False) -> Tuple[type, ...]:
+    # A fractional default takes whole numbers too, a whole number default (a count) only takes whole numbers
+    if isinstance(default, bool):
+        return (bool,)
+    if isinstance(default, float) or (isinstance(default, int) and fractional):
+        return (int, float)
+    return (type(default),)
+
+
+def get_config_path() -> Path:
+    """config.json in the project directory, independent of the working directory the app was started from."""
+    return Path(__file__).resolve().parent.parent / "config.json"
+
+
+def validate_config(config: Dict[str, Any]) -> List[str]:
+    """Replace invalid values by their defaults in place, returns a description of every problem found."""
+    problems: List[str] = []
+    for key, types in CONFIG_SCHEMA.items():
+        if key not in config:
+            continue
+        value: Any = config[key]
+        # bool is an int in Python, but true is not a valid volume or device id
+        if not isinstance(value, types) or (isinstance(value, bool) and bool not in types):
+            problems.append(f"'{key}' should be {' or '.join(t.__name__ for t in types)}, got {json.dumps(value, default=str)}")
+        elif key in CONFIG_CHOICES and value not in CONFIG_CHOICES[key]:
+            problems.append(f"'{key}' should be one of {', '.join(sorted(CONFIG_CHOICES[key]))}, got {json.dumps(value)}")
+        else:
+            continue
+        if key in DEFAULT_CONFIG:
+            config[key] = copy.deepcopy(DEFAULT_CONFIG[key])
+        else:
+            del config[key]
+    for key, defaults in DEFAULT_CONFIG.items():
+        if isinstance(defaults, dict) and isinstance(config.get(key), dict):
+            problems.extend(_validate_section(key, config[key], defaults))
+    if isinstance(config.get("sound_volume"), (int, float)) and not 0.0 <= config["sound_volume"] <= 1.0:
+        problems.append(f"'sound_volume' should be between 0.0 and 1.0, got {config['sound_volume']}")
+        config["sound_volume"] = min(1.0, max(0.0, config["sound_volume"]))
+    return problems
+
+
+def _validate_section(key: str, section: Dict[str, Any], defaults: Dict[str, Any]) -> List[str]:
+    """Like validate_config for one nested section, missing settings are filled in from the defaults."""
+    problems: List[str] = []
+    for name, default in defaults.items():
+        if name not in section:
+            section[name] = copy.deepcopy(default)
+            continue
+        value: Any = section[name]
+        if value is None and (key, name) in NULLABLE_SETTINGS:
+            continue
+        types: Tuple[type, ...] = _setting_types(default, (key, name) in FRACTIONAL_SETTINGS)
+        choices: Optional[Set[str]] = SETTING_CHOICES.get((key, name))
+        if not isinstance(value, types) or (isinstance(value, bool) and bool not in types):
+            problems.append(f"'{key}.{name}' should be {' or '.join(t.__name__ for t in types)}, got {json.dumps(value, default=str)}")
+        elif choices and value not in choices:
+            problems.append(f"'{key}.{name}' should be one of {', '.join(sorted(choices))}, got {json.dumps(value)}")
+        else:
+            continue
+        section[name] = copy.deepcopy(default)
+    return problems
+
+
+def parse_config(text: str) -> Dict[str, Any]:
+    """Config from the JSON text of config.json, merged with the defaults. Raises ValueError on invalid JSON."""
+    config: Dict[str, Any] = json.loads(text)
+    if not isinstance(config, dict):
+        raise ValueError("config.json must contain a JSON object")
+    for problem in validate_config(config):
+        print(f"Config: {problem}, using the default")
+    # Convert hotkey list back to set if it exists
+    if "hotkey" in config:
+        config["hotkey"] = set(config["hotkey"])
+    # Older versions saved the prompt already formatted, which lost the {language} placeholder
+    if re.fullmatch(r"The following is a transcription of spoken \w+:", config.get("initial_prompt", "")):
+        config["initial_prompt"] = DEFAULT_CONFIG["initial_prompt"]
+    # Merge with defaults to ensure all required keys exist
+    return {**copy.deepcopy(DEFAULT_CONFIG), **config}
+
+
+def changed_keys(old: Dict[str, Any], new: Dict[str, Any]) -> Set[str]:
+    return {key for key in old.keys() | new.keys() if old.get(key) != new.get(key)}
+
+
+class ConfigStore(QObject):
+    """
+    Reads and writes config.json.
+
+    Saving is cheap for the caller: the config is serialized right away, but written only
+    after `debounce_ms` without further changes, so toggling several tray options produces
+    a single write. The write happens on a background thread and goes to a temporary file
+    that then replaces config.json, so a crash never leaves a half-written file behind.
+
+    The file is watched for external edits. Edits are validated and reported through
+    `changed` together with the keys that differ, writes of the store itself are ignored.
+
+    Signals:
+        changed (dict, set): Emitted with the new config and the changed keys after an external edit
+
+    Attributes:
+        path (Path): Location of config.json
+        debounce_ms (int): Quiet period before a save is written
+    """
+
+    changed: ClassVar[Signal] = Signal(object, object)
+    _save_requested: ClassVar[Signal] = Signal(str)
+
+    def __init__(self, path: Path, debounce_ms: int = 500) -> None:
+        super().__init__()
+        self.path: Path = path
+        self.debounce_ms: int = debounce_ms
+        self.config: Dict[str, Any] = {}
+        # Text of the last write, to tell our own writes from external edits
+        self._written_text: Optional[str] = None
+        self._pending_text: Optional[str] = None
+        self._lock: threading.Lock = threading.Lock()
+        self._write_queue: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._writer: threading.Thread = threading.Thread(target=self._write_loop, name="ConfigWriter", daemon=True)
+        self._writer.start()
+        # Saves may be requested from the keyboard listener thread, the timers live on the GUI thread
+        self._save_requested.connect(self._schedule_write)
+        self._save_timer: QTimer = QTimer(self)
+        self._save_timer.setSingleShot(True)
+        self._save_timer.timeout.connect(self._write_pending)
+        self._reload_timer: QTimer = QTimer(self)
+        self._reload_timer.setSingleShot(True)
+        self._reload_timer.timeout.connect(self._reload)
+        self._watcher: QFileSystemWatcher = QFileSystemWatcher(self)
+        # Editors often save by replacing the file, which only shows up on the directory
+        self._watcher.addPath(str(self.path.parent))
+        if self.path.exists():
+            self._watcher.addPath(str(self.path))
+        self._watcher.fileChanged.connect(self._on_file_changed)
+        self._watcher.directoryChanged.connect(self._on_file_changed)
+
+    def load(self) -> Dict[str, Any]:
+        """Read config.json, falling back to the defaults if it is missing or invalid."""
+        self.config = copy.deepcopy(DEFAULT_CONFIG)
+        if self.path.exists():
+            try:
+                text: str = self.path.read_text(encoding="utf-8")
+                self.config = parse_config(text)
+                self._written_text = text
+            except (OSError, ValueError) as e:
+                print(f"Error reading {self.path}, using the default settings: {e}")
+        return self.config
+
+    def save(self, config: Dict[str, Any]) -> None:
+        """Schedule a write of the config, callable from any thread."""
+        text: str = json.dumps({key: sorted(value) if isinstance(value, set) else value for key, value in config.items()}, indent=2)
+        self._save_requested.emit(text)
+
+    def flush(self) -> None:
+        """Write a scheduled save now and wait for it, call before quitting."""
+        self._save_timer.stop()
+        self._write_pending()
+        self._write_queue.put(None)
+        self._writer.join(timeout=2)
+
+    def _schedule_write(self, text: str) -> None:
+        self._pending_text = text
+        # External edits are compared against what the app saved last
+        self.config = parse_config(text)
+        self._save_timer.start(self.debounce_ms)
+
+    def _write_pending(self) -> None:
+        if self._pending_text is None:
+            return
+        with self._lock:
+            self._written_text = self._pending_text
+        self._write_queue.put(self._pending_text)
+        self._pending_text = None
+
+    def _write_loop(self) -> None:
+        while True:
+            text: Optional[str] = self._write_queue.get()
+            if text is None:
+                return
+            temp_path: Path = self.path.with_name(self.path.name + ".tmp")
+            try:
+                with open(temp_path, "w", encoding="utf-8") as f:
+                    f.write(text)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(temp_path, self.path)
+            except OSError as e:
+                print(f"Error saving {self.path}: {e}")
+
+    def _on_file_changed(self, path: str) -> None:
+        # Replacing the file drops it from the watcher, watch the new one
+        if self.path.exists() and str(self.path) not in self._watcher.files():
+            self._watcher.addPath(str(self.path))
+        # Editors write in several steps, wait until it settles
+        self._reload_timer.start(200)
+
+    def _reload(self) -> None:
+        try:
+            text: str = self.path.read_text(encoding="utf-8")
+        except OSError:
+            return
+        with self._lock:
+            if text == self._written_text or self._pending_text is not None:
+                # Our own write, or a save of the app is about to overwrite it anyway
+                return
+            self._written_text = text
+        try:
+            config: Dict[str, Any] = parse_config(text)
+        except ValueError as e:
+            print(f"Ignoring invalid edit of {self.path}: {e}")
+            return
+        keys: Set[str] = changed_keys(self.config, config)
+        self.config = config
+        if keys:
+            print(f"Config reloaded, changed: {', '.join(sorted(keys))}")
+            self.changed.emit(config, keys)
@@ -1,9 +1,14 @@
-from main import HotkeyApp
+from main import HotkeyApp, forward_command, parse_arguments
 import sys
 import os
+
+command = parse_arguments(sys.argv[1:])
+# Exit before redirecting, the running instance is still writing to stdout.txt
+if forward_command(command):
+    sys.exit(0)
 nullfile = open(os.devnull, 'w')
 sys.stdout = open('stdout.txt', 'w')
 sys.stderr = open('stderr.txt', 'w')
 
-app = HotkeyApp()
+app = HotkeyApp(command)
 app.run()
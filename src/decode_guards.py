@@ -0,0 +1,144 @@
+from typing import Any, Dict, List, Optional, Tuple
+import math
+
+# Whisper decodes at most 448 tokens per window, up to 228 of them can be prompt and previous text
+MAX_NEW_TOKENS_LIMIT: int = 220
+# faster-whisper's default temperature schedule, tried in order while a window fails its quality checks
+TEMPERATURES: Tuple[float, ...] = (0.0, 0.2, 0.4, 0.6, 0.8, 1.0)
+
+
+def repeated_tail(words: List[str], min_repeats: int = 4, max_ngram: int = 8) -> Optional[int]:
+    """
+    Index of the word where a loop at the end of `words` starts, or None.
+
+    A loop is an n-gram (up to `max_ngram` words) repeated at least `min_repeats` times
+    back to back, the typical shape of a hallucinating decoder. The first occurrence is
+    kept, so the returned index points at its first repetition.
+    """
+    for n in range(1, max_ngram + 1):
+        if len(words) < n * min_repeats:
+            break
+        gram: List[str] = words[-n:]
+        repeats: int = 1
+        position: int = len(words) - 2 * n
+        while position >= 0 and words[position : position + n] == gram:
+            repeats += 1
+            position -= n
+        if repeats >= min_repeats:
+            return position + 2 * n
+    return None
+
+
+def timestamp_begin(model: Any) -> Optional[int]:
+    """First timestamp token id of a faster-whisper model's tokenizer, None without a tokenizer."""
+    tokenizer: Any = getattr(model, "hf_tokenizer", None)
+    no_timestamps: Optional[int] = tokenizer.token_to_id("<|notimestamps|>") if tokenizer is not None else None
+    # Like faster_whisper.tokenizer.Tokenizer.timestamp_begin
+    return no_timestamps + 1 if no_timestamps is not None else None
+
+
+class DecodeGuards:
+    """
+    Limits that keep a looping or hallucinating decode from holding up a dictation.
+
+    - `options` caps the tokens per window relative to the audio duration (speech rarely
+      exceeds a few tokens per second) and shortens the temperature fallback schedule.
+      These two are enforced by the decoder itself.
+    - `check_segment` is a per-segment check, called for every segment the decoder yields.
+      It can't interrupt the generation of a window, it only acts between segments: it cuts
+      a phrase that repeats at the end of a segment, and reports when the decode should stop
+      because the same segment came `min_repeats` times in a row, so no further windows are
+      decoded. A segment equal to the previous one is held back until a different one shows
+      that it isn't a loop, so a loop is trimmed back to its first occurrence. A phrase or
+      segment that is legitimately said twice is kept. Call `flush` after the last segment
+      for anything still held back.
+
+    Every guard that trips is counted in `trips`.
+
+    Attributes:
+        tokens_per_second (float): Token budget per second of audio
+        min_tokens (int): Token budget of even the shortest recording
+        max_fallbacks (int): Temperature fallbacks allowed after the greedy attempt
+        min_repeats (int): Repetitions of a phrase or segment that count as a loop
+        timestamp_begin (Optional[int]): First timestamp token id of the model's tokenizer, these don't count as text
+        trips (Dict[str, int]): How often each guard tripped during the current decode
+    """
+
+    def __init__(self, tokens_per_second: float = 8.0, min_tokens: int = 16, max_fallbacks: int = 2, min_repeats: int = 4) -> None:
+        self.tokens_per_second: float = tokens_per_second
+        self.min_tokens: int = min_tokens
+        self.max_fallbacks: int = max_fallbacks
+        # Below 2, a single segment would count as a loop
+        self.min_repeats: int = max(2, min_repeats)
+        self.timestamp_begin: Optional[int] = None
+        self.trips: Dict[str, int] = {}
+        self.max_new_tokens: int = MAX_NEW_TOKENS_LIMIT
+        self._previous_text: Optional[str] = None
+        self._held: List[str] = []
+        self._window_tokens: Dict[int, int] = {}
+
+    def options(self, duration: float, timestamp_begin: Optional[int] = None) -> Dict[str, Any]:
+        """
+        transcribe() options for a recording of `duration` seconds, also resets the per-decode state.
+
+        `timestamp_begin` is the first timestamp token of the model's tokenizer, without it the
+        timestamp tokens of a segment count towards its tokens as well.
+        """
+        self.timestamp_begin = timestamp_begin
+        self.trips = {}
+        self._previous_text = None
+        self._held = []
+        self._window_tokens = {}
+        # One window holds at most 30 seconds
+        window_seconds: float = min(duration, 30.0)
+        self.max_new_tokens = min(MAX_NEW_TOKENS_LIMIT, self.min_tokens + math.ceil(window_seconds * self.tokens_per_second))
+        return {
+            "max_new_tokens": self.max_new_tokens,
+            "temperature": list(TEMPERATURES[: self.max_fallbacks + 1]),
+        }
+
+    def _trip(self, name: str) -> None:
+        self.trips[name] = self.trips.get(name, 0) + 1
+
+    def check_segment(self, segment: Any) -> Tuple[str, bool]:
+        """Text to deliver after a decoded segment (empty while it is held back), and whether decoding should stop after it."""
+        text: str = segment.text
+        temperature: float = getattr(segment, "temperature", 0.0) or 0.0
+        if temperature > 0.0:
+            self._trip("temperature_fallback")
+            if temperature >= TEMPERATURES[min(self.max_fallbacks, len(TEMPERATURES) - 1)]:
+                # The last allowed temperature was needed, the capped schedule may have cut further retries
+                self._trip("fallback_cap")
+        # Segments of one window share its seek position, their text tokens count against the window's budget
+        seek: int = getattr(segment, "seek", 0)
+        tokens: List[int] = list(getattr(segment, "tokens", ()))
+        if self.timestamp_begin is not None:
+            tokens = [token for token in tokens if token < self.timestamp_begin]
+        window_tokens: int = self._window_tokens.get(seek, 0) + len(tokens)
+        self._window_tokens[seek] = window_tokens
+        if window_tokens >= self.max_new_tokens:
+            self._trip("token_cap")
+        words: List[str] = text.split()
+        loop_start: Optional[int] = repeated_tail(words, self.min_repeats)
+        if loop_start is not None:
+            self._trip("repetition_trim")
+            text = (" " if text.startswith(" ") else "") + " ".join(words[:loop_start])
+        normalized: str = " ".join(word.lower() for word in words)
+        if normalized and normalized == self._previous_text:
+            self._held.append(text)
+            # The same segment min_repeats times in a row means every further window will loop as well
+            if len(self._held) >= self.min_repeats - 1:
+                self._trip("repetition_stop")
+                self._held = []
+                return "", True
+            return "", False
+        self._previous_text = normalized
+        # A different segment, the ones held back were legitimate repetitions
+        released: str = self.flush()
+        return " ".join(part for part in (released, text) if part), False
+
+    def flush(self) -> str:
+        """Text of the segments still held back, call once the decoder yields no more segments."""
+        released: str = " ".join(self._held)
+        self._held = []
+        return released
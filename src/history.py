@@ -0,0 +1,126 @@
+from typing import Any, Dict, List, Optional
+from pathlib import Path
+import queue
+import re
+import sqlite3
+import threading
+import time
+import numpy as np
+from scipy.io.wavfile import write as write_wav
+
+
+class TranscriptHistory:
+    """
+    Append-only store of past transcriptions with a full-text index.
+
+    Entries live in a SQLite database with an FTS5 index over the text. Writes are queued
+    and done by a background thread, so adding an entry on the transcription path only
+    costs a queue put. Searches use their own connection and read from the WAL, so they
+    don't wait for the writer.
+
+    Attributes:
+        db_path (Path): Location of the SQLite database
+        audio_dir (Optional[Path]): Where recordings are kept when audio references are enabled
+    """
+
+    def __init__(self, db_path: Path, audio_dir: Optional[Path] = None) -> None:
+        self.db_path: Path = db_path
+        self.audio_dir: Optional[Path] = audio_dir
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._queue: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue()
+        self._read_connection: sqlite3.Connection = self._connect()
+        self.has_fts: bool = self._create_schema(self._read_connection)
+        self._writer: threading.Thread = threading.Thread(target=self._write_loop, name="TranscriptHistoryWriter", daemon=True)
+        self._writer.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        connection: sqlite3.Connection = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    def _create_schema(self, connection: sqlite3.Connection) -> bool:
+        with connection:
+            connection.execute(
+                """CREATE TABLE IF NOT EXISTS transcripts (
+                    id INTEGER PRIMARY KEY,
+                    created REAL NOT NULL,
+                    text TEXT NOT NULL,
+                    model TEXT,
+                    language TEXT,
+                    duration REAL,
+                    latency REAL,
+                    audio_path TEXT
+                )"""
+            )
+            try:
+                connection.execute("CREATE VIRTUAL TABLE IF NOT EXISTS transcripts_fts USING fts5(text, content='transcripts', content_rowid='id')")
+                connection.execute(
+                    """CREATE TRIGGER IF NOT EXISTS transcripts_ai AFTER INSERT ON transcripts BEGIN
+                        INSERT INTO transcripts_fts(rowid, text) VALUES (new.id, new.text);
+                    END"""
+                )
+            except sqlite3.OperationalError as e:
+                # SQLite without FTS5, searches fall back to LIKE
+                print(f"Transcript history without full-text index: {e}")
+                return False
+        return True
+
+    def add(self, text: str, model: str, language: Optional[str], duration: float, latency: float, audio: Optional[np.ndarray] = None, sample_rate: int = 16000) -> None:
+        """Queue an entry, the database (and audio file) is written by the background thread."""
+        self._queue.put(
+            {
+                "created": time.time(),
+                "text": text,
+                "model": model,
+                "language": language,
+                "duration": duration,
+                "latency": latency,
+                "audio": audio if self.audio_dir is not None else None,
+                "sample_rate": sample_rate,
+            }
+        )
+
+    def _write_loop(self) -> None:
+        connection: sqlite3.Connection = self._connect()
+        while True:
+            entry: Optional[Dict[str, Any]] = self._queue.get()
+            if entry is None:
+                connection.close()
+                return
+            try:
+                audio_path: Optional[str] = None
+                if entry["audio"] is not None and self.audio_dir is not None:
+                    self.audio_dir.mkdir(parents=True, exist_ok=True)
+                    audio_path = str(self.audio_dir / f"{time.strftime('%Y%m%d-%H%M%S', time.localtime(entry['created']))}-{int(entry['created'] * 1000) % 1000:03d}.wav")
+                    write_wav(audio_path, entry["sample_rate"], entry["audio"])
+                with connection:
+                    connection.execute(
+                        "INSERT INTO transcripts (created, text, model, language, duration, latency, audio_path) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (entry["created"], entry["text"], entry["model"], entry["language"], entry["duration"], entry["latency"], audio_path),
+                    )
+            except Exception as e:
+                print(f"Error writing transcript history: {e}")
+
+    def search(self, query: str, limit: int = 100) -> List[Dict[str, Any]]:
+        """Most recent entries matching all words of the query (as prefixes), newest first."""
+        words: List[str] = re.findall(r"\w+", query)
+        columns: str = "t.id, t.created, t.text, t.model, t.language, t.duration, t.latency, t.audio_path"
+        if not words:
+            sql: str = f"SELECT {columns} FROM transcripts t ORDER BY t.id DESC LIMIT ?"
+            params: tuple = (limit,)
+        elif self.has_fts:
+            match: str = " ".join(f'"{word}"*' for word in words)
+            sql = f"SELECT {columns} FROM transcripts_fts f JOIN transcripts t ON t.id = f.rowid WHERE transcripts_fts MATCH ? ORDER BY t.id DESC LIMIT ?"
+            params = (match, limit)
+        else:
+            conditions: str = " AND ".join("t.text LIKE ?" for _ in words)
+            sql = f"SELECT {columns} FROM transcripts t WHERE {conditions} ORDER BY t.id DESC LIMIT ?"
+            params = (*[f"%{word}%" for word in words], limit)
+        keys: List[str] = ["id", "created", "text", "model", "language", "duration", "latency", "audio_path"]
+        return [dict(zip(keys, row)) for row in self._read_connection.execute(sql, params)]
+
+    def close(self) -> None:
+        self._queue.put(None)
+        self._writer.join(timeout=2)
+        self._read_connection.close()
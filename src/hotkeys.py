@@ -0,0 +1,137 @@
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple, Union
+from pynput import keyboard
+
+MODIFIER_KEYS: FrozenSet[str] = frozenset({"ctrl", "shift", "alt"})
+
+# Left/right variants are folded into one name so either side matches the hotkey
+_KEY_ALIASES: Dict[str, str] = {
+    "shift_l": "shift",
+    "shift_r": "shift",
+    "ctrl_l": "ctrl",
+    "ctrl_r": "ctrl",
+    "alt_l": "alt",
+    "alt_r": "alt",
+}
+
+# Built once at import, so normalizing a special key is a single dict lookup
+_SPECIAL_KEY_NAMES: Dict[keyboard.Key, str] = {key: _KEY_ALIASES.get(key.name, key.name) for key in keyboard.Key}
+
+# Normalized names of character keys, keyed by (vk, char) and filled on first sight
+_keycode_names: Dict[Tuple[Optional[int], Optional[str]], Optional[str]] = {}
+_KEYCODE_CACHE_LIMIT: int = 4096
+
+
+def _keycode_name(vk: Optional[int], char: Optional[str]) -> Optional[str]:
+    # Handle letters and numbers
+    if vk is not None and ((65 <= vk <= 90) or (48 <= vk <= 57)):  # A-Z or 0-9
+        return chr(vk).lower()  # Convert to lowercase for consistency
+    # Handle normal characters as fallback
+    if char and char.isprintable():  # Only handle printable characters
+        return char.lower()
+    return None
+
+
+def normalize_key(key: Union[keyboard.Key, keyboard.KeyCode]) -> Optional[str]:
+    """Convert a pynput key to the standardized string used in hotkeys, or None if it can't be part of one."""
+    if isinstance(key, keyboard.Key):
+        return _SPECIAL_KEY_NAMES[key]
+    cache_key: Tuple[Optional[int], Optional[str]] = (getattr(key, "vk", None), getattr(key, "char", None))
+    try:
+        return _keycode_names[cache_key]
+    except KeyError:
+        name: Optional[str] = _keycode_name(*cache_key)
+        if len(_keycode_names) < _KEYCODE_CACHE_LIMIT:
+            _keycode_names[cache_key] = name
+        return name
+
+
+class HotkeyBinding:
+    """
+    A key chord together with how it controls recording and the profile it records with.
+
+    Attributes:
+        keys (FrozenSet[str]): Normalized key names of the chord
+        mode (str): "toggle" starts/stops recording on each press, "hold" records while the chord is held,
+            "history" opens the transcript history picker
+        profile (Optional[str]): Name of the profile in the config, None for the tray settings
+    """
+
+    def __init__(self, keys: Iterable[str], mode: str = "toggle", profile: Optional[str] = None) -> None:
+        self.keys: FrozenSet[str] = frozenset(keys)
+        self.mode: str = mode if mode in ("toggle", "hold", "history") else "toggle"
+        self.profile: Optional[str] = profile
+        self.mask: int = 0
+
+    def __repr__(self) -> str:
+        return f"HotkeyBinding({' + '.join(sorted(self.keys))}, mode={self.mode}, profile={self.profile})"
+
+
+class HotkeyEngine:
+    """
+    Tracks the pressed keys as a bitmask and matches them against several compiled bindings.
+
+    Every key name gets a bit the first time it is seen, so a key event costs one dict
+    lookup and one integer comparison per binding. A press only matches on the transition
+    into an exact chord, auto-repeat events of an already held key never match again.
+    A "hold" binding is reported once more by `release` when its chord is broken.
+    """
+
+    def __init__(self, bindings: Iterable[HotkeyBinding] = ()) -> None:
+        self._bits: Dict[str, int] = {}
+        self.pressed_mask: int = 0
+        self.bindings: List[HotkeyBinding] = []
+        self.held: Optional[HotkeyBinding] = None
+        self.set_bindings(bindings)
+
+    def _bit(self, name: str) -> int:
+        bit: Optional[int] = self._bits.get(name)
+        if bit is None:
+            bit = 1 << len(self._bits)
+            self._bits[name] = bit
+        return bit
+
+    def set_bindings(self, bindings: Iterable[HotkeyBinding]) -> None:
+        compiled: List[HotkeyBinding] = []
+        for binding in bindings:
+            # At least one non-modifier key is needed, so a binding can't trigger on just modifiers
+            if not any(name not in MODIFIER_KEYS for name in binding.keys):
+                print(f"Ignoring hotkey without a non-modifier key: {binding}")
+                continue
+            binding.mask = 0
+            for name in binding.keys:
+                binding.mask |= self._bit(name)
+            compiled.append(binding)
+        # Swap the list in one go, the listener thread may be matching against it right now
+        self.bindings = compiled
+        self.held = None
+
+    def press(self, name: str) -> Optional[HotkeyBinding]:
+        """Register a key press, returns the binding whose chord it completes exactly."""
+        bit: int = self._bit(name)
+        if self.pressed_mask & bit:
+            return None
+        self.pressed_mask |= bit
+        for binding in self.bindings:
+            if self.pressed_mask == binding.mask:
+                if binding.mode == "hold":
+                    self.held = binding
+                return binding
+        return None
+
+    def release(self, name: str) -> Optional[HotkeyBinding]:
+        """Register a key release, returns the held binding if this release ended it."""
+        bit: Optional[int] = self._bits.get(name)
+        if bit is None:
+            return None
+        self.pressed_mask &= ~bit
+        held: Optional[HotkeyBinding] = self.held
+        if held is not None and held.mask & bit:
+            self.held = None
+            return held
+        return None
+
+    def clear(self) -> None:
+        self.pressed_mask = 0
+
+    def any_pressed(self) -> bool:
+        return self.pressed_mask != 0
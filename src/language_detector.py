@@ -0,0 +1,99 @@
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from collections import Counter, deque
+import threading
+import time
+import numpy as np
+
+
+class LanguageDetector:
+    """
+    Picks the language of a recording for the "auto" language mode.
+
+    Detection only looks at the first `window_seconds` of a recording and only considers
+    the configured languages. When the recent recordings were (almost) all in one
+    language, detection is skipped and that language is used directly. Every
+    `verify_every` skipped recordings, detection runs anyway so a switch to another
+    language is still noticed.
+
+    Attributes:
+        candidates (List[str]): Language codes detection may return, all languages if empty
+        window_seconds (float): Length of audio used for detection
+        skip_confidence (float): Share of the recent recordings one language needs to skip detection
+        min_history (int): Recordings needed before detection is ever skipped
+        verify_every (int): Run detection after this many skipped recordings
+        last_language (Optional[str]): Language of the latest recording
+        last_detection_seconds (float): Duration of the latest detection pass
+    """
+
+    def __init__(
+        self,
+        candidates: List[str],
+        window_seconds: float = 5.0,
+        history_size: int = 20,
+        skip_confidence: float = 0.9,
+        min_history: int = 5,
+        verify_every: int = 10,
+    ) -> None:
+        self.candidates: List[str] = candidates
+        self.window_seconds: float = window_seconds
+        self.skip_confidence: float = skip_confidence
+        self.min_history: int = min_history
+        self.verify_every: int = verify_every
+        self.last_language: Optional[str] = None
+        self.last_detection_seconds: float = 0.0
+        self._recent: Deque[str] = deque(maxlen=history_size)
+        self._skipped_since_detection: int = 0
+        self._lock: threading.Lock = threading.Lock()
+
+    def observe(self, language: Optional[str]) -> None:
+        """Add the language of a finished recording to the recent distribution."""
+        if language:
+            with self._lock:
+                self._recent.append(language)
+
+    def distribution(self) -> Dict[str, float]:
+        with self._lock:
+            recent: List[str] = list(self._recent)
+        if not recent:
+            return {}
+        return {language: count / len(recent) for language, count in Counter(recent).most_common()}
+
+    def cached_language(self) -> Optional[str]:
+        """The dominant recent language if detection can be skipped for this recording, otherwise None."""
+        with self._lock:
+            if len(self._recent) < self.min_history or self._skipped_since_detection >= self.verify_every:
+                return None
+            language, count = Counter(self._recent).most_common(1)[0]
+            if count / len(self._recent) < self.skip_confidence:
+                return None
+            self._skipped_since_detection += 1
+            return language
+
+    def detect(self, model: Any, audio: np.ndarray, sample_rate: int = 16000) -> Tuple[str, float]:
+        """Run language detection on the start of the recording, returns the language and its probability."""
+        start_time: float = time.perf_counter()
+        window: np.ndarray = audio[: int(self.window_seconds * sample_rate)]
+        language, probability, all_probabilities = model.detect_language(window)
+        if self.candidates and language not in self.candidates:
+            # Use the most likely of the languages the user actually speaks
+            candidate_probabilities: List[Tuple[str, float]] = [(code, prob) for code, prob in all_probabilities if code in self.candidates]
+            if candidate_probabilities:
+                language, probability = max(candidate_probabilities, key=lambda item: item[1])
+        self.last_detection_seconds = time.perf_counter() - start_time
+        with self._lock:
+            self._skipped_since_detection = 0
+        return language, probability
+
+    def choose(self, model: Any, audio: np.ndarray, sample_rate: int = 16000) -> Tuple[str, Optional[float]]:
+        """
+        Language to transcribe a recording with.
+
+        Returns the language and the detection probability, the probability is None when
+        the language came from the recent distribution without running detection.
+        """
+        language: Optional[str] = self.cached_language()
+        probability: Optional[float] = None
+        if language is None:
+            language, probability = self.detect(model, audio, sample_rate)
+        self.last_language = language
+        return language, probability
@@ -0,0 +1,156 @@
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from collections import deque
+from pathlib import Path
+import json
+import threading
+import time
+
+# From the configured settings to the fastest fallback
+LEVELS: Tuple[str, ...] = ("configured", "greedy", "fallback_model")
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile, like Metrics.percentile."""
+    ordered: List[float] = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))]
+
+
+class LatencyController:
+    """
+    Keeps dictation latency within a target by trading accuracy for speed while the machine is busy.
+
+    Every finished dictation reports its audio length and latency. Only clips up to
+    `max_clip_seconds` count towards the target, longer ones are expected to take longer.
+    The controller steps down one level when the `pct` percentile of the recent latencies
+    at the current level misses the target, or right away when a single dictation takes
+    more than twice the target:
+
+    - "configured": the model and beam size of the profile
+    - "greedy": beam size 1, typically a third faster
+    - "fallback_model": a smaller model kept warm next to the main one
+
+    It steps back up once the percentile stays below `headroom` times the target. Latencies
+    are only compared within a level, the window is cleared on every change, and apart from
+    a single slow dictation a level is judged only after `min_samples` dictations. A faster
+    level always looks like it has headroom, so a step up is a probe: if it has to be undone
+    within `2 * min_samples` dictations, the wait before the next probe doubles (up to
+    `16 * min_samples`), so a lasting load doesn't make the settings flap. Every decision is
+    printed and appended to `log_path` as a JSON line, together with the measured real-time
+    factor (latency / audio length).
+
+    Attributes:
+        target_seconds (float): Latency target for clips up to max_clip_seconds
+        pct (float): Percentile of the latencies that has to meet the target
+        max_clip_seconds (float): Longer clips don't count towards the target
+        headroom (float): Fraction of the target the percentile has to stay below to step up
+        min_samples (int): Dictations at a level before it is judged
+        max_level (int): Lowest level allowed, e.g. 1 while no fallback model is configured
+        level (int): Index into LEVELS
+        log_path (Optional[Path]): JSON lines file of the decisions
+    """
+
+    def __init__(
+        self,
+        target_seconds: float = 1.5,
+        pct: float = 95.0,
+        max_clip_seconds: float = 30.0,
+        window: int = 20,
+        min_samples: int = 5,
+        headroom: float = 0.5,
+        max_level: int = len(LEVELS) - 1,
+        log_path: Optional[Path] = None,
+    ) -> None:
+        self.target_seconds: float = target_seconds
+        self.pct: float = pct
+        self.max_clip_seconds: float = max_clip_seconds
+        self.headroom: float = headroom
+        self.min_samples: int = min_samples
+        self.max_level: int = min(max_level, len(LEVELS) - 1)
+        self.level: int = 0
+        self.log_path: Optional[Path] = log_path
+        self._latencies: Deque[float] = deque(maxlen=max(window, min_samples))
+        self._rtfs: Deque[float] = deque(maxlen=max(window, min_samples))
+        # Dictations since the last switch, and how many have to pass before stepping up
+        self._since_switch: int = 0
+        self._hold: int = min_samples
+        self._last_step_up: bool = False
+        self._lock: threading.Lock = threading.Lock()
+
+    @property
+    def level_name(self) -> str:
+        return LEVELS[self.level]
+
+    def adjust(self, profile: Dict[str, Any], fallback_model: Optional[str] = None) -> Dict[str, Any]:
+        """The profile with the settings of the current level, `fallback_model` is used from level 2 on if it is loaded."""
+        with self._lock:
+            level: int = self.level
+        if level == 0:
+            return profile
+        adjusted: Dict[str, Any] = {**profile, "beam_size": 1, "latency_level": LEVELS[level]}
+        if level >= 2 and fallback_model:
+            adjusted["model"] = fallback_model
+        return adjusted
+
+    def observe(self, audio_seconds: float, latency_seconds: float) -> Optional[Tuple[str, str]]:
+        """Record a finished dictation, returns (old level, new level) if the controller switched levels."""
+        with self._lock:
+            rtf: float = latency_seconds / max(audio_seconds, 0.1)
+            self._rtfs.append(rtf)
+            if audio_seconds > self.max_clip_seconds:
+                return None
+            self._since_switch += 1
+            if self._last_step_up and self._since_switch > 2 * self.min_samples:
+                # The probe held, the load is gone
+                self._hold = self.min_samples
+            self._latencies.append(latency_seconds)
+            if latency_seconds > 2 * self.target_seconds and self.level < self.max_level:
+                return self._switch(self.level + 1, f"single dictation took {latency_seconds:.2f}s")
+            if len(self._latencies) < self.min_samples:
+                return None
+            measured: float = percentile(list(self._latencies), self.pct)
+            if measured > self.target_seconds and self.level < self.max_level:
+                return self._switch(self.level + 1, f"p{self.pct:g} {measured:.2f}s above target")
+            if measured < self.headroom * self.target_seconds and self.level > 0 and self._since_switch >= self._hold:
+                return self._switch(self.level - 1, f"p{self.pct:g} {measured:.2f}s below {self.headroom:.0%} of target")
+            return None
+
+    def reset(self) -> None:
+        """Back to the configured settings, e.g. after the user picked another model."""
+        with self._lock:
+            if self.level:
+                self._switch(0, "reset")
+            self._latencies.clear()
+            self._hold = self.min_samples
+            self._last_step_up = False
+
+    def _switch(self, level: int, reason: str) -> Tuple[str, str]:
+        old: str = LEVELS[self.level]
+        entry: Dict[str, Any] = {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "from": old,
+            "to": LEVELS[level],
+            "reason": reason,
+            "target_seconds": self.target_seconds,
+            "latencies": [round(latency, 3) for latency in self._latencies],
+            "rtf_p50": round(percentile(list(self._rtfs), 50), 3) if self._rtfs else None,
+        }
+        step_up: bool = level < self.level
+        if not step_up and self._last_step_up and self._since_switch <= 2 * self.min_samples:
+            # The probe failed, the load is still there
+            self._hold = min(self._hold * 2, 16 * self.min_samples)
+        elif not step_up:
+            self._hold = self.min_samples
+        entry["next_step_up_after"] = self._hold
+        print(f"Latency controller: {old} -> {LEVELS[level]} ({reason}, target {self.target_seconds:.2f}s)")
+        if self.log_path:
+            try:
+                with open(self.log_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(entry) + "\n")
+            except OSError as e:
+                print(f"Error writing {self.log_path}: {e}")
+        self.level = level
+        self._last_step_up = step_up
+        self._since_switch = 0
+        # Latencies of the old settings say nothing about the new ones
+        self._latencies.clear()
+        return old, LEVELS[level]
@@ -0,0 +1,63 @@
+from typing import List, ClassVar, Optional
+from PySide6.QtCore import QObject, QTimer, Signal
+from PySide6.QtGui import QIcon
+from tray_icons import circle_icon
+
+
+class LoadingIconAnimation(QObject):
+    """
+    Drives the pulsing tray icon shown while a model loads.
+
+    The animation runs on a QTimer in the GUI thread, so no extra thread is woken up
+    while a model loads and stopping it is immediate. The frames are rendered once
+    and shared by every instance.
+
+    Signals:
+        update_icon (QIcon): Emitted with the next frame every `interval_ms`
+    """
+
+    update_icon: ClassVar[Signal] = Signal(QIcon)
+    _frames: ClassVar[Optional[List[QIcon]]] = None
+
+    def __init__(self, interval_ms: int = 100) -> None:
+        super().__init__()
+        self.frames: List[QIcon] = self._create_loading_frames()
+        self.frame_index: int = 0
+        self.timer: QTimer = QTimer(self)
+        self.timer.setInterval(interval_ms)  # 100ms per frame
+        self.timer.timeout.connect(self._next_frame)
+
+    @classmethod
+    def _create_loading_frames(cls) -> List[QIcon]:
+        if cls._frames is not None:
+            return cls._frames
+        # Create 8 frames for the loading animation
+        colors: List[tuple[int, int, int]] = [
+            (255, 0, 0),  # Red
+            (255, 128, 0),  # Orange
+            (255, 255, 0),  # Yellow
+            (128, 255, 0),  # Light green
+            (0, 255, 0),  # Green
+            (0, 255, 255),  # Cyan
+            (0, 128, 255),  # Light blue
+            (0, 0, 255),  # Blue
+        ]
+        frames: List[QIcon] = [circle_icon(color) for color in colors]
+        cls._frames = frames
+        return frames
+
+    def _next_frame(self) -> None:
+        self.update_icon.emit(self.frames[self.frame_index])
+        self.frame_index = (self.frame_index + 1) % len(self.frames)
+
+    def start(self) -> None:
+        if not self.timer.isActive():
+            self.frame_index = 0
+            self._next_frame()
+            self.timer.start()
+
+    def stop(self) -> None:
+        self.timer.stop()
+
+    def is_running(self) -> bool:
+        return self.timer.isActive()
@@ -1,8 +1,9 @@
-import json
+import argparse
+import copy
+import gc
 import sys
 import signal
 from pathlib import Path
-import winsound
 from pynput import keyboard
 from PySide6.QtWidgets import (
     QApplication,
@@ -12,19 +13,42 @@ from PySide6.QtWidgets import (
     QVBoxLayout,
     QLabel,
     QPushButton,
+    QLineEdit,
+    QListWidget,
+    QListWidgetItem,
+    QPlainTextEdit,
+    QHBoxLayout,
+    QFileDialog,
 )
-from PySide6.QtGui import QIcon, QPixmap, QAction, QActionGroup, QPainter, QColor
-from PySide6.QtCore import Qt, QTimer
+from PySide6.QtGui import QAction, QActionGroup, QCursor, QFontDatabase
+from PySide6.QtCore import Qt, QTimer, QObject, QThread, Signal
 import sounddevice as sd
 import numpy as np
-from scipy.io.wavfile import write as write_wav
-import tempfile
-import pyperclip
 import os
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from faster_whisper import decode_audio
+from config import ConfigStore, get_config_path
 from cuda_utils import set_cuda_paths, check_cuda_availability
+from decode_guards import DecodeGuards, timestamp_begin
 from model_loader import ModelLoaderThread
-from loader_icon_thread import LoadingIconThread
+from loading_icon import LoadingIconAnimation
+from audio_conditioner import AudioConditioner
+from audio_input import LevelMeter, StreamingResampler, capture_time, list_input_devices, resolve_input_device
+from hotkeys import HotkeyBinding, HotkeyEngine, normalize_key
+from history import TranscriptHistory
+from language_detector import LanguageDetector
+from latency_controller import LatencyController
+from metrics import Metrics
+from output_sinks import OUTPUT_SINK_LABELS, create_output_sink, note_key_press
+from parallel_decode import ParallelDecoder, split_on_silence
+from profiler import Profiler, format_timeline
+from prompt_builder import MAX_PROMPT_TOKENS, PromptBuilder
+from single_instance import InstanceServer, send_command
+from sound_player import SoundPlayer
+from tray_icons import circle_icon, square_icon
+from transcription_thread import TranscriptionThread
 
 
 set_cuda_paths()
@@ -61,40 +85,151 @@ class SetNewRecordingShortcut(QDialog):
         event.ignore()
 
 
-class HotkeyApp:
+class HistoryPicker(QDialog):
+    """Search past transcriptions and deliver one of them again."""
+
+    def __init__(self, history, on_pick, parent=None):
+        super().__init__(parent)
+        self.history = history
+        self.on_pick = on_pick
+        self.setWindowTitle("Transcript History")
+        self.resize(560, 420)
+        self.setWindowFlags(Qt.Dialog | Qt.WindowTitleHint | Qt.CustomizeWindowHint | Qt.WindowCloseButtonHint | Qt.WindowStaysOnTopHint)
+        layout = QVBoxLayout(self)
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("Search transcriptions...")
+        self.search_input.textChanged.connect(self.refresh)
+        layout.addWidget(self.search_input)
+        self.results = QListWidget()
+        self.results.itemActivated.connect(self.pick)
+        layout.addWidget(self.results)
+        self.status_label = QLabel()
+        layout.addWidget(self.status_label)
+
+    def refresh(self):
+        start_time = time.perf_counter()
+        rows = self.history.search(self.search_input.text())
+        self.results.clear()
+        for row in rows:
+            created = time.strftime("%Y-%m-%d %H:%M", time.localtime(row["created"]))
+            item = QListWidgetItem(f"{created}  {row['text'].strip()}")
+            item.setData(Qt.UserRole, row["text"])
+            item.setToolTip(f"{row['model']}, {row['language']}, {row['duration']:.1f}s audio, {row['latency']:.2f}s latency")
+            self.results.addItem(item)
+        if rows:
+            self.results.setCurrentRow(0)
+        self.status_label.setText(f"{len(rows)} result(s) in {(time.perf_counter() - start_time) * 1000:.1f} ms - Enter to paste")
+
+    def show_picker(self):
+        self.search_input.clear()
+        self.refresh()
+        self.show()
+        self.raise_()
+        self.activateWindow()
+        self.search_input.setFocus()
+
+    def pick(self, item=None):
+        item = item or self.results.currentItem()
+        if item is None:
+            return
+        text = item.data(Qt.UserRole)
+        self.hide()
+        # Give the previously focused window time to get its focus back before pasting into it
+        QTimer.singleShot(150, lambda: self.on_pick(text))
+
+    def keyPressEvent(self, event):
+        if event.key() in (Qt.Key_Return, Qt.Key_Enter):
+            self.pick()
+        elif event.key() == Qt.Key_Escape:
+            self.hide()
+        elif event.key() in (Qt.Key_Down, Qt.Key_Up) and self.search_input.hasFocus():
+            # Move through the results without leaving the search field
+            row = self.results.currentRow() + (1 if event.key() == Qt.Key_Down else -1)
+            self.results.setCurrentRow(max(0, min(row, self.results.count() - 1)))
+        else:
+            super().keyPressEvent(event)
+
+    def closeEvent(self, event):
+        # Just hide the dialog instead of closing the application
+        self.hide()
+        event.ignore()
+
+
+class TimelineViewer(QDialog):
+    """Span timelines of the last profiled dictations, newest first, with an export to Chrome trace JSON."""
+
+    def __init__(self, profiler, parent=None):
+        super().__init__(parent)
+        self.profiler = profiler
+        self.setWindowTitle("Performance Timeline")
+        self.resize(900, 520)
+        self.setWindowFlags(Qt.Dialog | Qt.WindowTitleHint | Qt.CustomizeWindowHint | Qt.WindowCloseButtonHint)
+        layout = QVBoxLayout(self)
+        self.timeline = QPlainTextEdit()
+        self.timeline.setReadOnly(True)
+        self.timeline.setLineWrapMode(QPlainTextEdit.NoWrap)
+        self.timeline.setFont(QFontDatabase.systemFont(QFontDatabase.FixedFont))
+        layout.addWidget(self.timeline)
+        buttons = QHBoxLayout()
+        refresh_button = QPushButton("Refresh")
+        refresh_button.clicked.connect(self.refresh)
+        buttons.addWidget(refresh_button)
+        export_button = QPushButton("Export Chrome Trace...")
+        export_button.clicked.connect(self.export)
+        buttons.addWidget(export_button)
+        layout.addLayout(buttons)
+
+    def refresh(self):
+        traces = list(reversed(self.profiler.traces))
+        if not traces:
+            message = "No dictations recorded yet." if self.profiler.enabled else "Profiling is off, enable it in the tray menu."
+            self.timeline.setPlainText(message)
+            return
+        self.timeline.setPlainText("\n\n".join(format_timeline(trace) for trace in traces))
+
+    def export(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Export Chrome Trace", f"vibekey-trace-{time.strftime('%Y%m%d-%H%M%S')}.json", "Trace (*.json)")
+        if path:
+            self.profiler.export_chrome_trace(Path(path))
+            print(f"Exported trace to {path} (open it in chrome://tracing or ui.perfetto.dev)")
+
+    def closeEvent(self, event):
+        # Just hide the dialog instead of closing the application
+        self.hide()
+        event.ignore()
+
+
+class MainThreadInvoker(QObject):
+    """Runs callables on the GUI thread, e.g. when requested from the pynput listener thread."""
+
+    invoke = Signal(object)
+
     def __init__(self):
-        self.app = QApplication(sys.argv)
+        super().__init__()
+        self.invoke.connect(self._run, Qt.QueuedConnection)
+
+    def _run(self, func):
+        func()
 
-        # create gray square icon
-        pixmap = QPixmap(64, 64)
-        pixmap.fill(QColor(128, 128, 128))  # Medium gray
-        self.gray_icon = QIcon(pixmap)
-
-        # create red circle icon
-        pixmap = QPixmap(64, 64)
-        pixmap.fill(Qt.transparent)
-        painter = QPainter(pixmap)
-        painter.setRenderHint(QPainter.Antialiasing)
-        painter.setBrush(QColor(255, 0, 0))  # Red
-        painter.setPen(Qt.NoPen)
-        painter.drawEllipse(4, 4, 56, 56)
-        painter.end()
-
-        self.red_circle_icon = QIcon(pixmap)
-
-        # create blue circle icon for transcription
-        painter = QPainter(pixmap)
-        painter.setRenderHint(QPainter.Antialiasing)
-        painter.setBrush(QColor(0, 0, 255))  # Solid blue
-        painter.setPen(Qt.NoPen)
-        painter.drawEllipse(4, 4, 56, 56)
-        painter.end()
-        self.blue_circle_icon = QIcon(pixmap)
-
-        self.config_file = Path("config.json")
-        self.config = self.load_config()
+
+class HotkeyApp:
+    def __init__(self, command=None):
+        self.app = QApplication(sys.argv)
+        # Later launches pass their command line here instead of starting a second instance, listening starts in __main__
+        self.instance_server = InstanceServer(self.handle_instance_command)
+
+        # Icons are rendered once and shared, see tray_icons
+        self.gray_icon = square_icon((128, 128, 128))  # Medium gray
+        self.red_circle_icon = circle_icon((255, 0, 0))  # Red
+        self.blue_circle_icon = circle_icon((0, 0, 255))  # Solid blue for transcription
+        self.current_icon = None
+
+        self.config_file = get_config_path()
+        self.config_store = ConfigStore(self.config_file)
+        self.config = self.config_store.load()
         # Set models directory before anything else
         self.models_dir = get_models_directory()
+        self.model_dir_sizes = {}  # Cached model directory sizes, see get_model_dir_size
         # Check CUDA availability
         self.cuda_device_count = check_cuda_availability()
         # Always start with CPU mode if no CUDA devices are available
@@ -105,36 +240,47 @@ class HotkeyApp:
         else:
             print(f"Found {self.cuda_device_count} CUDA device(s)")
             # Only use CUDA from config if it was previously set and CUDA is available
-            config_device_mode = self.config.get("device_mode", "cuda")
+            config_device_mode = self.config["device_mode"]
             self.device_mode = config_device_mode if config_device_mode == "cuda" else "cpu"
-            self.cuda_device = self.config.get("cuda_device", 0)
+            self.cuda_device = self.config["cuda_device"]
             # Validate cuda_device against available devices
             if self.cuda_device >= self.cuda_device_count:
                 print(f"Configured CUDA device {self.cuda_device} not available, using device 0")
                 self.cuda_device = 0
         # Initialize loading animation
-        self.loading_thread = LoadingIconThread()
-        self.loading_thread.update_icon.connect(self._update_tray_icon)
-        self.loading_thread.start()
+        self.loading_animation = LoadingIconAnimation()
+        self.loading_animation.update_icon.connect(self._update_tray_icon)
 
-        # create pointer which will later point to the transcription thread
-        self.transcribing_thread = None
+        # Transcription runs on its own thread so the keyboard hook is never blocked
+        self.transcribing_thread = TranscriptionThread(self.transcribe_recording)
+        self.transcribing_thread.queue_empty.connect(self.on_transcription_queue_empty)
+        self.transcribing_thread.start()
+        # Recordings made before a model was available, transcribed once it is loaded
+        self.pending_recordings = deque()
 
         # Initialize hotkey state
         self.hotkey = self.config["hotkey"]
-        self.pressed_keys = set()  # Track currently pressed keys
+        self.hotkey_engine = HotkeyEngine(self.build_hotkey_bindings())  # Tracks currently pressed keys
+        self.recording_profile = None  # Profile of the recording in progress, see resolve_profile
         self.recording_hotkey = False  # Flag for hotkey recording mode
         self.temp_hotkey = set()  # Temporary storage for new hotkey
         self._toggle_recording_func = None  # Store reference to toggle_recording function
-        # Initialize sound threads
-        sounds_dir = Path("sounds")
+        # Initialize sound cues
+        sounds_dir = Path(__file__).resolve().parent.parent / "sounds"
         self.sound_files = {
-            "start_record": str(sounds_dir / "start_record.wav"),
-            "stop_record": str(sounds_dir / "stop_record.wav"),
-            "transcription_done": str(sounds_dir / "transcription_done.wav"),
-            "transcription_empty": str(sounds_dir / "transcription_empty.wav"),
+            "start_record": sounds_dir / "start_record.wav",
+            "stop_record": sounds_dir / "stop_record.wav",
+            "transcription_done": sounds_dir / "transcription_done.wav",
+            "transcription_empty": sounds_dir / "transcription_empty.wav",
         }
+        # Decode the cues once and open one output stream, so playing them never touches the disk
+        self.sound_player = SoundPlayer(self.sound_files, volume=self.config["sound_volume"])
+        self.sound_player.start()
         self.current_model = self.config["model"]
+        if command and command.get("action") == "model" and command.get("model") in self.config["available_models"]:
+            # Started with --model: load that one right away instead of switching after the configured one
+            self.current_model = command["model"]
+            command = None
         self.current_language = self.config["language"]
         self.available_languages = self.config["available_languages"]
         self.initial_prompt = self.config["initial_prompt"]
@@ -143,28 +289,167 @@ class HotkeyApp:
         self.tray = None
         # Audio recording state
         self.is_recording = False
+        self.transcribing = False
         self.recording_data = []
-        self.sample_rate = 16000
+        self.sample_rate = 16000  # Recordings are resampled to the rate Whisper expects
+        self.input_device = self.config["input_device"]
+        self.level_meter = LevelMeter()
+        # Optional high-pass, noise gate and gain control, applied block by block while recording
+        self.audio_conditioner = None
+        audio_processing = self.config["audio_processing"]
+        if audio_processing["enabled"]:
+            self.audio_conditioner = AudioConditioner(
+                self.sample_rate,
+                high_pass_hz=audio_processing["high_pass_hz"],
+                noise_reduction_db=audio_processing["noise_reduction_db"],
+                target_dbfs=audio_processing["target_dbfs"],
+                max_gain_db=audio_processing["max_gain_db"],
+            )
+        # The conditioner the current recording started with, an edit of config.json may replace audio_conditioner meanwhile
+        self._recording_conditioner = None
+        # Tints the recording icon with the microphone level
+        self.level_timer = QTimer()
+        self.level_timer.timeout.connect(self.update_level_icon)
         self.last_trigger_time = 0
         self.trigger_cooldown = 0.3
         # Create the dialog but don't show it yet
         self.dialog = SetNewRecordingShortcut()
+        # Transcript history, written in the background and searchable from the tray or its hotkey
+        self.history = None
+        self.history_picker = None
+        if self.config["history"]["enabled"]:
+            app_data_dir = Path(self.models_dir).parent
+            audio_dir = app_data_dir / "history_audio" if self.config["history"]["save_audio"] else None
+            try:
+                self.history = TranscriptHistory(app_data_dir / "history.sqlite3", audio_dir=audio_dir)
+                self.history_picker = HistoryPicker(self.history, self.paste_history_entry)
+            except Exception as e:
+                print(f"Transcript history disabled: {e}")
+        # Prompt assembly from the template, a vocabulary file and recent transcriptions
+        prompt_context = self.config["prompt_context"]
+        vocabulary_file = prompt_context["vocabulary_file"]
+        self.prompt_builder = PromptBuilder(
+            vocabulary_file=self.config_file.resolve().parent / vocabulary_file if vocabulary_file else None,
+            recent_count=prompt_context["recent_transcripts"],
+            max_tokens=prompt_context["max_tokens"],
+        )
+        if self.history and self.prompt_builder.recent_count:
+            for row in reversed(self.history.search("", limit=self.prompt_builder.recent_count)):
+                self.prompt_builder.add_transcript(row["text"], row["language"])
+        # Used when the language is "auto", skips detection while one language clearly dominates
+        language_detection = self.config["language_detection"]
+        self.language_detector = LanguageDetector(
+            [lang_obj["code"] for lang_obj in self.available_languages],
+            window_seconds=language_detection["window_seconds"],
+            history_size=language_detection["history"],
+            skip_confidence=language_detection["skip_confidence"],
+            verify_every=language_detection["verify_every"],
+        )
+        if self.history:
+            for row in reversed(self.history.search("", limit=language_detection["history"])):
+                self.language_detector.observe(row["language"])
         self.model = None
         self.model_loader = None
+        # Small model kept resident next to the main one in two-pass mode
+        self.draft_model = None
+        self.draft_model_name = None
+        self.draft_loader = None
+        # The draft is decoded here while the final pass runs on the transcription thread
+        self.draft_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="DraftDecode")
+        # Recordings are started and stopped here in hotkey order, opening the stream and playing the cues would block the keyboard hook
+        self.recording_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="Recording")
+        # Smaller model kept warm while the latency controller has stepped down, see create_latency_controller
+        self.fallback_model = None
+        self.fallback_model_name = None
+        self.fallback_loader = None
+        # Models of profiles that use another model than the main one, loaded on their first use and kept resident
+        self.profile_models = {}
+        self.profile_loaders = {}
+        self.latency_controller = self.create_latency_controller(self.config["latency_slo"])
+        # Splits long recordings at pauses and decodes the pieces concurrently, the model is loaded with one worker per thread
+        self.parallel_decoder = self.create_parallel_decoder(self.config["parallel_decoding"])
+        self.decode_guards = self.create_decode_guards(self.config["decode_guards"])
+        # None while the full model is resident, "unloaded" or "fallback" after the idle policy kicked in
+        self.model_idle_state = None
+        self.loading_idle_fallback = False
+        # Set when a recording needs the full model while the idle fallback is still loading
+        self.reload_after_fallback = False
+        self.last_activity_time = time.time()
+        self.metrics = Metrics()
+        # Opt-in span timers and stack sampling per dictation, see the "Performance Timeline" in the tray
+        profiling = self.config["profiling"]
+        self.profiler = Profiler(
+            enabled=profiling["enabled"],
+            sample_interval=profiling["sample_interval_ms"] / 1000,
+            keep=profiling["keep_dictations"],
+        )
+        self.timeline_viewer = None
+        self.gui_invoker = MainThreadInvoker()
         self.auto_paste = self.config["auto_paste"]
+        # How text is delivered, see output_sinks. Older configs only have auto_paste.
+        self.output_sink = self.config.get("output_sink") or ("paste" if self.auto_paste else "clipboard")
         self.setup_listener()
         self.create_tray_icon()
+        # Apply edits of config.json without a restart
+        self.config_store.changed.connect(self.apply_config_changes)
         # Start loading animation
-        self.loading_thread.start()
+        self.loading_animation.start()
         # Setup signal handling. This is used to handle the Ctrl+C signal.
         signal.signal(signal.SIGINT, lambda x, y: self.handle_sigint())
         # Create timer to check for signals
         self.check_timer = QTimer()
         self.check_timer.timeout.connect(self.check_signal)
         self.check_timer.start(500)  # Check every 500ms
-        # Load model after everything else is setup
+        # Periodically check whether the model has been idle long enough to release it
+        self.idle_timer = QTimer()
+        self.idle_timer.timeout.connect(self.check_idle)
+        self.idle_timer.start(30000)
+        if self.current_model != self.config["model"]:
+            self.save_config()  # Started with --model
+        # Run by start, once this launch is known to be the only instance
+        self.startup_command = command
+
+    def start(self):
+        """Load the model and run the command line of this launch, after everything else is set up."""
         self.load_whisper_model()
-        self.transcribing = False
+        if self.startup_command:
+            print(self.handle_instance_command(self.startup_command))
+            self.startup_command = None
+
+    def handle_instance_command(self, command):
+        """Run a command from the command line of this or a later launch, returns the reply printed by that launch."""
+        action = command.get("action")
+        # Slow work is scheduled, so the launch that sent the command can exit right away
+        if action == "show_menu":
+            QTimer.singleShot(0, lambda: self.tray.contextMenu().popup(QCursor.pos()))
+            return "Showing the tray menu"
+        if action == "model":
+            name = command.get("model")
+            if name not in self.available_models:
+                return f"Unknown model {name}, available: {', '.join(self.available_models)}"
+            if self.model_loader and self.model_loader.isRunning():
+                return "A model is being loaded, try again when it is ready"
+            QTimer.singleShot(0, lambda: self.change_model(name))
+            return f"Switching to {name}"
+        if action == "transcribe":
+            path = Path(command.get("path", ""))
+            if not path.is_file():
+                return f"File not found: {path}"
+            QTimer.singleShot(0, lambda: self.transcribe_file(path, command.get("profile")))
+            return f"Transcribing {path.name}, the text is delivered like a dictation"
+        return f"Unknown command {action}"
+
+    def transcribe_file(self, path, profile_name=None):
+        """Transcribe an audio file with the settings of a dictation, any format ffmpeg can read."""
+        profile = self.resolve_profile(profile_name)
+        profile["trace"] = self.profiler.begin(f"{time.strftime('%H:%M:%S')} {path.name}")
+        self.wake_model(profile["model"], count=False)
+        # The path is queued like a recording, the file is decoded on the transcription thread
+        if not self.model_for(profile["model"]):
+            self.pending_recordings.append((path, profile))
+            print(f"Model not loaded yet - queued {path.name} ({len(self.pending_recordings)} pending)")
+            return
+        self.submit_transcription(path, profile)
 
     def handle_sigint(self):
         print("Caught Ctrl+C, closing application...")
@@ -175,60 +460,6 @@ class HotkeyApp:
         # This method is called periodically to allow signal processing
         self.check_timer.start(500)  # Restart timer
 
-    def load_config(self):
-        default_config = {
-            "sound_settings": {
-                "start_record": True,
-                "stop_record": True,
-                "transcription_done": True,
-                "transcription_empty": True,
-            },
-            "auto_paste": True,
-            "available_languages": [
-                {"code": "de", "name": "German"},
-                {"code": "en", "name": "English"},
-                {"code": "fr", "name": "French"},
-            ],
-            "language": "en",
-            "model": "tiny",
-            "device_mode": "cuda",
-            "cuda_device": 0,
-            "available_models": [
-                "tiny",
-                "tiny.en",
-                "base",
-                "base.en",
-                "small",
-                "small.en",
-                "distil-small.en",
-                "medium",
-                "medium.en",
-                "distil-medium.en",
-                "large-v1",
-                "large-v2",
-                "large-v3",
-                "large",
-                "distil-large-v2",
-                "distil-large-v3",
-                "large-v3-turbo",
-                "turbo",
-            ],
-            "hotkey": {"ctrl", "shift", "space"},
-            "initial_prompt": "The following is a transcription of spoken {language}:",
-        }
-        if self.config_file.exists():
-            with open(self.config_file, "r") as f:
-                try:
-                    config = json.load(f)
-                    # Convert hotkey list back to set if it exists
-                    if "hotkey" in config:
-                        config["hotkey"] = set(config["hotkey"])
-                    # Merge with defaults to ensure all required keys exist
-                    return {**default_config, **config}
-                except json.JSONDecodeError:
-                    return default_config
-        return default_config
-
     def save_config(self):
         config = {
             "hotkey": list(self.hotkey),  # Convert set to list for JSON
@@ -237,21 +468,112 @@ class HotkeyApp:
             "device_mode": self.device_mode,
             "cuda_device": self.cuda_device if self.device_mode == "cuda" else 0,
             "available_languages": self.available_languages,
-            "initial_prompt": self.initial_prompt.format(language=self.current_language),
+            "available_models": self.available_models,
+            "initial_prompt": self.initial_prompt,
             "auto_paste": self.auto_paste,  # Add auto-paste setting
-            "sound_settings": self.config.get(
-                "sound_settings",
-                {
-                    "start_record": True,
-                    "stop_record": True,
-                    "transcription_done": True,
-                    "transcription_empty": True,
-                },
-            ),
+            "output_sink": self.output_sink,
+            "sound_settings": self.config["sound_settings"],
+            "idle_unload": self.config["idle_unload"],
+            "sound_volume": self.config["sound_volume"],
+            "mute_input_during_cues": self.config["mute_input_during_cues"],
+            "history": self.config["history"],
+            "language_detection": self.config["language_detection"],
+            "prompt_context": self.config["prompt_context"],
+            "hotkey_mode": self.config["hotkey_mode"],
+            "input_device": self.input_device,
+            "audio_processing": self.config["audio_processing"],
+            "parallel_decoding": self.config["parallel_decoding"],
+            "decode_guards": self.config["decode_guards"],
+            "latency_slo": self.config["latency_slo"],
+            "two_pass": self.config["two_pass"],
+            "profiling": self.config["profiling"],
+            "bindings": self.config["bindings"],
+            "profiles": self.config["profiles"],
         }
-        # debug print the initial prompt
-        with open(self.config_file, "w") as f:
-            json.dump(config, f)
+        # Written in the background after a short quiet period, see ConfigStore
+        self.config_store.save(config)
+
+    def apply_config_changes(self, config, keys):
+        """Apply an external edit of config.json, only the parts affected by the changed keys."""
+        self.config = config
+        if keys & {"hotkey", "hotkey_mode", "bindings", "profiles", "history"}:
+            self.hotkey = config["hotkey"]
+            self.hotkey_engine.set_bindings(self.build_hotkey_bindings())
+        if "available_languages" in keys:
+            self.available_languages = config["available_languages"]
+            self.language_detector.candidates = [lang_obj["code"] for lang_obj in self.available_languages]
+        if "language_detection" in keys:
+            language_detection = config["language_detection"]
+            self.language_detector.window_seconds = language_detection["window_seconds"]
+            self.language_detector.skip_confidence = language_detection["skip_confidence"]
+            self.language_detector.verify_every = language_detection["verify_every"]
+        if "prompt_context" in keys:
+            prompt_context = config["prompt_context"]
+            vocabulary_file = prompt_context["vocabulary_file"]
+            self.prompt_builder.vocabulary_file = self.config_file.resolve().parent / vocabulary_file if vocabulary_file else None
+            self.prompt_builder.recent_count = prompt_context["recent_transcripts"]
+            self.prompt_builder.max_tokens = min(prompt_context["max_tokens"], MAX_PROMPT_TOKENS)
+        if "decode_guards" in keys:
+            self.decode_guards = self.create_decode_guards(config["decode_guards"])
+        if "latency_slo" in keys:
+            self.latency_controller = self.create_latency_controller(config["latency_slo"])
+            self.unload_fallback_model()
+        if "audio_processing" in keys:
+            audio_processing = config["audio_processing"]
+            self.audio_conditioner = None
+            if audio_processing["enabled"]:
+                self.audio_conditioner = AudioConditioner(
+                    self.sample_rate,
+                    high_pass_hz=audio_processing["high_pass_hz"],
+                    noise_reduction_db=audio_processing["noise_reduction_db"],
+                    target_dbfs=audio_processing["target_dbfs"],
+                    max_gain_db=audio_processing["max_gain_db"],
+                )
+        self.current_language = config["language"]
+        self.initial_prompt = config["initial_prompt"]
+        self.available_models = config["available_models"]
+        self.input_device = config["input_device"]
+        self.auto_paste = config["auto_paste"]
+        self.output_sink = config.get("output_sink") or ("paste" if self.auto_paste else "clipboard")
+        self.sound_player.volume = config["sound_volume"]
+        workers_changed = False
+        if "parallel_decoding" in keys:
+            # Before any model reload below, so that one already uses the new worker count
+            old_workers = self.parallel_decoder.num_workers if self.parallel_decoder else 1
+            if self.parallel_decoder:
+                # A long recording may be decoding on it right now, let its chunks finish
+                self.parallel_decoder.shutdown(cancel=False)
+            self.parallel_decoder = self.create_parallel_decoder(config["parallel_decoding"])
+            workers_changed = (self.parallel_decoder.num_workers if self.parallel_decoder else 1) != old_workers
+        # Only reload the model if the model or the device actually changed
+        if "model" in keys and config["model"] != self.current_model:
+            self.change_model(config["model"])
+        if keys & {"device_mode", "cuda_device"}:
+            device_mode = config["device_mode"] if self.cuda_device_count > 0 else "cpu"
+            cuda_device = config["cuda_device"] if config["cuda_device"] < self.cuda_device_count else 0
+            self.change_device_mode(device_mode, cuda_device)
+        if workers_changed and self.model and not self.model_idle_state and not (self.model_loader and self.model_loader.isRunning()):
+            # The model runs as many transcribe calls at once as it was loaded with
+            print(f"Reloading {self.current_model} for {self.parallel_decoder.num_workers if self.parallel_decoder else 1} parallel decoding worker(s)")
+            self.loading_animation.start()
+            self.load_whisper_model()
+        if "two_pass" in keys:
+            if config["two_pass"]["enabled"]:
+                self.load_draft_model()
+            else:
+                self.unload_draft_model()
+        if "available_models" in keys:
+            self.populate_model_menu()
+        if "profiling" in keys:
+            profiling = config["profiling"]
+            self.profiler.enabled = profiling["enabled"]
+            self.profiler.sample_interval = profiling["sample_interval_ms"] / 1000
+            self.profiler.set_keep(profiling["keep_dictations"])
+            self.profiling_action.setChecked(profiling["enabled"])
+        if "sound_settings" in keys:
+            for sound_type, action in self.sound_actions.items():
+                action.setChecked(config["sound_settings"][sound_type])
+        self.update_tray_menu()
 
     def save_hotkey(self):
         # Update to use save_config instead
@@ -259,23 +581,28 @@ class HotkeyApp:
 
     def on_press(self, key):
         try:
+            # Lets a two-pass draft notice that the user typed after it was delivered
+            note_key_press()
             # Get standardized key representation
-            key_str = self._get_key_string(key)
+            key_str = normalize_key(key)
             if not key_str:
                 return
             if self.recording_hotkey and self.dialog:
                 # If all keys were released and we're pressing a new key (excluding mouse buttons),
                 # clear the temp hotkey
-                if len(self.pressed_keys) == 0 and key_str not in ["mouse1", "mouse2"]:
+                if not self.hotkey_engine.any_pressed() and key_str not in ["mouse1", "mouse2"]:
                     self.temp_hotkey.clear()
                 # Handle hotkey recording mode
                 self.temp_hotkey.add(key_str)
-                self.pressed_keys.add(key_str)  # Also track in pressed_keys during recording
+                self.hotkey_engine.press(key_str)  # Also track pressed keys during recording
                 self.dialog.hotkey_display.setText(" + ".join(sorted(self.temp_hotkey)))
             else:
-                # Normal operation mode
-                self.pressed_keys.add(key_str)
-                self._check_hotkey()
+                # Normal operation mode, trigger if the pressed keys match a binding exactly
+                binding = self.hotkey_engine.press(key_str)
+                if binding and binding.mode == "history":
+                    self.gui_invoker.invoke.emit(self.show_history)
+                elif binding:
+                    self.submit_recording_action(self.trigger_action, binding)
         except Exception as e:
             print(f"Error in on_press: {str(e)}")
             import traceback
@@ -284,74 +611,44 @@ class HotkeyApp:
 
     def on_release(self, key):
         try:
-            key_str = self._get_key_string(key)
+            key_str = normalize_key(key)
             if not key_str:
                 return
-            # Remove from pressed keys
-            self.pressed_keys.discard(key_str)
+            # Remove from pressed keys, releasing a hold-to-talk chord ends the recording
+            if self.hotkey_engine.release(key_str):
+                self.submit_recording_action(self.release_recording)
             # During recording, we don't remove from temp_hotkey on release
             # This allows building multi-key combinations
         except Exception as e:
             print(f"Error in on_release: {e}")
 
-    def _get_key_string(self, key):
-        """Convert a key to a standardized string representation."""
-        # Handle special keys first
-        if hasattr(key, "name"):
-            key_str = str(key).lower()
-            # Map special keys more precisely
-            key_map = {
-                "key.shift": "shift",
-                "key.shift_l": "shift",
-                "key.shift_r": "shift",
-                "key.ctrl": "ctrl",
-                "key.ctrl_l": "ctrl",
-                "key.ctrl_r": "ctrl",
-                "key.alt": "alt",
-                "key.alt_l": "alt",
-                "key.alt_r": "alt",
-            }
-            mapped_key = key_map.get(key_str)
-            if mapped_key:
-                return mapped_key
-            # For other special keys, remove 'key.' prefix
-            return key_str.replace("key.", "")
-        # Handle letters and numbers
-        if hasattr(key, "vk") and ((65 <= key.vk <= 90) or (48 <= key.vk <= 57)):  # A-Z or 0-9
-            return chr(key.vk).lower()  # Convert to lowercase for consistency
-        # Handle normal characters as fallback
-        if hasattr(key, "char") and key.char:
-            if key.char.isprintable():  # Only handle printable characters
-                return key.char.lower()  # Convert to lowercase for consistency
-        return None
-
-    def _check_hotkey(self):
-        """Check if the current pressed keys match the hotkey exactly."""
-        if not self.hotkey:
-            return
-        # Only trigger if:
-        # 1. The number of pressed keys exactly matches the hotkey
-        # 2. All required hotkey keys are present in pressed_keys
-        # 3. At least one non-modifier key is in the hotkey (to prevent triggering on just modifiers)
-        modifier_keys = {"ctrl", "shift", "alt"}
-        has_non_modifier = any(key not in modifier_keys for key in self.hotkey)
-        if len(self.pressed_keys) == len(self.hotkey) and self.pressed_keys == self.hotkey and has_non_modifier:
-            self.trigger_action()
+    def submit_recording_action(self, func, *args):
+        """Run a recording start or stop on the recording worker, so the keyboard listener thread returns right away."""
+
+        def run():
+            try:
+                func(*args)
+            except Exception as e:
+                print(f"Error in recording action: {e}")
+                import traceback
+
+                traceback.print_exc()
+
+        self.recording_executor.submit(run)
+
+    def release_recording(self):
+        # Checked on the worker, a start submitted just before the release may not have run yet
+        if self.is_recording:
+            print("[Hotkey Released] Stopping recording...")
+            self.stop_recording()
 
     def play_sound(self, sound_name):
         """Play a sound asynchronously."""
         # Check if sound is enabled in settings
-        if not self.config["sound_settings"].get(sound_name, True):
+        if not self.config["sound_settings"][sound_name]:
             return
         # Play sound asynchronously
-        if sound_name in self.sound_files:
-            sound_file = str(Path(self.sound_files[sound_name]).resolve())
-            if Path(sound_file).exists():
-                winsound.PlaySound(sound_file, winsound.SND_FILENAME | winsound.SND_ASYNC)
-            else:
-                print(f"Error: Sound file not found: {sound_file}")
-        else:
-            print(f"Warning: Sound '{sound_name}' not found in sound_files")
+        self.sound_player.play(sound_name)
 
     def setup_listener(self):
         if self.listener:
@@ -359,113 +656,476 @@ class HotkeyApp:
         self.listener = keyboard.Listener(on_press=self.on_press, on_release=self.on_release)
         self.listener.start()
 
-    def start_recording(self):
+    def build_hotkey_bindings(self):
+        """The tray hotkey followed by the extra bindings from the config."""
+        bindings = [HotkeyBinding(self.hotkey, mode=self.config["hotkey_mode"])]
+        for entry in self.config["bindings"]:
+            profile = entry.get("profile")
+            if profile is not None and profile not in self.config["profiles"]:
+                print(f"Ignoring hotkey {entry.get('keys')}: unknown profile '{profile}'")
+                continue
+            bindings.append(HotkeyBinding(entry.get("keys", []), mode=entry.get("mode", "toggle"), profile=profile))
+        history_hotkey = self.config["history"]["hotkey"]
+        if self.config["history"]["enabled"] and history_hotkey:
+            bindings.append(HotkeyBinding(history_hotkey, mode="history"))
+        return bindings
+
+    def resolve_profile(self, name=None):
+        """Settings a recording uses: the tray settings, overridden by the named profile from the config."""
+        profile = {
+            "name": name,
+            "model": self.current_model,
+            "language": self.current_language,
+            "initial_prompt": self.initial_prompt,
+            "beam_size": 5,
+            "output_sink": self.output_sink,
+        }
+        if name:
+            overrides = self.config["profiles"].get(name, {})
+            profile.update(overrides)
+            if "auto_paste" in overrides and "output_sink" not in overrides:
+                profile["output_sink"] = "paste" if overrides["auto_paste"] else "clipboard"
+        return profile
+
+    def start_recording(self, profile_name=None):
         self.recording_data = []
         self.is_recording = True
-        # Show red circle while recording
-        self.tray.setIcon(self.red_circle_icon)
+        self.recording_profile = self.resolve_profile(profile_name)
+        # The trace travels with the profile to the transcription thread
+        trace = self.profiler.begin(f"{time.strftime('%H:%M:%S')} {self.recording_profile['model']}")
+        self.recording_profile["trace"] = trace
+        self.wake_model(self.recording_profile["model"])
+        # Show red circle while recording. Runs on the recording worker, the tray is only touched on the GUI thread.
+        self.gui_invoker.invoke.emit(lambda: self.set_tray_icon(self.red_circle_icon))
         # Play start sound
-        self.play_sound("start_record")
-
-        def callback(indata, frames, time, status):
+        with self.profiler.span("play_sound", trace, sound="start_record"):
+            self.play_sound("start_record")
+
+        mute_cues = self.config["mute_input_during_cues"]
+        # Record at the device's own rate and channel count, many microphones don't support 16 kHz mono
+        with self.profiler.span("resolve_input_device", trace):
+            device, native_rate, channels = resolve_input_device(self.input_device)
+        self.resampler = StreamingResampler(native_rate, self.sample_rate)
+        self.level_meter.reset()
+        conditioner = self._recording_conditioner = self.audio_conditioner
+        if conditioner:
+            conditioner.reset()
+
+        def callback(indata, frames, time_info, status):
             if self.is_recording:
-                self.recording_data.append(indata.copy())
+                block = self.resampler.process(indata)
+                self.level_meter.update(block)
+                # Keep the cues out of the recording if the microphone picks them up, only the samples captured while one was heard
+                if mute_cues:
+                    self.sound_player.silence_cues(block, capture_time(time_info, frames, native_rate), self.sample_rate)
+                if conditioner:
+                    block = conditioner.process(block)
+                self.recording_data.append(block)
 
         # Start recording stream
-        self.stream = sd.InputStream(samplerate=self.sample_rate, channels=1, callback=callback)
-        self.stream.start()
+        with self.profiler.span("stream_start", trace, device=device, samplerate=native_rate, channels=channels):
+            self.stream = sd.InputStream(device=device, samplerate=native_rate, channels=channels, dtype="float32", callback=callback)
+            self.stream.start()
+        self.gui_invoker.invoke.emit(lambda: self.level_timer.start(100))
+
+    def update_level_icon(self):
+        if not self.is_recording:
+            self.level_timer.stop()
+            return
+        # A few brightness steps are enough, each one is rendered once and cached
+        step = round(self.level_meter.fraction() * 5)
+        self.set_tray_icon(circle_icon((135 + step * 24, 0, 0)))
 
     def stop_recording(self):
         if not self.is_recording:
             return
         self.is_recording = False
-        self.stream.stop()
-        self.stream.close()
+        trace = self.recording_profile.get("trace")
+        with self.profiler.span("stream_stop", trace):
+            self.stream.stop()
+            self.stream.close()
+        # Samples still held back by the resampling filter
+        tail = self.resampler.flush()
+        # Through the conditioner that processed the rest of the recording, it holds back the end of it
+        conditioner = self._recording_conditioner
+        self._recording_conditioner = None
+        if conditioner:
+            tail = np.concatenate((conditioner.process(tail), conditioner.flush()))
+        self.recording_data.append(tail)
         # Clear any pressed keys
-        self.pressed_keys.clear()
+        self.hotkey_engine.clear()
         # Play stop recording sound
-        self.play_sound("stop_record")
-        # Check if model is loaded
-        if not self.model:
-            print("Cannot transcribe - model not loaded yet")
-            # Set default gray square icon since we're not transcribing
-            self.tray.setIcon(self.gray_icon)
-            return
-        # Set blue circle for transcription
+        with self.profiler.span("play_sound", trace, sound="stop_record"):
+            self.play_sound("stop_record")
+        if not sum(len(block) for block in self.recording_data):
+            self.gui_invoker.invoke.emit(lambda: self.set_tray_icon(self.gray_icon))
+            self.profiler.end(trace)
+            return
+        # Combine all chunks
+        with self.profiler.span("concatenate", trace, blocks=len(self.recording_data)):
+            audio_data = np.concatenate(self.recording_data, axis=0)
+        self.recording_data = []
+        # Check if the profile's model is loaded
+        if not self.model_for(self.recording_profile["model"]):
+            # Keep the recording until the loader finishes, it is transcribed in on_model_loaded
+            self.pending_recordings.append((audio_data, self.recording_profile))
+            print(f"Model not loaded yet - queued recording ({len(self.pending_recordings)} pending)")
+            self.gui_invoker.invoke.emit(lambda: self.set_tray_icon(self.gray_icon))
+            self.gui_invoker.invoke.emit(self.update_tray_menu)
+            return
+        self.submit_transcription(audio_data, self.recording_profile)
+
+    def submit_transcription(self, audio_data, profile):
+        # Set blue circle for transcription, through the GUI thread as stop_recording calls this on the recording worker.
+        # Posted before the job is submitted, so it can't arrive after on_transcription_queue_empty restores the icon.
         self.transcribing = True
-        self.tray.setIcon(self.blue_circle_icon)
+        self.gui_invoker.invoke.emit(lambda: self.set_tray_icon(self.blue_circle_icon))
+        self.gui_invoker.invoke.emit(self.update_tray_menu)
+        self.transcribing_thread.submit(audio_data, profile)
 
-        self.update_tray_menu()
-        # Process the recording
-        if self.recording_data:
+    def transcribe_recording(self, audio_data, profile):
+        """Transcribe one recording (or audio file) with the profile it was recorded with. Runs on the transcription thread."""
+        if isinstance(audio_data, Path):
             try:
-                # Combine all chunks
-                audio_data = np.concatenate(self.recording_data, axis=0)
-                # Calculate audio length in seconds
-                audio_length = len(audio_data) / self.sample_rate
-                # Save to temporary file
-                with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_file:
-                    write_wav(temp_file.name, self.sample_rate, audio_data)
-                    # Transcribe
-                    print(f"Transcribing {audio_length:.1f} seconds of audio...")
-                    segments, info = self.model.transcribe(
-                        temp_file.name,
-                        beam_size=5,
-                        language=self.current_language,
-                        initial_prompt=self.initial_prompt.format(language=self.current_language),
-                    )
-                    # Combine all segments
-                    transcription = " ".join([segment.text for segment in segments])
-                    # Copy to clipboard
-                    pyperclip.copy(transcription)
-                    # Auto-paste if enabled
-                    if self.auto_paste:
-                        keyboard.Controller().press(keyboard.Key.ctrl)
-                        keyboard.Controller().press("v")
-                        keyboard.Controller().release("v")
-                        keyboard.Controller().release(keyboard.Key.ctrl)
-                    # Print to console
-                    print("Transcription:")
-                    print(transcription)
-                    print(f"Language: {info.language} (confidence: {info.language_probability:.2%})")
-                    print("(Copied to clipboard)")
-                    # Play appropriate sound based on transcription content
-                    if transcription.strip():
-                        self.play_sound("transcription_done")
-                    else:
-                        self.play_sound("transcription_empty")
+                with self.profiler.span("decode_audio_file", profile.get("trace")):
+                    audio_data = decode_audio(str(audio_data), sampling_rate=self.sample_rate)
             except Exception as e:
-                print(f"Error during transcription: {e}")
-            finally:
-                # Always restore default icon
-                self.transcribing = False
-                self.tray.setIcon(self.gray_icon)
-                self.update_tray_menu()
-
-    def trigger_action(self):
+                print(f"Could not read {audio_data}: {e}")
+                self.profiler.end(profile.get("trace"))
+                return ""
+        model = self.model_for(profile["model"])
+        if not model:
+            # The model was switched or released after the recording was submitted, wait for its next load
+            self.pending_recordings.append((audio_data, profile))
+            return ""
+        if self.latency_controller:
+            # Faster settings while recent dictations missed the latency target
+            fallback_model, fallback_model_name = self.fallback_model, self.fallback_model_name
+            profile = self.latency_controller.adjust(profile, fallback_model_name if fallback_model else None)
+            if fallback_model and profile["model"] == fallback_model_name:
+                model = fallback_model
+        trace = profile.get("trace")
+        try:
+            return self._transcribe(model, audio_data, profile, trace)
+        finally:
+            self.profiler.end(trace)
+
+    def _transcribe(self, model, audio_data, profile, trace):
+        start_time = time.perf_counter()
+        # Calculate audio length in seconds
+        audio_length = len(audio_data) / self.sample_rate
+        language = profile["language"]
+        if language == "auto":
+            with self.profiler.span("language_detection", trace):
+                language = self.detect_language(model, audio_data)
+        # Two-pass mode delivers a draft from the small model first, unless the recording already uses it
+        draft_model = self.draft_model if self.config["two_pass"]["enabled"] and profile["model"] != self.draft_model_name else None
+        # Transcribe
+        print(f"Transcribing {audio_length:.1f} seconds of audio...")
+        sink = create_output_sink(profile["output_sink"])
+        if draft_model:
+            # Both passes run at the same time, so the draft doesn't hold up the final text
+            draft_future = self.draft_executor.submit(self.deliver_draft, draft_model, audio_data, language, profile, trace, sink, start_time)
+            transcription, info, last_segment_time = self.decode_segments(model, audio_data, language, profile, trace)
+            wait_start = time.perf_counter()
+            draft = draft_future.result()
+            # Only above zero when the draft took longer than the final pass
+            self.metrics.record("final_wait_for_draft_seconds", time.perf_counter() - wait_start)
+            with self.profiler.span("output", trace, sink=sink.name):
+                if draft is None:
+                    sink.finish(transcription)
+                else:
+                    self.replace_draft(sink, draft, transcription)
+        else:
+            transcription, info, last_segment_time = self.decode_segments(model, audio_data, language, profile, trace, sink=sink)
+            with self.profiler.span("output", trace, sink=sink.name):
+                sink.finish(transcription)
+        # Time from the final segment to the text being handed to the target application
+        self.metrics.record(f"output_latency_seconds.{sink.name}", time.perf_counter() - last_segment_time)
+        latency = time.perf_counter() - start_time
+        self.metrics.record("transcription_latency_seconds", latency)
+        if self.latency_controller:
+            self.observe_latency(audio_length, latency)
+        if draft_model:
+            self.metrics.record("final_latency_seconds", latency)
+        self.prompt_builder.add_transcript(transcription, info.language)
+        if transcription.strip():
+            self.language_detector.observe(info.language)
+        if self.history and transcription.strip():
+            with self.profiler.span("history_add", trace):
+                self.history.add(transcription, profile["model"], info.language, audio_length, latency, audio=audio_data, sample_rate=self.sample_rate)
+        # Print to console
+        print("Transcription:")
+        print(transcription)
+        print(f"Language: {info.language} (confidence: {info.language_probability:.2%})")
+        print(f"({sink.description})")
+        # Play appropriate sound based on transcription content
+        if transcription.strip():
+            self.play_sound("transcription_done")
+        else:
+            self.play_sound("transcription_empty")
+        return transcription
+
+    def create_latency_controller(self, settings):
+        """LatencyController from the latency_slo config, None while disabled."""
+        if not settings["enabled"]:
+            return None
+        return LatencyController(
+            target_seconds=settings["target_seconds"],
+            pct=settings["percentile"],
+            max_clip_seconds=settings["max_clip_seconds"],
+            headroom=settings["headroom"],
+            # Without a fallback model, greedy decoding is the fastest level
+            max_level=2 if settings["fallback_model"] else 1,
+            log_path=Path(self.models_dir).parent / "latency_decisions.jsonl",
+        )
+
+    def observe_latency(self, audio_length, latency):
+        """Report a finished dictation to the latency controller, runs on the transcription thread."""
+        self.metrics.record("latency_level", self.latency_controller.level)
+        decision = self.latency_controller.observe(audio_length, latency)
+        if not decision:
+            return
+        self.metrics.increment("latency_controller_switches")
+        if decision[1] == "configured":
+            self.gui_invoker.invoke.emit(self.unload_fallback_model)
+        else:
+            # Warm the fallback model on the first step down, so it is ready if the next step is needed
+            self.gui_invoker.invoke.emit(self.load_fallback_model)
+
+    def create_parallel_decoder(self, settings):
+        if not settings["enabled"]:
+            return None
+        return ParallelDecoder(max(1, settings["num_workers"]))
+
+    def create_decode_guards(self, settings):
+        """DecodeGuards from the decode_guards config, None while disabled."""
+        if not settings["enabled"]:
+            return None
+        return DecodeGuards(
+            tokens_per_second=settings["tokens_per_second"],
+            max_fallbacks=settings["max_fallbacks"],
+            min_repeats=max(2, settings["min_repeats"]),
+        )
+
+    def decode_segments(self, model, audio_data, language, profile, trace, sink=None, beam_size=None, stage="final"):
+        """Run the model over a recording, passing each segment to `sink` as soon as it is decoded."""
+        parallel = self.config["parallel_decoding"]
+        parallel_decoder = self.parallel_decoder
+        if parallel_decoder and stage == "final" and len(audio_data) >= parallel["min_seconds"] * self.sample_rate:
+            return self.decode_parallel(parallel_decoder, model, audio_data, language, profile, trace, sink)
+        # A copy per decode, the guards keep per-decode state and the draft and final pass run at the same time
+        guards = copy.copy(self.decode_guards) if self.decode_guards else None
+        options = guards.options(len(audio_data) / self.sample_rate, timestamp_begin(model)) if guards else {}
+        # Feature extraction and VAD, encoding and decoding happen while iterating the segments
+        with self.profiler.span(f"transcribe_setup_{stage}", trace, beam_size=beam_size or profile["beam_size"]):
+            # The recording is passed as the 16 kHz float32 array Whisper expects, no WAV round trip on disk
+            segments, info = model.transcribe(
+                audio_data,
+                beam_size=beam_size or profile["beam_size"],
+                language=language,
+                initial_prompt=self.prompt_builder.build(profile["initial_prompt"], language, getattr(model, "hf_tokenizer", None)),
+                **options,
+            )
+        texts = []
+        last_segment_time = time.perf_counter()
+        with self.profiler.span(f"decode_{stage}", trace, audio_seconds=round(info.duration, 2)):
+            for segment in segments:
+                last_segment_time = time.perf_counter()
+                text, stop = guards.check_segment(segment) if guards else (segment.text, False)
+                if text:
+                    texts.append(text)
+                    if sink:
+                        sink.write_segment(text)
+                if stop:
+                    # Leaving the generator skips the remaining windows
+                    print(f"Stopped decoding at {segment.end:.1f}s of {info.duration:.1f}s, the transcription keeps repeating")
+                    break
+            else:
+                # Repeated segments held back by the guards, there were too few of them for a loop
+                text = guards.flush() if guards else ""
+                if text:
+                    texts.append(text)
+                    if sink:
+                        sink.write_segment(text)
+        if guards:
+            for name, count in guards.trips.items():
+                self.metrics.increment(f"decode_guard_{name}", count)
+        # Combine all segments
+        return " ".join(texts), info, last_segment_time
+
+    def decode_parallel(self, parallel_decoder, model, audio_data, language, profile, trace, sink=None):
+        """Decode a long recording as chunks split at pauses, concurrently on the parallel decoder's workers."""
+        with self.profiler.span("split_on_silence", trace):
+            chunks = split_on_silence(audio_data, self.sample_rate)
+        print(f"Decoding {len(chunks)} chunks on {parallel_decoder.num_workers} workers")
+        self.metrics.record("parallel_chunks", len(chunks))
+        # The chunks are decoded concurrently, so only the limits that apply per call are used, sized for the longest chunk
+        longest = max(end - start for start, end in chunks) / self.sample_rate
+        options = self.decode_guards.options(longest) if self.decode_guards else {}
+        with self.profiler.span("decode_parallel", trace, chunks=len(chunks), audio_seconds=round(len(audio_data) / self.sample_rate, 2)):
+            texts, info = parallel_decoder.transcribe(
+                model,
+                audio_data,
+                chunks,
+                on_chunk=sink.write_segment if sink else None,
+                beam_size=profile["beam_size"],
+                language=language,
+                initial_prompt=self.prompt_builder.build(profile["initial_prompt"], language, getattr(model, "hf_tokenizer", None)),
+                **options,
+            )
+        return " ".join(text for text in texts if text), info, time.perf_counter()
+
+    def deliver_draft(self, draft_model, audio_data, language, profile, trace, sink, start_time):
+        """Decode and deliver the two-pass draft on the draft worker, returns it or None if it failed."""
+        try:
+            draft, _, _ = self.decode_segments(draft_model, audio_data, language, profile, trace, sink=sink, beam_size=1, stage="draft")
+            with self.profiler.span("output_draft", trace, sink=sink.name):
+                sink.finish(draft)
+                sink.remember_target()
+        except Exception as e:
+            print(f"Draft transcription failed: {e}")
+            return None
+        self.metrics.record("draft_latency_seconds", time.perf_counter() - start_time)
+        print(f"Draft: {draft}")
+        return draft
+
+    def replace_draft(self, sink, draft, final):
+        """Swap the delivered draft for the final transcription, according to the two-pass replace policy."""
+        policy = self.config["two_pass"]["replace"]
+        if policy == "never" or final == draft:
+            self.metrics.increment("two_pass_kept")
+            return
+        if policy == "if_different" and " ".join(final.lower().split()) == " ".join(draft.lower().split()):
+            # Only whitespace or capitalization changed, not worth retyping
+            self.metrics.increment("two_pass_kept")
+            return
+        if not sink.replace(draft, final):
+            # Erasing now would hit whatever the user typed or focused since the draft arrived
+            print("Kept the draft, the user typed or switched windows since it was delivered")
+            self.metrics.increment("two_pass_replace_skipped")
+            return
+        self.metrics.increment("two_pass_replaced")
+
+    def detect_language(self, model, audio_data):
+        """Language for an "auto" recording, from the recent languages or a detection pass over its start."""
+        samples = audio_data[:, 0] if audio_data.ndim > 1 else audio_data
+        language, probability = self.language_detector.choose(model, samples, self.sample_rate)
+        if probability is None:
+            self.metrics.increment("language_detection_skipped")
+            # Count the typical cost of a detection pass as saved
+            typical_seconds = self.metrics.percentile("language_detection_seconds", 50)
+            if typical_seconds is not None:
+                self.metrics.increment("language_detection_saved_ms", round(typical_seconds * 1000))
+            print(f"Language: {language} (from recent recordings)")
+        else:
+            self.metrics.record("language_detection_seconds", self.language_detector.last_detection_seconds)
+            print(f"Detected language: {language} ({probability:.2%} in {self.language_detector.last_detection_seconds:.2f}s)")
+        self.gui_invoker.invoke.emit(self.update_tray_menu)
+        return language
+
+    def on_transcription_queue_empty(self):
+        # Always restore default icon
+        self.transcribing = False
+        if not self.is_recording:
+            self.set_tray_icon(self.gray_icon)
+        self.update_tray_menu()
+
+    def transcribe_pending_recordings(self):
+        """Submit the recordings that were made while their model was not loaded and now is."""
+        ready = [job for job in self.pending_recordings if self.model_for(job[1]["model"])]
+        if not ready:
+            return
+        print(f"Transcribing {len(ready)} queued recording(s)...")
+        self.keep_pending_recordings(lambda job: not self.model_for(job[1]["model"]))
+        for audio_data, profile in ready:
+            self.submit_transcription(audio_data, profile)
+
+    def keep_pending_recordings(self, keep):
+        """Drop the queued recordings `keep` returns False for (the deque can't remove tuples holding arrays)."""
+        kept = [job for job in self.pending_recordings if keep(job)]
+        self.pending_recordings.clear()
+        self.pending_recordings.extend(kept)
+
+    def model_for(self, model_name):
+        """The loaded model a recording with this model name is transcribed with, None while it is not loaded."""
+        if model_name == self.current_model:
+            return self.model
+        return self.profile_models.get(model_name)
+
+    def wake_model(self, model_name, count=True):
+        """Load the model of a recording in the background if it isn't resident, `count` it in the hotkey recording metrics."""
+        total = self.metrics.increment("recordings") if count else None
+        if model_name != self.current_model and model_name in self.profile_models:
+            return
+        if self.model and not self.model_idle_state and model_name == self.current_model:
+            return
+        if count:
+            cold = self.metrics.increment("recordings_cold_model")
+            print(f"Recording started with a cold model ({cold} of {total} recordings)")
+        # Load on the GUI thread so it overlaps with capture, keeping any reduced model usable meanwhile
+        self.gui_invoker.invoke.emit(lambda: self.preload_model(model_name))
+
+    def preload_model(self, model_name):
+        """Start the model load for a recording in progress, or hurry up the one already running."""
+        if model_name != self.current_model:
+            # The binding's profile uses another model, load it next to the main one without changing the setting
+            self.load_profile_model(model_name)
+        elif self.model_loader and self.model_loader.isRunning():
+            self.model_loader.setPriority(QThread.HighPriority)
+            if self.loading_idle_fallback:
+                # The reduced model is on its way, the full one is loaded right after it
+                self.reload_after_fallback = True
+        elif self.model_idle_state or not self.model:
+            self.load_whisper_model(keep_current=self.model_idle_state == "fallback")
+
+    def check_idle(self):
+        """Release the model (or demote it) after a period without hotkey presses."""
+        settings = self.config["idle_unload"]
+        if not settings["enabled"] or self.is_recording or self.transcribing:
+            return
+        if not self.model or self.model_idle_state:
+            return
+        if self.model_loader and self.model_loader.isRunning():
+            return
+        minutes = settings["minutes"]
+        if time.time() - self.last_activity_time < minutes * 60:
+            return
+        mode = settings["mode"]
+        if mode != "unload" and self.device_mode == "cpu":
+            # A CPU model already uses int8, there is nothing smaller to fall back to
+            return
+        print(f"Model idle for {minutes} minutes, releasing {self.current_model} ({mode})")
+        self.model = None
+        self.draft_model = None
+        self.fallback_model = None
+        self.profile_models.clear()
+        gc.collect()
+        if mode == "unload":
+            self.model_idle_state = "unloaded"
+            self.update_tray_menu()
+        else:
+            self.load_whisper_model(device_mode="cpu" if mode == "cpu" else self.device_mode, compute_type="int8", idle_fallback=True)
+
+    def trigger_action(self, binding):
         current_time = time.time()
         # Don't allow recording if hotkey dialog is open
         if self.dialog.isVisible():
             print("Cannot start recording while hotkey dialog is open")
             return
-        # Strict hotkey checking:
-        # 1. Must have exactly the same number of keys
-        # 2. Must contain ALL keys from the hotkey
-        # 3. Must not contain any extra keys
-        if len(self.pressed_keys) != len(self.hotkey) or not all(key in self.pressed_keys for key in self.hotkey) or not all(key in self.hotkey for key in self.pressed_keys):
-            return
         # Only apply cooldown when we're already recording to prevent accidental double-triggers
         if self.is_recording and current_time - self.last_trigger_time < self.trigger_cooldown:
             return
         self.last_trigger_time = current_time
-        self._last_trigger_keys = self.pressed_keys.copy()
+        self.last_activity_time = current_time
         if not self.is_recording:
             # Only start if we're not already recording or transcribing
             if self.transcribing:
                 print("[Hotkey Pressed] Cannot start recording while transcribing...")
                 return
-            print("[Hotkey Pressed] Starting recording...")
-            self.start_recording()
+            profile_info = f" (profile: {binding.profile})" if binding.profile else ""
+            print(f"[Hotkey Pressed] Starting recording{profile_info}...")
+            self.start_recording(binding.profile)
         else:
             print("[Hotkey Pressed] Stopping recording...")
             self.stop_recording()
@@ -504,6 +1164,7 @@ class HotkeyApp:
                     self.dialog.record_button.setText("Start Recording")
                     if self.temp_hotkey:
                         self.hotkey = self.temp_hotkey.copy()
+                        self.hotkey_engine.set_bindings(self.build_hotkey_bindings())
                         self.save_config()
                         self.update_tray_menu()
                         self.dialog.current_hotkey.setText(" + ".join(sorted(self.hotkey)))
@@ -582,56 +1243,158 @@ class HotkeyApp:
         shortcut_path = start_menu / "VibeHotkeyWindows" / "VibeHotkeyWindows.lnk"
         self.toggle_shortcut(shortcut_path, checked)
 
-    def load_whisper_model(self):
+    def load_whisper_model(self, device_mode=None, compute_type=None, idle_fallback=False, keep_current=False):
         if self.model_loader and self.model_loader.isRunning():
             return
-        self.model = None  # Clear current model while loading
+        if not keep_current:
+            self.model = None  # Clear current model while loading
+        device_mode = device_mode or self.device_mode
+        self.loading_idle_fallback = idle_fallback
+        # Parallel decoding needs a model that can run several transcribe calls at once
+        num_workers = self.parallel_decoder.num_workers if self.parallel_decoder else 1
         self.model_loader = ModelLoaderThread(
             self.current_model,
-            self.device_mode,
-            cuda_device=self.cuda_device if self.device_mode == "cuda" else 0,
+            device_mode,
+            cuda_device=self.cuda_device if device_mode == "cuda" else 0,
+            compute_type=compute_type,
+            num_workers=num_workers,
+            # Share the cores between the workers instead of each one using all of them
+            cpu_threads=max(1, (os.cpu_count() or 4) // num_workers) if device_mode == "cpu" and num_workers > 1 else 0,
         )
         # Pass models directory to ModelLoaderThread
         self.model_loader.models_dir = self.models_dir
+        self.model_loader.profiler = self.profiler
         self.model_loader.finished.connect(self.on_model_loaded)
         self.model_loader.error.connect(self.on_model_error)
         self.model_loader.progress.connect(self.on_model_progress)
         self.model_loader.start()
         # Update menu to show loading status
-        self.update_tray_menu("Loading...")
+        if not keep_current:
+            self.update_tray_menu("Loading...")
 
     def on_model_loaded(self, model):
         """Handle successful model loading."""
         try:
             self.model = model
-            # Always stop loading animation and clear reference
-            if self.loading_thread:
-                self.loading_thread.stop()
-                self.loading_thread = None
-            # Set final icon
-            self.tray.setIcon(self.gray_icon)
-            # Refresh the menu to update sizes after model download
-            if hasattr(self, "model_menu"):
-                old_menu = self.model_menu
-                new_menu = self.create_model_submenu(old_menu.parent())
-                old_menu.parent().insertMenu(old_menu.menuAction(), new_menu)
-                old_menu.parent().removeAction(old_menu.menuAction())
+            self.model_idle_state = "fallback" if self.loading_idle_fallback else None
+            self.last_activity_time = time.time()
+            # Always stop loading animation
+            self.loading_animation.stop()
+            # Set final icon, unless a background reload finished while recording or transcribing
+            if not self.is_recording and not self.transcribing:
+                self.set_tray_icon(self.gray_icon)
+            # Refresh the size of the model that may just have been downloaded
+            self.refresh_model_menu(invalidate=self.current_model)
             self.update_tray_menu()
+            self.transcribe_pending_recordings()
+            if self.loading_idle_fallback and self.reload_after_fallback:
+                # A recording woke the model while the reduced one was loading, now load the full one
+                self.reload_after_fallback = False
+                self.model_loader.wait()  # Only returns from run() after emitting finished
+                self.load_whisper_model(keep_current=True)
+            elif not self.loading_idle_fallback:
+                self.load_draft_model()
         except Exception as e:
             # Log any errors during cleanup
             with open("error.log", "a") as f:
                 f.write(f"Error in on_model_loaded: {str(e)}\n")
 
+    def load_draft_model(self):
+        """Load the two-pass draft model in the background, after the main model so that one comes first."""
+        settings = self.config["two_pass"]
+        name = settings["draft_model"]
+        if not settings["enabled"] or name == self.current_model:
+            return
+        if (self.draft_model and self.draft_model_name == name) or (self.draft_loader and self.draft_loader.isRunning()):
+            return
+        self.draft_model = None
+        self.draft_model_name = name
+        self.draft_loader = ModelLoaderThread(name, self.device_mode, cuda_device=self.cuda_device if self.device_mode == "cuda" else 0)
+        self.draft_loader.models_dir = self.models_dir
+        self.draft_loader.profiler = self.profiler
+        self.draft_loader.finished.connect(self.on_draft_model_loaded)
+        self.draft_loader.error.connect(lambda error: print(f"Draft model: {error}"))
+        self.draft_loader.start()
+
+    def on_draft_model_loaded(self, model):
+        if self.config["two_pass"]["enabled"]:
+            self.draft_model = model
+            print(f"Draft model {self.draft_model_name} loaded")
+
+    def unload_draft_model(self):
+        self.draft_model = None
+        gc.collect()
+
+    def load_fallback_model(self):
+        """Load the latency controller's fallback model in the background."""
+        name = self.config["latency_slo"]["fallback_model"]
+        if not self.latency_controller or not name or name == self.current_model:
+            return
+        if (self.fallback_model and self.fallback_model_name == name) or (self.fallback_loader and self.fallback_loader.isRunning()):
+            return
+        self.fallback_model = None
+        self.fallback_model_name = name
+        self.fallback_loader = ModelLoaderThread(name, self.device_mode, cuda_device=self.cuda_device if self.device_mode == "cuda" else 0)
+        self.fallback_loader.models_dir = self.models_dir
+        self.fallback_loader.profiler = self.profiler
+        self.fallback_loader.finished.connect(self.on_fallback_model_loaded)
+        self.fallback_loader.error.connect(lambda error: print(f"Fallback model: {error}"))
+        self.fallback_loader.start()
+
+    def on_fallback_model_loaded(self, model):
+        # The controller may have stepped back up while loading
+        if self.latency_controller and self.latency_controller.level > 0:
+            self.fallback_model = model
+            print(f"Fallback model {self.fallback_model_name} ready")
+
+    def unload_fallback_model(self):
+        if self.fallback_model is None:
+            return
+        self.fallback_model = None
+        gc.collect()
+
+    def load_profile_model(self, name):
+        """Load the model of a profile in the background, it stays resident for later recordings with that profile."""
+        if name in self.profile_models or (name in self.profile_loaders and self.profile_loaders[name].isRunning()):
+            return
+        print(f"Loading {name} for a profile, next to {self.current_model}")
+        loader = ModelLoaderThread(name, self.device_mode, cuda_device=self.cuda_device if self.device_mode == "cuda" else 0)
+        loader.models_dir = self.models_dir
+        loader.profiler = self.profiler
+        loader.finished.connect(lambda model, name=name: self.on_profile_model_loaded(name, model))
+        loader.error.connect(lambda error, name=name: self.on_profile_model_error(name, error))
+        self.profile_loaders[name] = loader
+        loader.start()
+
+    def on_profile_model_loaded(self, name, model):
+        self.profile_loaders.pop(name, None)
+        self.profile_models[name] = model
+        self.last_activity_time = time.time()
+        print(f"Profile model {name} loaded")
+        self.transcribe_pending_recordings()
+
+    def on_profile_model_error(self, name, error):
+        self.profile_loaders.pop(name, None)
+        print(f"Profile model {name}: {error}")
+        # Nothing will transcribe the recordings waiting for it
+        dropped = [job for job in self.pending_recordings if job[1]["model"] == name]
+        if dropped:
+            print(f"Discarding {len(dropped)} queued recording(s) for {name}")
+            self.keep_pending_recordings(lambda job: job[1]["model"] != name)
+            for _, profile in dropped:
+                self.profiler.end(profile.get("trace"))
+        self.update_tray_menu()
+
     def on_model_error(self, error):
         """Handle model loading errors."""
         try:
             self.model = None
-            # Always stop loading animation and clear reference
-            if self.loading_thread:
-                self.loading_thread.stop()
-                self.loading_thread = None
+            self.model_idle_state = None
+            self.reload_after_fallback = False
+            # Always stop loading animation
+            self.loading_animation.stop()
             # Set final icon
-            self.tray.setIcon(self.gray_icon)
+            self.set_tray_icon(self.gray_icon)
             self.update_tray_menu(f"Error: {error}")
             # Log the error
             with open("error.log", "a") as f:
@@ -653,21 +1416,15 @@ class HotkeyApp:
         if model_name != self.current_model:
             self.current_model = model_name
             self.save_config()  # Save when model changes
+            # An explicit choice of the user, start over with the configured settings
+            if self.latency_controller:
+                self.latency_controller.reset()
+                self.unload_fallback_model()
             self.model = None  # Clear current model
-            # Stop any existing loading animation
-            if self.loading_thread and self.loading_thread.isRunning():
-                self.loading_thread.stop()
-                self.loading_thread = None
-            # Create and start a new loading animation thread
-            self.loading_thread = LoadingIconThread()
-            self.loading_thread.update_icon.connect(self._update_tray_icon)
-            self.loading_thread.start()
-            # Recreate the model submenu to refresh sizes
-            if hasattr(self, "model_menu"):
-                old_menu = self.model_menu
-                new_menu = self.create_model_submenu(old_menu.parent())
-                old_menu.parent().insertMenu(old_menu.menuAction(), new_menu)
-                old_menu.parent().removeAction(old_menu.menuAction())
+            # Restart the shared loading animation
+            self.loading_animation.start()
+            # Move the check mark to the new model
+            self.refresh_model_menu()
             self.load_whisper_model()
 
     def create_model_submenu(self, parent_menu):
@@ -701,11 +1458,8 @@ class HotkeyApp:
 
                                 shutil.rmtree(model_path)
                                 print(f"Successfully deleted model {action.model_name}")
-                                # Refresh the menu to update sizes
-                                old_menu = self.app.model_menu
-                                new_menu = self.app.create_model_submenu(old_menu.parent())
-                                old_menu.parent().insertMenu(old_menu.menuAction(), new_menu)
-                                old_menu.parent().removeAction(old_menu.menuAction())
+                                # Refresh the size label of the deleted model
+                                self.app.refresh_model_menu(invalidate=action.model_name)
                             except Exception as e:
                                 print(f"Error deleting model: {e}")
                         else:
@@ -714,50 +1468,95 @@ class HotkeyApp:
                         return
                 super().mouseReleaseEvent(event)
 
-        model_menu = ModelMenu("Select Model", parent_menu, self)
-        model_group = QActionGroup(model_menu)
-        model_group.setExclusive(True)
+        self.model_menu = ModelMenu("Select Model", parent_menu, self)
+        self.model_group = QActionGroup(self.model_menu)
+        self.model_group.setExclusive(True)
+        self.model_actions = {}
+        self.populate_model_menu()
+        return self.model_menu
 
-        def get_model_dir_size(model_name):
-            """Get the size of the model directory if it exists."""
-            dir_name = f"models--Systran--faster-whisper-{model_name}"
-            model_path = Path(self.models_dir) / dir_name
-            if not model_path.exists():
-                return None
-            total_size = 0
-            for path in model_path.rglob("*"):
-                if path.is_file():
-                    total_size += path.stat().st_size
-            for unit in ["B", "KB", "MB", "GB"]:
-                if total_size < 1024:
-                    return f"{total_size:.1f} {unit}"
-                total_size /= 1024
-            return f"{total_size:.1f}TB"
+    def populate_model_menu(self):
+        """(Re)build the model actions from available_models, keeping the info label on top."""
 
         class ModelAction(QAction):
             def __init__(self, text, parent, model_name):
                 super().__init__(text, parent)
                 self.model_name = model_name
 
+        for action in self.model_actions.values():
+            self.model_group.removeAction(action)
+            self.model_menu.removeAction(action)
+            action.deleteLater()
+        self.model_actions = {}
         for model in self.available_models:
-            size = get_model_dir_size(model)
-            display_name = f"{model} ({size})" if size else model
-            action = ModelAction(display_name, model_menu, model)
+            action = ModelAction(model, self.model_menu, model)
             action.setCheckable(True)
-            action.setChecked(model == self.current_model)
-            # Disable the action if it's the current model
-            action.setEnabled(model != self.current_model)
             action.triggered.connect(lambda checked, m=model: self.change_model(m))
-            model_group.addAction(action)
-            model_menu.addAction(action)
-        self.model_menu = model_menu
-        return model_menu
+            self.model_group.addAction(action)
+            self.model_menu.addAction(action)
+            self.model_actions[model] = action
+        self.refresh_model_menu()
+
+    def get_model_dir_size(self, model_name):
+        """Get the size of the model directory if it exists. Sizes are cached until invalidated."""
+        if model_name in self.model_dir_sizes:
+            return self.model_dir_sizes[model_name]
+        dir_name = f"models--Systran--faster-whisper-{model_name}"
+        model_path = Path(self.models_dir) / dir_name
+        size = None
+        if model_path.exists():
+            total_size = 0
+            for path in model_path.rglob("*"):
+                if path.is_file():
+                    total_size += path.stat().st_size
+            for unit in ["B", "KB", "MB", "GB"]:
+                if total_size < 1024:
+                    size = f"{total_size:.1f} {unit}"
+                    break
+                total_size /= 1024
+            else:
+                size = f"{total_size:.1f}TB"
+        self.model_dir_sizes[model_name] = size
+        return size
+
+    def refresh_model_menu(self, invalidate=None):
+        """Update the model actions in place, only touching labels and states that changed."""
+        start_time = time.perf_counter()
+        if invalidate:
+            self.model_dir_sizes.pop(invalidate, None)
+        for model, action in self.model_actions.items():
+            size = self.get_model_dir_size(model)
+            display_name = f"{model} ({size})" if size else model
+            if action.text() != display_name:
+                action.setText(display_name)
+            is_current = model == self.current_model
+            if action.isChecked() != is_current:
+                action.setChecked(is_current)
+            # Disable the action if it's the current model
+            if action.isEnabled() == is_current:
+                action.setEnabled(not is_current)
+        self.metrics.record("model_menu_refresh_seconds", time.perf_counter() - start_time)
 
     def create_language_submenu(self, parent_menu):
         language_menu = QMenu("Select Language", parent_menu)
         # Create action group for radio buttons
         language_group = QActionGroup(language_menu)
         language_group.setExclusive(True)
+        # Built when opened, the languages can change with an edit of config.json
+        language_menu.aboutToShow.connect(lambda: self.populate_language_menu(language_menu, language_group))
+        return language_menu
+
+    def populate_language_menu(self, language_menu, language_group):
+        for action in language_group.actions():
+            language_group.removeAction(action)
+        language_menu.clear()
+        auto_action = QAction("Auto-detect", language_menu)
+        auto_action.setCheckable(True)
+        auto_action.setChecked(self.current_language == "auto")
+        auto_action.triggered.connect(lambda checked: self.change_language("auto"))
+        language_group.addAction(auto_action)
+        language_menu.addAction(auto_action)
+        language_menu.addSeparator()
         for lang_obj in self.available_languages:
             lang_code = lang_obj["code"]
             lang_name = lang_obj["name"]
@@ -767,45 +1566,91 @@ class HotkeyApp:
             action.triggered.connect(lambda checked, lang=lang_code: self.change_language(lang))
             language_group.addAction(action)
             language_menu.addAction(action)
-        return language_menu
+
+    def create_input_device_submenu(self, parent_menu):
+        input_menu = QMenu("Input Device", parent_menu)
+        device_group = QActionGroup(input_menu)
+        device_group.setExclusive(True)
+        # Devices come and go (USB, Bluetooth), so the list is built each time the menu opens
+        input_menu.aboutToShow.connect(lambda: self.populate_input_device_menu(input_menu, device_group))
+        return input_menu
+
+    def populate_input_device_menu(self, input_menu, device_group):
+        for action in device_group.actions():
+            device_group.removeAction(action)
+        input_menu.clear()
+        try:
+            device_names = list_input_devices()
+        except Exception as e:
+            print(f"Error listing input devices: {e}")
+            device_names = []
+        for name in [None, *device_names]:
+            action = QAction(name or "System default", input_menu)
+            action.setCheckable(True)
+            action.setChecked(name == self.input_device)
+            action.triggered.connect(lambda checked, device=name: self.change_input_device(device))
+            device_group.addAction(action)
+            input_menu.addAction(action)
+
+    def change_input_device(self, device_name):
+        if device_name != self.input_device:
+            self.input_device = device_name
+            self.save_config()
+            print(f"Input device: {device_name or 'System default'}")
 
     def create_sound_settings_submenu(self, parent_menu):
         sound_menu = QMenu("Sound Settings", parent_menu)
-        # Create actions for each sound setting
-        start_sound = QAction("Start Record Sound", sound_menu)
-        start_sound.setCheckable(True)
-        start_sound.setChecked(self.config["sound_settings"]["start_record"])
-        start_sound.triggered.connect(lambda checked: self.toggle_sound_setting("start_record", checked))
-        stop_sound = QAction("Stop Record Sound", sound_menu)
-        stop_sound.setCheckable(True)
-        stop_sound.setChecked(self.config["sound_settings"]["stop_record"])
-        stop_sound.triggered.connect(lambda checked: self.toggle_sound_setting("stop_record", checked))
-        done_sound = QAction("Transcription Done Sound", sound_menu)
-        done_sound.setCheckable(True)
-        done_sound.setChecked(self.config["sound_settings"]["transcription_done"])
-        done_sound.triggered.connect(lambda checked: self.toggle_sound_setting("transcription_done", checked))
-        empty_sound = QAction("Empty Transcription Sound", sound_menu)
-        empty_sound.setCheckable(True)
-        empty_sound.setChecked(self.config["sound_settings"]["transcription_empty"])
-        empty_sound.triggered.connect(lambda checked: self.toggle_sound_setting("transcription_empty", checked))
-        sound_menu.addAction(start_sound)
-        sound_menu.addAction(stop_sound)
-        sound_menu.addAction(done_sound)
-        sound_menu.addAction(empty_sound)
+        # Create actions for each sound setting, kept so an edit of config.json can update them
+        self.sound_actions = {}
+        for sound_type, label in (
+            ("start_record", "Start Record Sound"),
+            ("stop_record", "Stop Record Sound"),
+            ("transcription_done", "Transcription Done Sound"),
+            ("transcription_empty", "Empty Transcription Sound"),
+        ):
+            sound_action = QAction(label, sound_menu)
+            sound_action.setCheckable(True)
+            sound_action.setChecked(self.config["sound_settings"][sound_type])
+            sound_action.triggered.connect(lambda checked, t=sound_type: self.toggle_sound_setting(t, checked))
+            sound_menu.addAction(sound_action)
+            self.sound_actions[sound_type] = sound_action
+        sound_menu.addSeparator()
+        # Volume presets
+        volume_group = QActionGroup(sound_menu)
+        volume_group.setExclusive(True)
+        for percent in (100, 75, 50, 25):
+            volume_action = QAction(f"Volume {percent}%", sound_menu)
+            volume_action.setCheckable(True)
+            volume_action.setChecked(round(self.config["sound_volume"] * 100) == percent)
+            volume_action.triggered.connect(lambda checked, v=percent / 100: self.change_sound_volume(v))
+            volume_group.addAction(volume_action)
+            sound_menu.addAction(volume_action)
         return sound_menu
 
+    def change_sound_volume(self, volume):
+        self.config["sound_volume"] = volume
+        self.sound_player.volume = volume
+        self.save_config()
+
     def toggle_sound_setting(self, sound_type, enabled):
         self.config["sound_settings"][sound_type] = enabled
         self.save_config()
 
-    def _update_tray_icon(self, icon):
-        if self.tray:
+    def set_tray_icon(self, icon):
+        # Only hand the icon to the shell when it actually changes
+        if icon is not self.current_icon:
+            self.current_icon = icon
             self.tray.setIcon(icon)
 
+    def _update_tray_icon(self, icon):
+        # Recording and transcription icons take precedence over the loading animation
+        if self.tray and not self.is_recording and not self.transcribing:
+            self.set_tray_icon(icon)
+
     def create_tray_icon(self):
         # Create system tray icon
         self.tray = QSystemTrayIcon()
-        self.tray.setIcon(self.gray_icon)
+        self.set_tray_icon(self.gray_icon)
         self.tray.setVisible(True)
         # Create tray menu
         menu = QMenu()
@@ -827,15 +1672,25 @@ class HotkeyApp:
         menu.addAction(self.language_action)
         menu.addMenu(self.create_language_submenu(menu))
         menu.addSeparator()
+        # Add input device submenu
+        menu.addMenu(self.create_input_device_submenu(menu))
         # Add sound settings submenu
         menu.addMenu(self.create_sound_settings_submenu(menu))
         menu.addSeparator()
-        # Add auto-paste checkbox
-        auto_paste_action = QAction("Auto-paste after transcription", menu)
-        auto_paste_action.setCheckable(True)
-        auto_paste_action.setChecked(self.auto_paste)
-        auto_paste_action.triggered.connect(self.toggle_auto_paste)
-        menu.addAction(auto_paste_action)
+        # Add output submenu, replacing the old auto-paste checkbox
+        menu.addMenu(self.create_output_submenu(menu))
+        # Add two-pass checkbox
+        two_pass_action = QAction(f"Instant draft with {self.config['two_pass']['draft_model']}", menu)
+        two_pass_action.setCheckable(True)
+        two_pass_action.setChecked(self.config["two_pass"]["enabled"])
+        two_pass_action.triggered.connect(self.toggle_two_pass)
+        menu.addAction(two_pass_action)
+        # Add idle unload checkbox
+        idle_unload_action = QAction(f"Unload model when idle ({self.config['idle_unload']['minutes']} min)", menu)
+        idle_unload_action.setCheckable(True)
+        idle_unload_action.setChecked(self.config["idle_unload"]["enabled"])
+        idle_unload_action.triggered.connect(self.toggle_idle_unload)
+        menu.addAction(idle_unload_action)
         # Add autorun checkbox
         autorun_action = QAction("Start with Windows", menu)
         autorun_action.setCheckable(True)
@@ -857,6 +1712,26 @@ class HotkeyApp:
         self.hotkey_action = QAction(f"Current Hotkey: {' + '.join(self.hotkey)}", menu)
         self.hotkey_action.triggered.connect(self.change_hotkey)
         menu.addAction(self.hotkey_action)
+        # Add hold-to-talk checkbox
+        hold_to_talk_action = QAction("Hold hotkey to talk", menu)
+        hold_to_talk_action.setCheckable(True)
+        hold_to_talk_action.setChecked(self.config["hotkey_mode"] == "hold")
+        hold_to_talk_action.triggered.connect(self.toggle_hold_to_talk)
+        menu.addAction(hold_to_talk_action)
+        # Add transcript history
+        history_action = QAction("Transcript History...", menu)
+        history_action.triggered.connect(self.show_history)
+        history_action.setEnabled(self.history is not None)
+        menu.addAction(history_action)
+        # Add profiling toggle and timeline viewer
+        self.profiling_action = QAction("Profile dictations", menu)
+        self.profiling_action.setCheckable(True)
+        self.profiling_action.setChecked(self.profiler.enabled)
+        self.profiling_action.triggered.connect(self.toggle_profiling)
+        menu.addAction(self.profiling_action)
+        timeline_action = QAction("Performance Timeline...", menu)
+        timeline_action.triggered.connect(self.show_timeline)
+        menu.addAction(timeline_action)
         # Add exit action
         exit_action = QAction("Exit", menu)
         exit_action.triggered.connect(self.quit_application)
@@ -864,47 +1739,50 @@ class HotkeyApp:
         self.tray.setContextMenu(menu)
 
     def get_language_name(self, lang_code):
+        if lang_code == "auto":
+            return "Auto-detect"
         for lang_obj in self.available_languages:
             if lang_obj["code"] == lang_code:
                 return lang_obj["name"]
         return lang_code  # fallback to code if name not found
 
     def update_tray_menu(self, status_message=None):
-        _ = self.tray.contextMenu()
+        start_time = time.perf_counter()
         # Update model label with loading/transcribing status
-        if not self.model:
+        if self.model_idle_state == "unloaded" and not self.model and not (self.model_loader and self.model_loader.isRunning()):
+            status = " (Unloaded while idle)"
+            # Nothing is loading, so model and device can still be changed
+            menus_enabled = True
+        elif not self.model:
             status = f" ({status_message})" if status_message else " (Loading...)"
             # Disable model menu while loading
-            if hasattr(self, "model_menu"):
-                self.model_menu.setEnabled(False)
-            if hasattr(self, "device_menu"):
-                self.device_menu.setEnabled(False)
+            menus_enabled = False
         elif self.transcribing:
             status = " (Transcribing...)"
-            # Enable menus after loading
-            if hasattr(self, "model_menu"):
-                self.model_menu.setEnabled(True)
-            if hasattr(self, "device_menu"):
-                self.device_menu.setEnabled(True)
+            menus_enabled = True
         else:
-            status = ""
-            # Enable menus in normal state
-            if hasattr(self, "model_menu"):
-                self.model_menu.setEnabled(True)
-            if hasattr(self, "device_menu"):
-                self.device_menu.setEnabled(True)
+            status = " (Idle, reduced)" if self.model_idle_state == "fallback" else ""
+            menus_enabled = True
+        if self.pending_recordings:
+            status += f" [{len(self.pending_recordings)} queued]"
+        for menu in (getattr(self, "model_menu", None), getattr(self, "device_menu", None)):
+            if menu is not None and menu.isEnabled() != menus_enabled:
+                menu.setEnabled(menus_enabled)
         # Update model label
-        self.model_action.setText(f"Model: {self.current_model}{status}")
+        set_action_text(self.model_action, f"Model: {self.current_model}{status}")
         # Update device label with CUDA device number if applicable
         device_text = f"Device: {self.device_mode.upper()}"
         if self.device_mode == "cuda":
             device_text += f" (Device {self.cuda_device})"
-        self.device_action.setText(device_text)
+        set_action_text(self.device_action, device_text)
         # Update language label with full name
         current_lang_name = self.get_language_name(self.current_language)
-        self.language_action.setText(f"Language: {current_lang_name}")
+        if self.current_language == "auto" and self.language_detector.last_language:
+            current_lang_name += f" ({self.get_language_name(self.language_detector.last_language)})"
+        set_action_text(self.language_action, f"Language: {current_lang_name}")
         # Update hotkey label
-        self.hotkey_action.setText(f"Current Hotkey: {' + '.join(self.hotkey)}")
+        set_action_text(self.hotkey_action, f"Current Hotkey: {' + '.join(self.hotkey)}")
+        self.metrics.record("tray_menu_update_seconds", time.perf_counter() - start_time)
 
     def change_language(self, language):
         if language != self.current_language:
@@ -913,6 +1791,8 @@ class HotkeyApp:
             self.update_tray_menu()
 
     def quit_application(self):
+        # Let a start or stop already running finish so the stream isn't closed under it
+        self.recording_executor.shutdown(wait=True, cancel_futures=True)
         if self.is_recording:
             self.stop_recording()
 
@@ -924,24 +1804,39 @@ class HotkeyApp:
         # kill transcribing_thread
         if self.transcribing_thread and self.transcribing_thread.isRunning():
             print("Stopping transcribing thread...")
-            self.transcribing_thread.terminate()
+            if self.transcribing:
+                self.transcribing_thread.terminate()
+            else:
+                # Idle worker is blocked on its queue, wake it up with the stop sentinel
+                self.transcribing_thread.stop()
             self.transcribing_thread = None
+        if self.pending_recordings:
+            print(f"Discarding {len(self.pending_recordings)} queued recording(s)")
 
-        winsound.PlaySound(None, winsound.SND_PURGE)  # Stop any playing sounds
+        self.sound_player.close()  # Stop any playing sounds
         if self.listener:
             self.listener.stop()
         if self.dialog:
             self.dialog.close()
+        if self.timeline_viewer:
+            self.timeline_viewer.hide()
+        if self.history:
+            self.history.close()
+        if self.parallel_decoder:
+            self.parallel_decoder.shutdown()
+        self.draft_executor.shutdown(wait=False, cancel_futures=True)
+        self.instance_server.close()
         if self.tray:
             self.tray.setVisible(False)
         if self.check_timer:
             self.check_timer.stop()
+        if self.idle_timer:
+            self.idle_timer.stop()
+        self.config_store.flush()
+        print(self.metrics.summary())
 
-        # check animation thread
-        if self.loading_thread and self.loading_thread.isRunning():
-            print("Stopping loading animation...")
-            self.loading_thread.terminate()
-            self.loading_thread = None
+        # stop animation timer
+        self.loading_animation.stop()
 
         self.app.quit()
 
@@ -989,20 +1884,83 @@ class HotkeyApp:
                 self.cuda_device = cuda_device
             self.save_config()  # Save when device changes
             self.model = None  # Clear current model
-            # Stop any existing loading animation
-            if self.loading_thread and self.loading_thread.isRunning():
-                self.loading_thread.stop()
-                self.loading_thread = None
-            # Create and start a new loading animation thread
-            self.loading_thread = LoadingIconThread()
-            self.loading_thread.update_icon.connect(self._update_tray_icon)
-            self.loading_thread.start()
+            self.draft_model = None  # Reloaded on the new device after the main model
+            self.fallback_model = None
+            # Profile models are loaded again on the new device on their next use
+            self.profile_models.clear()
+            # Restart the shared loading animation
+            self.loading_animation.start()
             self.load_whisper_model()
 
-    def toggle_auto_paste(self, checked):
-        self.auto_paste = checked
+    def create_output_submenu(self, parent_menu):
+        output_menu = QMenu("After Transcription", parent_menu)
+        # Create action group for radio buttons
+        output_group = QActionGroup(output_menu)
+        output_group.setExclusive(True)
+        for sink_name, label in OUTPUT_SINK_LABELS.items():
+            action = QAction(label, output_menu)
+            action.setCheckable(True)
+            action.setChecked(sink_name == self.output_sink)
+            action.triggered.connect(lambda checked, name=sink_name: self.change_output_sink(name))
+            output_group.addAction(action)
+            output_menu.addAction(action)
+        return output_menu
+
+    def change_output_sink(self, sink_name):
+        self.output_sink = sink_name
+        # Keep auto_paste in sync for configs read by older versions
+        self.auto_paste = sink_name != "clipboard"
         self.save_config()
 
+    def show_history(self):
+        if self.history_picker is None:
+            print("Transcript history is disabled")
+            return
+        self.history_picker.show_picker()
+
+    def paste_history_entry(self, text):
+        # Streaming only makes sense while decoding, type the whole entry instead
+        sink = create_output_sink("type" if self.output_sink == "stream" else self.output_sink)
+        sink.finish(text)
+        print(f"Re-delivered from history ({sink.description}): {text}")
+
+    def toggle_hold_to_talk(self, checked):
+        self.config["hotkey_mode"] = "hold" if checked else "toggle"
+        self.hotkey_engine.set_bindings(self.build_hotkey_bindings())
+        self.save_config()
+
+    def toggle_two_pass(self, checked):
+        self.config["two_pass"]["enabled"] = checked
+        self.save_config()
+        if checked:
+            self.load_draft_model()
+        else:
+            self.unload_draft_model()
+
+    def toggle_profiling(self, checked):
+        self.profiler.enabled = checked
+        self.config["profiling"]["enabled"] = checked
+        self.save_config()
+
+    def show_timeline(self):
+        if self.timeline_viewer is None:
+            self.timeline_viewer = TimelineViewer(self.profiler)
+        self.timeline_viewer.refresh()
+        self.timeline_viewer.show()
+        self.timeline_viewer.raise_()
+        self.timeline_viewer.activateWindow()
+
+    def toggle_idle_unload(self, checked):
+        self.config["idle_unload"]["enabled"] = checked
+        self.last_activity_time = time.time()
+        self.save_config()
+
+
+def set_action_text(action, text):
+    """Set a menu label only if it differs, so unchanged labels don't trigger a menu relayout."""
+    if action.text() != text:
+        action.setText(text)
+
 
 def get_models_directory():
     """Get the models directory in AppData/Local."""
@@ -1012,6 +1970,45 @@ def get_models_directory():
     return str(models_dir)
 
 
+def parse_arguments(argv):
+    """Command of the command line, None for a plain launch."""
+    parser = argparse.ArgumentParser(description="Voice to text with a hotkey. With a running instance, the command is passed to it.")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--show-menu", action="store_true", help="open the tray menu")
+    group.add_argument("--model", help="switch to this model")
+    group.add_argument("--transcribe", metavar="FILE", type=Path, help="transcribe an audio file and deliver the text like a dictation")
+    parser.add_argument("--profile", help="profile from the config to transcribe the file with")
+    args = parser.parse_args(argv)
+    if args.show_menu:
+        return {"action": "show_menu"}
+    if args.model:
+        return {"action": "model", "model": args.model}
+    if args.transcribe:
+        # The running instance has its own working directory
+        return {"action": "transcribe", "path": str(args.transcribe.resolve()), "profile": args.profile}
+    return None
+
+
+def forward_command(command):
+    """Pass the command to an already running instance, False if this launch is the first one."""
+    # A plain relaunch shows the menu, so it is obvious the app is already running
+    reply = send_command(command or {"action": "show_menu"})
+    if reply is None:
+        return False
+    print(reply)
+    return True
+
+
 if __name__ == "__main__":
-    app = HotkeyApp()
+    command = parse_arguments(sys.argv[1:])
+    if forward_command(command):
+        sys.exit(0)
+    app = HotkeyApp(command)
+    if not app.instance_server.listen():
+        # Another launch got there first while this one was starting, hand the command to it
+        if forward_command(command):
+            app.quit_application()
+            sys.exit(0)
+        print("Could not start the single-instance server, running without it")
+    app.start()
     sys.exit(app.run())
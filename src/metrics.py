@@ -0,0 +1,60 @@
+from typing import Deque, Dict, List, Optional
+from collections import deque
+import threading
+
+
+class Metrics:
+    """
+    Thread-safe counters and latency samples shared by the app and its worker threads.
+
+    Counters are plain integers (e.g. how many recordings hit a cold model), samples
+    keep the most recent values of a measurement (e.g. transcription latency in seconds)
+    so percentiles can be reported without growing forever.
+    """
+
+    def __init__(self, max_samples: int = 500) -> None:
+        self._lock: threading.Lock = threading.Lock()
+        self.max_samples: int = max_samples
+        self.counters: Dict[str, int] = {}
+        self.samples: Dict[str, Deque[float]] = {}
+
+    def increment(self, name: str, amount: int = 1) -> int:
+        with self._lock:
+            value: int = self.counters.get(name, 0) + amount
+            self.counters[name] = value
+            return value
+
+    def count(self, name: str) -> int:
+        with self._lock:
+            return self.counters.get(name, 0)
+
+    def record(self, name: str, value: float) -> None:
+        with self._lock:
+            if name not in self.samples:
+                self.samples[name] = deque(maxlen=self.max_samples)
+            self.samples[name].append(value)
+
+    def values(self, name: str) -> List[float]:
+        with self._lock:
+            return list(self.samples.get(name, ()))
+
+    def percentile(self, name: str, pct: float) -> Optional[float]:
+        values: List[float] = sorted(self.values(name))
+        if not values:
+            return None
+        index: int = min(len(values) - 1, max(0, round(pct / 100 * (len(values) - 1))))
+        return values[index]
+
+    def summary(self) -> str:
+        lines: List[str] = []
+        with self._lock:
+            counters: Dict[str, int] = dict(self.counters)
+            names: List[str] = list(self.samples)
+        for name in sorted(counters):
+            lines.append(f"{name}: {counters[name]}")
+        for name in sorted(names):
+            values: List[float] = self.values(name)
+            p50: Optional[float] = self.percentile(name, 50)
+            p95: Optional[float] = self.percentile(name, 95)
+            lines.append(f"{name}: n={len(values)} p50={p50:.3f} p95={p95:.3f}")
+        return "\n".join(lines)
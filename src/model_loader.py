@@ -1,6 +1,8 @@
 from typing import Optional, ClassVar
+from contextlib import nullcontext
 from PySide6.QtCore import QThread, Signal
 from faster_whisper import WhisperModel
+from profiler import Profiler
 
 
 class ModelLoaderThread(QThread):
@@ -20,19 +22,40 @@ class ModelLoaderThread(QThread):
         model_name (str): Name/size of the Whisper model to load
         device_mode (str): Either "cuda" or "cpu" to specify device type
         cuda_device (int): CUDA device ID to use when device_mode is "cuda"
+        compute_type (Optional[str]): Overrides the default compute type (float16 on CUDA, int8 on CPU)
+        num_workers (int): Number of transcribe calls the model can run in parallel
+        cpu_threads (int): CTranslate2 threads per worker on the CPU, 0 for its default
+        profiler (Optional[Profiler]): Times the model construction when profiling is enabled
     """
 
     finished: ClassVar[Signal] = Signal(WhisperModel)
     error: ClassVar[Signal] = Signal(str)
     progress: ClassVar[Signal] = Signal(str)
 
-    def __init__(self, model_name: str, device_mode: str = "cuda", cuda_device: int = 0) -> None:
+    def __init__(
+        self,
+        model_name: str,
+        device_mode: str = "cuda",
+        cuda_device: int = 0,
+        compute_type: Optional[str] = None,
+        num_workers: int = 1,
+        cpu_threads: int = 0,
+    ) -> None:
         super().__init__()
         self.model_name: str = model_name
         self.device_mode: str = device_mode
         self.cuda_device: int = cuda_device
+        self.compute_type: Optional[str] = compute_type
+        self.num_workers: int = num_workers
+        self.cpu_threads: int = cpu_threads
         self._is_running: bool = True
         self.models_dir: Optional[str] = None
+        self.profiler: Optional[Profiler] = None
+
+    def _load_span(self):
+        if self.profiler is None:
+            return nullcontext()
+        return self.profiler.span("model_load", model=self.model_name, device=self.device_mode, compute_type=self.compute_type)
 
     def run(self) -> None:
         try:
@@ -43,26 +66,31 @@ class ModelLoaderThread(QThread):
                 self.progress.emit(f"Loading {self.model_name} model with CUDA (Device {self.cuda_device})...")
                 # faster-whisper expects just "cuda" for default device (0) or "cuda:N" for specific devices
                 device: str = "cuda" if self.cuda_device == 0 else f"cuda:{self.cuda_device}"
-                model: WhisperModel = WhisperModel(
-                    self.model_name,
-                    device=device,
-                    compute_type="float16",
-                    download_root=self.models_dir,  # Use custom models directory
-                    local_files_only=False,
-                )
+                with self._load_span():
+                    model: WhisperModel = WhisperModel(
+                        self.model_name,
+                        device=device,
+                        compute_type=self.compute_type or "float16",
+                        num_workers=self.num_workers,
+                        download_root=self.models_dir,  # Use custom models directory
+                        local_files_only=False,
+                    )
 
                 if self._is_running:
                     self.progress.emit("Model loaded successfully!")
                     self.finished.emit(model)
             else:
                 self.progress.emit(f"Loading {self.model_name} model in CPU mode...")
-                model: WhisperModel = WhisperModel(
-                    self.model_name,
-                    device="cpu",
-                    compute_type="int8",
-                    download_root=self.models_dir,  # Use custom models directory
-                    local_files_only=False,
-                )
+                with self._load_span():
+                    model: WhisperModel = WhisperModel(
+                        self.model_name,
+                        device="cpu",
+                        compute_type=self.compute_type or "int8",
+                        num_workers=self.num_workers,
+                        cpu_threads=self.cpu_threads,
+                        download_root=self.models_dir,  # Use custom models directory
+                        local_files_only=False,
+                    )
                 if self._is_running:
                     self.progress.emit("Model loaded successfully (CPU)!")
                     self.finished.emit(model)
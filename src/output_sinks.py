@@ -0,0 +1,323 @@
+from typing import Dict, Iterator, List, Optional, Tuple, Type
+from contextlib import contextmanager
+import sys
+import threading
+import time
+import pyperclip
+from pynput import keyboard
+
+# One controller is shared by all sinks instead of creating one per key event
+_controller: Optional[keyboard.Controller] = None
+
+# Key presses of the user, counted by the keyboard listener through note_key_press. The keys this module
+# sends are seen by the listener as well, they don't count while injecting and for a moment afterwards.
+_user_key_presses: int = 0
+_injecting_until: float = 0.0
+INJECTION_GRACE_SECONDS: float = 0.05
+
+
+def get_keyboard_controller() -> keyboard.Controller:
+    global _controller
+    if _controller is None:
+        _controller = keyboard.Controller()
+    return _controller
+
+
+def note_key_press() -> None:
+    """Called by the keyboard listener for every key press."""
+    global _user_key_presses
+    if time.monotonic() > _injecting_until:
+        _user_key_presses += 1
+
+
+@contextmanager
+def injecting() -> Iterator[None]:
+    """Keys sent inside this block are not counted as the user's."""
+    global _injecting_until
+    _injecting_until = float("inf")
+    try:
+        yield
+    finally:
+        _injecting_until = time.monotonic() + INJECTION_GRACE_SECONDS
+
+
+def send_paste_shortcut() -> None:
+    controller: keyboard.Controller = get_keyboard_controller()
+    with injecting():
+        controller.press(keyboard.Key.ctrl)
+        controller.press("v")
+        controller.release("v")
+        controller.release(keyboard.Key.ctrl)
+
+
+if sys.platform == "win32":
+    import ctypes
+    from ctypes import wintypes
+
+    INPUT_KEYBOARD = 1
+    KEYEVENTF_KEYUP = 0x0002
+    KEYEVENTF_UNICODE = 0x0004
+    VK_RETURN = 0x0D
+    VK_BACK = 0x08
+
+    class MOUSEINPUT(ctypes.Structure):
+        _fields_ = [
+            ("dx", wintypes.LONG),
+            ("dy", wintypes.LONG),
+            ("mouseData", wintypes.DWORD),
+            ("dwFlags", wintypes.DWORD),
+            ("time", wintypes.DWORD),
+            ("dwExtraInfo", ctypes.c_size_t),
+        ]
+
+    class KEYBDINPUT(ctypes.Structure):
+        _fields_ = [
+            ("wVk", wintypes.WORD),
+            ("wScan", wintypes.WORD),
+            ("dwFlags", wintypes.DWORD),
+            ("time", wintypes.DWORD),
+            ("dwExtraInfo", ctypes.c_size_t),
+        ]
+
+    class _INPUTUNION(ctypes.Union):
+        # MOUSEINPUT is the largest member, it is only here so the struct has the size SendInput expects
+        _fields_ = [("mi", MOUSEINPUT), ("ki", KEYBDINPUT)]
+
+    class INPUT(ctypes.Structure):
+        _fields_ = [("type", wintypes.DWORD), ("union", _INPUTUNION)]
+
+    def _key_inputs(text: str) -> List["INPUT"]:
+        inputs: List[INPUT] = []
+        for char in text:
+            if char == "\n":
+                for flags in (0, KEYEVENTF_KEYUP):
+                    inputs.append(INPUT(type=INPUT_KEYBOARD, union=_INPUTUNION(ki=KEYBDINPUT(wVk=VK_RETURN, dwFlags=flags))))
+                continue
+            # Characters outside the BMP are sent as two UTF-16 code units
+            encoded: bytes = char.encode("utf-16-le")
+            for i in range(0, len(encoded), 2):
+                code_unit: int = int.from_bytes(encoded[i : i + 2], "little")
+                for flags in (KEYEVENTF_UNICODE, KEYEVENTF_UNICODE | KEYEVENTF_KEYUP):
+                    inputs.append(INPUT(type=INPUT_KEYBOARD, union=_INPUTUNION(ki=KEYBDINPUT(wScan=code_unit, dwFlags=flags))))
+        return inputs
+
+    def inject_text(text: str, batch_size: int = 64, batch_delay: float = 0.002) -> None:
+        """Type text as unicode key events, sending up to `batch_size` characters per SendInput call."""
+        with injecting():
+            for start in range(0, len(text), batch_size):
+                inputs: List[INPUT] = _key_inputs(text[start : start + batch_size])
+                array = (INPUT * len(inputs))(*inputs)
+                ctypes.windll.user32.SendInput(len(inputs), array, ctypes.sizeof(INPUT))
+                if start + batch_size < len(text):
+                    # Give the target application a moment to drain its input queue
+                    time.sleep(batch_delay)
+
+    def erase_text(count: int, batch_size: int = 64, batch_delay: float = 0.002) -> None:
+        """Send `count` backspaces, batched like inject_text."""
+        with injecting():
+            for start in range(0, count, batch_size):
+                inputs: List[INPUT] = [
+                    INPUT(type=INPUT_KEYBOARD, union=_INPUTUNION(ki=KEYBDINPUT(wVk=VK_BACK, dwFlags=flags)))
+                    for _ in range(min(batch_size, count - start))
+                    for flags in (0, KEYEVENTF_KEYUP)
+                ]
+                array = (INPUT * len(inputs))(*inputs)
+                ctypes.windll.user32.SendInput(len(inputs), array, ctypes.sizeof(INPUT))
+                if start + batch_size < count:
+                    time.sleep(batch_delay)
+
+    class RECT(ctypes.Structure):
+        _fields_ = [("left", wintypes.LONG), ("top", wintypes.LONG), ("right", wintypes.LONG), ("bottom", wintypes.LONG)]
+
+    class GUITHREADINFO(ctypes.Structure):
+        _fields_ = [
+            ("cbSize", wintypes.DWORD),
+            ("flags", wintypes.DWORD),
+            ("hwndActive", wintypes.HWND),
+            ("hwndFocus", wintypes.HWND),
+            ("hwndCapture", wintypes.HWND),
+            ("hwndMenuOwner", wintypes.HWND),
+            ("hwndMoveSize", wintypes.HWND),
+            ("hwndCaret", wintypes.HWND),
+            ("rcCaret", RECT),
+        ]
+
+    def focused_window() -> Optional[int]:
+        """Handle of the control with the keyboard focus, or of the foreground window if that can't be told."""
+        info: GUITHREADINFO = GUITHREADINFO(cbSize=ctypes.sizeof(GUITHREADINFO))
+        # Thread id 0 is the foreground thread
+        if ctypes.windll.user32.GetGUIThreadInfo(0, ctypes.byref(info)) and info.hwndFocus:
+            return info.hwndFocus
+        return ctypes.windll.user32.GetForegroundWindow() or None
+
+else:
+
+    def inject_text(text: str, batch_size: int = 64, batch_delay: float = 0.002) -> None:
+        """Type text through pynput, which sends one event per character on this platform."""
+        with injecting():
+            get_keyboard_controller().type(text)
+
+    def erase_text(count: int, batch_size: int = 64, batch_delay: float = 0.002) -> None:
+        """Send `count` backspaces through pynput."""
+        controller: keyboard.Controller = get_keyboard_controller()
+        with injecting():
+            for _ in range(count):
+                controller.press(keyboard.Key.backspace)
+                controller.release(keyboard.Key.backspace)
+
+    def focused_window() -> Optional[int]:
+        """Not known on this platform, only typing is noticed before replacing text."""
+        return None
+
+
+def common_prefix_length(a: str, b: str) -> int:
+    length: int = 0
+    for char_a, char_b in zip(a, b):
+        if char_a != char_b:
+            break
+        length += 1
+    return length
+
+
+class OutputSink:
+    """
+    Delivers transcribed text to the user.
+
+    `write_segment` is called for every segment as soon as it is decoded, `finish` once
+    with the complete transcription. Sinks that deliver the whole text at once ignore
+    the segments.
+    """
+
+    name: str = "base"
+    description: str = ""
+    # Focused control and user key presses when the text that may be replaced was delivered
+    _target: Optional[Tuple[Optional[int], int]] = None
+
+    def write_segment(self, text: str) -> None:
+        pass
+
+    def finish(self, text: str) -> None:
+        raise NotImplementedError
+
+    def remember_target(self) -> None:
+        """Note where the text went, call right after delivering text that `replace` may swap later."""
+        self._target = (focused_window(), _user_key_presses)
+
+    def target_unchanged(self) -> bool:
+        """False if the user typed or the focus moved since `remember_target`, the cursor may not be behind the text then."""
+        return self._target is None or self._target == (focused_window(), _user_key_presses)
+
+    def replace(self, old: str, new: str) -> bool:
+        """
+        Replace text this sink already delivered, e.g. a draft transcription by the final one.
+
+        Only the part after the common prefix is erased with backspaces and typed again,
+        which assumes the cursor is still at the end of the delivered text. Nothing is
+        erased if the user typed or switched to another control since the text was
+        delivered (see `remember_target`), returns whether the text was replaced.
+        """
+        if not self.target_unchanged():
+            return False
+        prefix: int = common_prefix_length(old, new)
+        erase_text(len(old) - prefix)
+        inject_text(new[prefix:])
+        return True
+
+
+class ClipboardSink(OutputSink):
+    name = "clipboard"
+    description = "Copied to clipboard"
+
+    def finish(self, text: str) -> None:
+        pyperclip.copy(text)
+
+    def replace(self, old: str, new: str) -> bool:
+        # Nothing was inserted anywhere, only the clipboard needs the new text
+        pyperclip.copy(new)
+        return True
+
+
+class PasteSink(OutputSink):
+    name = "paste"
+    description = "Copied to clipboard and pasted"
+
+    def finish(self, text: str) -> None:
+        pyperclip.copy(text)
+        send_paste_shortcut()
+
+    def replace(self, old: str, new: str) -> bool:
+        # The final text is on the clipboard even if it can't be swapped into the document
+        pyperclip.copy(new)
+        return super().replace(old, new)
+
+
+class PasteRestoreSink(OutputSink):
+    """Pastes through the clipboard, then puts the previous (text) clipboard content back."""
+
+    name = "paste_restore"
+    description = "Pasted, previous clipboard restored"
+
+    def __init__(self, restore_delay: float = 0.3) -> None:
+        # The target application reads the clipboard asynchronously after Ctrl+V
+        self.restore_delay: float = restore_delay
+
+    def finish(self, text: str) -> None:
+        try:
+            previous: str = pyperclip.paste()
+        except pyperclip.PyperclipException:
+            previous = ""
+        pyperclip.copy(text)
+        send_paste_shortcut()
+        if previous and previous != text:
+            timer = threading.Timer(self.restore_delay, pyperclip.copy, args=(previous,))
+            timer.daemon = True
+            timer.start()
+
+
+class TypeSink(OutputSink):
+    """Types the text directly, the clipboard is left untouched."""
+
+    name = "type"
+    description = "Typed"
+
+    def finish(self, text: str) -> None:
+        inject_text(text)
+
+
+class StreamingTypeSink(OutputSink):
+    """Types every segment as soon as it is decoded, instead of waiting for the whole transcription."""
+
+    name = "stream"
+    description = "Typed while transcribing"
+
+    def __init__(self) -> None:
+        self.segment_count: int = 0
+
+    def write_segment(self, text: str) -> None:
+        # Segments are joined with a space, the same way the full transcription is
+        inject_text(text if self.segment_count == 0 else " " + text)
+        self.segment_count += 1
+
+    def finish(self, text: str) -> None:
+        # Everything was already typed segment by segment
+        pass
+
+
+OUTPUT_SINKS: Dict[str, Type[OutputSink]] = {sink.name: sink for sink in (ClipboardSink, PasteSink, PasteRestoreSink, TypeSink, StreamingTypeSink)}
+
+OUTPUT_SINK_LABELS: Dict[str, str] = {
+    "clipboard": "Copy to clipboard",
+    "paste": "Paste",
+    "paste_restore": "Paste and restore clipboard",
+    "type": "Type text",
+    "stream": "Type while transcribing",
+}
+
+
+def create_output_sink(name: str) -> OutputSink:
+    """Create a fresh sink for one transcription, falling back to pasting for unknown names."""
+    sink_class: Optional[Type[OutputSink]] = OUTPUT_SINKS.get(name)
+    if sink_class is None:
+        print(f"Unknown output sink '{name}', using 'paste'")
+        sink_class = PasteSink
+    return sink_class()
@@ -0,0 +1,134 @@
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from concurrent.futures import Future, ThreadPoolExecutor
+import copy
+import numpy as np
+
+
+def split_on_silence(
+    audio: np.ndarray,
+    sample_rate: int = 16000,
+    min_chunk_seconds: float = 10.0,
+    max_chunk_seconds: float = 28.0,
+    frame_ms: int = 30,
+    min_silence_ms: int = 250,
+) -> List[Tuple[int, int]]:
+    """
+    Split a recording into chunks that end in pauses, as (start, end) sample ranges.
+
+    Each chunk is between `min_chunk_seconds` and `max_chunk_seconds` long (the last one may
+    be shorter) and is cut in the middle of the longest pause within that range. Chunks stay
+    below Whisper's 30 second window, so every chunk is decoded in a single window. A pause is
+    a run of frames whose RMS stays close to the quietest frames of the recording. Without
+    any pause in range, the chunk is cut at its maximum length.
+    """
+    frame: int = sample_rate * frame_ms // 1000
+    frame_count: int = len(audio) // frame
+    if frame_count == 0 or len(audio) <= max_chunk_seconds * sample_rate:
+        return [(0, len(audio))]
+    frames: np.ndarray = audio[: frame_count * frame].reshape(frame_count, frame)
+    rms_db: np.ndarray = 10 * np.log10(np.mean(frames * frames, axis=1) + 1e-12)
+    # Quiet relative to this recording: within 10 dB of its noise floor, or absolute silence
+    threshold: float = max(np.percentile(rms_db, 10) + 10.0, -60.0)
+    silent: np.ndarray = rms_db < threshold
+    # Length of the silent run each frame belongs to, and the run's center frame
+    run_length: np.ndarray = np.zeros(frame_count, dtype=np.int64)
+    run_center: np.ndarray = np.zeros(frame_count, dtype=np.int64)
+    edges: np.ndarray = np.flatnonzero(np.diff(np.concatenate(([0], silent.astype(np.int8), [0]))))
+    for run_start, run_end in zip(edges[::2], edges[1::2]):
+        run_length[run_start:run_end] = run_end - run_start
+        run_center[run_start:run_end] = (run_start + run_end) // 2
+    min_silence_frames: int = max(1, min_silence_ms // frame_ms)
+    min_frames: int = int(min_chunk_seconds * 1000 // frame_ms)
+    max_frames: int = int(max_chunk_seconds * 1000 // frame_ms)
+    chunks: List[Tuple[int, int]] = []
+    start: int = 0
+    while frame_count - start > max_frames:
+        window: slice = slice(start + min_frames, start + max_frames)
+        lengths: np.ndarray = run_length[window]
+        best: int = int(np.argmax(lengths))
+        if lengths[best] >= min_silence_frames:
+            # The center of a run may lie outside the window when the run continues, stay within it
+            cut: int = min(max(int(run_center[window][best]), start + min_frames), start + max_frames)
+        else:
+            cut = start + max_frames
+        chunks.append((start * frame, cut * frame))
+        start = cut
+    chunks.append((start * frame, len(audio)))
+    return chunks
+
+
+def merge_infos(infos: List[Any]) -> Any:
+    """
+    One transcription info for the chunks of a recording, from the infos of the chunks.
+
+    Durations are summed, the language is the one most of the audio was detected as, with
+    the probability of the chunks in that language averaged over their audio. Other fields are those of the
+    first chunk.
+    """
+    merged: Any = copy.copy(infos[0])
+    seconds_per_language: Dict[str, float] = {}
+    for info in infos:
+        seconds_per_language[info.language] = seconds_per_language.get(info.language, 0.0) + info.duration
+    # Ties go to the language detected first
+    language: str = max(seconds_per_language, key=seconds_per_language.get)
+    in_language: List[Any] = [info for info in infos if info.language == language]
+    merged.language = language
+    merged.language_probability = sum(info.language_probability * info.duration for info in in_language) / max(seconds_per_language[language], 1e-9)
+    merged.duration = sum(info.duration for info in infos)
+    if hasattr(merged, "duration_after_vad"):
+        merged.duration_after_vad = sum(getattr(info, "duration_after_vad", info.duration) for info in infos)
+    return merged
+
+
+class ParallelDecoder:
+    """
+    Transcribes long recordings as independent chunks on a pool of threads.
+
+    One `model.transcribe` call decodes its 30 second windows one after another, as each
+    window is conditioned on the text of the previous one. Chunks split at pauses don't
+    need that context, so they are decoded concurrently. CTranslate2 releases the GIL while
+    decoding, and a model loaded with `num_workers` > 1 runs that many calls at the same time.
+    Results are returned in recording order.
+
+    Attributes:
+        num_workers (int): Concurrent transcribe calls, should match the model's num_workers
+    """
+
+    def __init__(self, num_workers: int = 4) -> None:
+        self.num_workers: int = num_workers
+        self._executor: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=num_workers, thread_name_prefix="ParallelDecode")
+
+    def transcribe(
+        self,
+        model: Any,
+        audio: np.ndarray,
+        chunks: List[Tuple[int, int]],
+        on_chunk: Optional[Callable[[str], None]] = None,
+        **options: Any,
+    ) -> Tuple[List[str], Any]:
+        """
+        Transcribe the chunks of a recording, returns the text of every chunk and the info of all of them (see merge_infos).
+
+        `on_chunk` is called with the text of each chunk in order, as soon as it and all
+        chunks before it are done. `options` are passed to `model.transcribe`.
+        """
+        futures: List[Future] = [self._executor.submit(self._transcribe_chunk, model, audio[start:end], options) for start, end in chunks]
+        texts: List[str] = []
+        infos: List[Any] = []
+        for future in futures:
+            text, info = future.result()
+            infos.append(info)
+            texts.append(text)
+            if on_chunk and text:
+                on_chunk(text)
+        return texts, merge_infos(infos)
+
+    @staticmethod
+    def _transcribe_chunk(model: Any, audio: np.ndarray, options: Dict[str, Any]) -> Tuple[str, Any]:
+        segments, info = model.transcribe(audio, **options)
+        # The segments are decoded while iterating, so do that on the worker too
+        return " ".join(segment.text for segment in segments), info
+
+    def shutdown(self, cancel: bool = True) -> None:
+        """Stop the workers once they are idle, `cancel` drops the chunks that haven't started yet."""
+        self._executor.shutdown(wait=False, cancel_futures=cancel)
@@ -0,0 +1,206 @@
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+import json
+import os
+import sys
+import threading
+import time
+
+# Returned by span() while profiling is off, entering it costs next to nothing
+_NO_SPAN = nullcontext()
+
+
+class Trace:
+    """
+    Spans and stack samples of one dictation, from the hotkey press to the delivered text.
+
+    Attributes:
+        label (str): Shown in the timeline viewer, e.g. "12:03:14 large-v3"
+        start_ns (int): perf_counter_ns() when the trace was started
+        spans (List[Tuple[str, int, int, int, str, Dict[str, Any]]]): name, start, duration (ns), thread id, thread name, args
+        samples (List[Tuple[int, int, Tuple[str, ...]]]): time (ns), thread id, stack from the outermost frame
+    """
+
+    def __init__(self, label: str) -> None:
+        self.label: str = label
+        self.start_ns: int = time.perf_counter_ns()
+        self.end_ns: Optional[int] = None
+        self.spans: List[Tuple[str, int, int, int, str, Dict[str, Any]]] = []
+        self.samples: List[Tuple[int, int, Tuple[str, ...]]] = []
+        self.thread_names: Dict[int, str] = {}
+        self._lock: threading.Lock = threading.Lock()
+
+    def add_span(self, name: str, start_ns: int, duration_ns: int, args: Dict[str, Any]) -> None:
+        thread: threading.Thread = threading.current_thread()
+        with self._lock:
+            self.spans.append((name, start_ns, duration_ns, thread.ident or 0, thread.name, args))
+            self.thread_names[thread.ident or 0] = thread.name
+
+    def duration_ns(self) -> int:
+        return (self.end_ns or time.perf_counter_ns()) - self.start_ns
+
+
+class Profiler:
+    """
+    Opt-in span timers and a sampling profiler for dictations.
+
+    `span(name, trace)` times a stage of a dictation (stream start, WAV write, decoding, ...).
+    While any trace is open, a background thread samples the Python stacks of all threads
+    every `sample_interval` seconds, so time spent outside the instrumented stages shows up
+    too. The last `keep` finished traces are kept for the timeline viewer and can be
+    exported in the Chrome trace format (chrome://tracing, https://ui.perfetto.dev).
+
+    Spans without a trace (model loading, ...) are collected in `background`.
+
+    Attributes:
+        enabled (bool): Spans and sampling are only recorded while enabled
+        sample_interval (float): Seconds between two stack samples
+        traces (Deque[Trace]): Finished traces, oldest first
+        background (Trace): Spans that don't belong to a dictation
+    """
+
+    # Traces that never finish (a queued recording that was discarded) stop being sampled after this
+    MAX_TRACE_SECONDS: float = 300.0
+
+    def __init__(self, enabled: bool = False, sample_interval: float = 0.005, keep: int = 10) -> None:
+        self.enabled: bool = enabled
+        self.sample_interval: float = sample_interval
+        self.traces: Deque[Trace] = deque(maxlen=keep)
+        self.background: Trace = Trace("Background")
+        self._open_traces: List[Trace] = []
+        self._lock: threading.Lock = threading.Lock()
+        self._sampler: Optional[threading.Thread] = None
+
+    def set_keep(self, keep: int) -> None:
+        """Keep the last `keep` finished traces from now on, dropping the oldest ones beyond that."""
+        with self._lock:
+            if self.traces.maxlen != keep:
+                self.traces = deque(self.traces, maxlen=keep)
+
+    def begin(self, label: str) -> Optional[Trace]:
+        """Start the trace of a dictation, None while profiling is off."""
+        if not self.enabled:
+            return None
+        trace: Trace = Trace(label)
+        with self._lock:
+            self._open_traces.append(trace)
+            if self._sampler is None or not self._sampler.is_alive():
+                self._sampler = threading.Thread(target=self._sample_loop, name="ProfilerSampler", daemon=True)
+                self._sampler.start()
+        return trace
+
+    def end(self, trace: Optional[Trace]) -> None:
+        if trace is None:
+            return
+        trace.end_ns = time.perf_counter_ns()
+        with self._lock:
+            if trace in self._open_traces:
+                self._open_traces.remove(trace)
+                self.traces.append(trace)
+
+    def span(self, name: str, trace: Optional[Trace] = None, **args: Any):
+        """Context manager timing a stage, a no-op while profiling is off."""
+        if not self.enabled:
+            return _NO_SPAN
+        return self._span(name, trace or self.background, args)
+
+    @contextmanager
+    def _span(self, name: str, trace: Trace, args: Dict[str, Any]) -> Iterator[None]:
+        start_ns: int = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            trace.add_span(name, start_ns, time.perf_counter_ns() - start_ns, args)
+
+    def _sample_loop(self) -> None:
+        own_id: Optional[int] = threading.get_ident()
+        while True:
+            now: int = time.perf_counter_ns()
+            with self._lock:
+                self._open_traces = [trace for trace in self._open_traces if now - trace.start_ns < self.MAX_TRACE_SECONDS * 1e9]
+                open_traces: List[Trace] = list(self._open_traces)
+            if not open_traces:
+                # Stop sampling between dictations, begin() starts a new sampler
+                with self._lock:
+                    if not self._open_traces:
+                        self._sampler = None
+                        return
+                continue
+            names: Dict[int, str] = {thread.ident: thread.name for thread in threading.enumerate() if thread.ident}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack: List[str] = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                    frame = frame.f_back
+                stack.reverse()
+                for trace in open_traces:
+                    with trace._lock:
+                        trace.samples.append((now, thread_id, tuple(stack)))
+                        trace.thread_names.setdefault(thread_id, names.get(thread_id, str(thread_id)))
+            time.sleep(self.sample_interval)
+
+    def export_chrome_trace(self, path: Path, traces: Optional[List[Trace]] = None) -> None:
+        """Write traces (by default all finished ones and the background spans) as Chrome trace JSON."""
+        if traces is None:
+            traces = [*self.traces, self.background]
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": chrome_trace_events(traces), "displayTimeUnit": "ms"}, f)
+
+
+def chrome_trace_events(traces: List[Trace]) -> List[Dict[str, Any]]:
+    """
+    Chrome trace events of the given traces, one process per trace.
+
+    Spans become complete ("X") events. Consecutive stack samples are merged into nested
+    events per stack frame, which the trace viewers show as a flame chart below the spans.
+    """
+    events: List[Dict[str, Any]] = []
+    for pid, trace in enumerate(traces, start=1):
+        events.append({"name": "process_name", "ph": "M", "pid": pid, "args": {"name": trace.label}})
+        with trace._lock:
+            spans = list(trace.spans)
+            samples = list(trace.samples)
+            thread_names = dict(trace.thread_names)
+        for thread_id, thread_name in thread_names.items():
+            events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": thread_id, "args": {"name": thread_name}})
+        for name, start_ns, duration_ns, thread_id, _, args in spans:
+            events.append({"name": name, "cat": "span", "ph": "X", "pid": pid, "tid": thread_id, "ts": start_ns / 1000, "dur": duration_ns / 1000, "args": args})
+        # Merge samples per thread: a frame stays open while the following samples still contain it
+        open_frames: Dict[int, List[Tuple[str, int]]] = {}
+        last_time: Dict[int, int] = {}
+        for sample_ns, thread_id, stack in samples:
+            frames: List[Tuple[str, int]] = open_frames.setdefault(thread_id, [])
+            common: int = 0
+            while common < len(frames) and common < len(stack) and frames[common][0] == stack[common]:
+                common += 1
+            for frame_name, frame_start in reversed(frames[common:]):
+                events.append({"name": frame_name, "cat": "sample", "ph": "X", "pid": pid, "tid": thread_id, "ts": frame_start / 1000, "dur": (sample_ns - frame_start) / 1000})
+            del frames[common:]
+            frames.extend((frame_name, sample_ns) for frame_name in stack[common:])
+            last_time[thread_id] = sample_ns
+        for thread_id, frames in open_frames.items():
+            for frame_name, frame_start in reversed(frames):
+                events.append(
+                    {"name": frame_name, "cat": "sample", "ph": "X", "pid": pid, "tid": thread_id, "ts": frame_start / 1000, "dur": (last_time[thread_id] - frame_start) / 1000}
+                )
+    return events
+
+
+def format_timeline(trace: Trace, width: int = 60) -> str:
+    """Plain text timeline of the spans of a trace, one bar per span, for the tray viewer."""
+    total_ns: int = max(1, trace.duration_ns())
+    with trace._lock:
+        spans = sorted(trace.spans, key=lambda span: span[1])
+    lines: List[str] = [f"{trace.label}  total {total_ns / 1e6:.1f} ms"]
+    name_width: int = max((len(span[0]) for span in spans), default=0)
+    for name, start_ns, duration_ns, _, thread_name, _ in spans:
+        offset: int = int((start_ns - trace.start_ns) / total_ns * width)
+        length: int = max(1, round(duration_ns / total_ns * width))
+        bar: str = " " * max(0, offset) + "█" * length
+        lines.append(f"{name:<{name_width}} {duration_ns / 1e6:8.1f} ms |{bar:<{width}}| {thread_name}")
+    return "\n".join(lines)
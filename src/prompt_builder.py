@@ -0,0 +1,113 @@
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from collections import deque
+from pathlib import Path
+import threading
+
+# Whisper keeps at most 223 prompt tokens and drops the oldest ones, so the budget stays below that
+MAX_PROMPT_TOKENS: int = 220
+
+
+class PromptBuilder:
+    """
+    Assembles the initial_prompt passed to Whisper for each recording.
+
+    The prompt is the configured template, followed by the terms of a vocabulary file
+    (project names, identifiers, ...) and the most recent transcriptions in the same
+    language. Whisper reads the prompt as the text preceding the audio, so recent
+    context goes last. Everything is trimmed to a token budget: the template is always
+    kept, then vocabulary terms in file order, then as much recent text as still fits.
+    Token counts are cached per tokenizer and piece of text, so only new transcriptions get
+    tokenized, even when the draft and the final model take turns.
+
+    Attributes:
+        vocabulary_file (Optional[Path]): Text file with one term per line, "#" starts a comment
+        recent_count (int): How many recent transcriptions are considered
+        max_tokens (int): Token budget of the whole prompt
+    """
+
+    def __init__(self, vocabulary_file: Optional[Path] = None, recent_count: int = 3, max_tokens: int = 200) -> None:
+        self.vocabulary_file: Optional[Path] = vocabulary_file
+        self.recent_count: int = recent_count
+        self.max_tokens: int = min(max_tokens, MAX_PROMPT_TOKENS)
+        self._recent: Deque[Tuple[str, str]] = deque(maxlen=max(recent_count, 1))
+        self._vocabulary: List[str] = []
+        self._vocabulary_mtime: Optional[float] = None
+        # Token counts by id() of the tokenizer (None for the estimate), the tokenizer is kept so its id stays unique
+        self._token_counts: Dict[Optional[int], Tuple[Any, Dict[str, int]]] = {}
+        self._lock: threading.Lock = threading.Lock()
+
+    def add_transcript(self, text: str, language: Optional[str]) -> None:
+        text = text.strip()
+        if text:
+            self._recent.append((language or "", text))
+
+    def _load_vocabulary(self) -> List[str]:
+        if self.vocabulary_file is None:
+            return []
+        try:
+            mtime: Optional[float] = self.vocabulary_file.stat().st_mtime
+        except OSError:
+            mtime = None
+        # Only re-read the file when it changed
+        if mtime != self._vocabulary_mtime:
+            self._vocabulary_mtime = mtime
+            self._vocabulary = []
+            if mtime is not None:
+                lines: List[str] = self.vocabulary_file.read_text(encoding="utf-8").splitlines()
+                self._vocabulary = [line.strip() for line in lines if line.strip() and not line.strip().startswith("#")]
+                print(f"Loaded {len(self._vocabulary)} vocabulary term(s) from {self.vocabulary_file}")
+        return self._vocabulary
+
+    def _count_tokens(self, text: str, tokenizer: Any, counts: Dict[str, int]) -> int:
+        count: Optional[int] = counts.get(text)
+        if count is None:
+            if tokenizer is not None:
+                count = len(tokenizer.encode(text, add_special_tokens=False).ids)
+            else:
+                # Rough estimate without a tokenizer
+                count = len(text) // 3 + 1
+            if len(counts) > 4096:
+                counts.clear()
+            counts[text] = count
+        return count
+
+    def _counts_for(self, tokenizer: Any) -> Dict[str, int]:
+        """The token count cache of a tokenizer, models can tokenize differently."""
+        key: Optional[int] = id(tokenizer) if tokenizer is not None else None
+        entry: Optional[Tuple[Any, Dict[str, int]]] = self._token_counts.get(key)
+        if entry is None:
+            if len(self._token_counts) >= 4:
+                # Tokenizers of unloaded models, start over
+                self._token_counts.clear()
+            entry = self._token_counts[key] = (tokenizer, {})
+        return entry[1]
+
+    def build(self, template: str, language: Optional[str], tokenizer: Any = None) -> str:
+        """Build the prompt for a recording, `tokenizer` is the model's Hugging Face tokenizer."""
+        with self._lock:
+            counts: Dict[str, int] = self._counts_for(tokenizer)
+            base: str = template.format(language=language)
+            budget: int = self.max_tokens - self._count_tokens(base, tokenizer, counts)
+            terms: List[str] = []
+            for term in self._load_vocabulary():
+                cost: int = self._count_tokens(" " + term + ",", tokenizer, counts)
+                if cost > budget:
+                    break
+                terms.append(term)
+                budget -= cost
+            recent: List[str] = []
+            for recent_language, text in reversed(self._recent):
+                if len(recent) >= self.recent_count:
+                    break
+                if language and recent_language and recent_language != language:
+                    continue
+                cost = self._count_tokens(" " + text, tokenizer, counts)
+                if cost > budget:
+                    break
+                recent.insert(0, text)
+                budget -= cost
+        parts: List[str] = [base]
+        if terms:
+            parts.append(", ".join(terms) + ".")
+        parts.extend(recent)
+        return " ".join(parts)
@@ -0,0 +1,83 @@
+from typing import Any, Callable, Dict, Optional
+import getpass
+import json
+from PySide6.QtCore import QObject
+from PySide6.QtNetwork import QLocalServer, QLocalSocket
+
+
+def get_server_name() -> str:
+    """Name of the local socket (a named pipe on Windows), one per user so accounts don't share an instance."""
+    return f"VibeHotkeyWindows-{getpass.getuser()}"
+
+
+def send_command(command: Dict[str, Any], timeout_ms: int = 1000) -> Optional[str]:
+    """
+    Pass a command to the running instance and return its reply, None if no instance is running.
+
+    Works without a QApplication, the socket is used in blocking mode.
+    """
+    socket: QLocalSocket = QLocalSocket()
+    socket.connectToServer(get_server_name())
+    if not socket.waitForConnected(timeout_ms):
+        return None
+    socket.write((json.dumps(command) + "\n").encode("utf-8"))
+    socket.waitForBytesWritten(timeout_ms)
+    reply: bytes = b""
+    while not reply.endswith(b"\n") and socket.waitForReadyRead(timeout_ms):
+        reply += bytes(socket.readAll().data())
+    socket.disconnectFromServer()
+    # An instance that accepted the connection is running, even if it was too busy to answer
+    return reply.decode("utf-8").strip() or "The running instance did not answer"
+
+
+class InstanceServer(QObject):
+    """
+    Makes the app a single instance and accepts commands from later launches.
+
+    The first instance listens on a local socket. A later launch finds it with `send_command`,
+    passes its command (one JSON object per line) and exits, instead of loading the model a
+    second time and reacting to the hotkeys twice. The handler runs on the GUI thread and
+    returns the reply that the later launch prints, so it should only schedule slow work.
+
+    Attributes:
+        handler (Callable[[Dict[str, Any]], str]): Runs a command and returns the reply
+    """
+
+    def __init__(self, handler: Callable[[Dict[str, Any]], str]) -> None:
+        super().__init__()
+        self.handler: Callable[[Dict[str, Any]], str] = handler
+        self._server: QLocalServer = QLocalServer(self)
+        self._server.setSocketOptions(QLocalServer.UserAccessOption)
+        self._server.newConnection.connect(self._on_new_connection)
+
+    def listen(self) -> bool:
+        """Start accepting commands, False if another instance already does."""
+        if self._server.listen(get_server_name()):
+            return True
+        if send_command({"action": "ping"}) is not None:
+            return False
+        # A crashed instance can leave its socket file behind on Unix
+        QLocalServer.removeServer(get_server_name())
+        return self._server.listen(get_server_name())
+
+    def close(self) -> None:
+        self._server.close()
+
+    def _on_new_connection(self) -> None:
+        while self._server.hasPendingConnections():
+            socket: QLocalSocket = self._server.nextPendingConnection()
+            socket.readyRead.connect(lambda socket=socket: self._on_ready_read(socket))
+            socket.disconnected.connect(socket.deleteLater)
+
+    def _on_ready_read(self, socket: QLocalSocket) -> None:
+        if not socket.canReadLine():
+            return
+        line: bytes = bytes(socket.readLine().data())
+        try:
+            command: Dict[str, Any] = json.loads(line)
+            reply: str = self.handler(command) if command.get("action") != "ping" else "pong"
+        except Exception as e:
+            reply = f"Error: {e}"
+        socket.write((reply + "\n").encode("utf-8"))
+        socket.flush()
+        socket.disconnectFromServer()
@@ -0,0 +1,191 @@
+from typing import Deque, Dict, List, Optional, Tuple
+from collections import deque
+from pathlib import Path
+import math
+import threading
+import time
+import numpy as np
+import sounddevice as sd
+from scipy.io.wavfile import read as read_wav
+from scipy.signal import resample_poly
+
+
+class SoundPlayer:
+    """
+    Plays the UI sound cues from memory through a single output stream.
+
+    The WAV files are decoded once when the player is created, trailing silence is trimmed
+    and everything is converted to the stream's rate and channel count, so playing a cue
+    on the hotkey path only swaps an array reference. The stream is opened at the default
+    output device's own rate (up to stereo), so the system mixer doesn't resample the cues. Playback goes through sounddevice,
+    which works the same on Windows, macOS and Linux. The stream only runs while cues play,
+    it stops itself after `IDLE_STOP_SECONDS` of silence so the audio device can go idle.
+
+    The output callback measures when each cue actually reaches the speaker, so the recording
+    can mute exactly the samples captured during it (see `silence_cues`).
+
+    Attributes:
+        volume (float): Gain applied to every cue, from 0.0 to 1.0
+        samplerate (int): Sample rate of the output stream
+        channels (int): Channel count of the output stream
+    """
+
+    IDLE_STOP_SECONDS: float = 30.0
+    # Extra time muted around a cue, for the uncertainty of the input and output timestamps
+    MUTE_MARGIN_SECONDS: float = 0.02
+
+    def __init__(self, sound_files: Dict[str, Path], volume: float = 1.0, samplerate: Optional[int] = None, channels: Optional[int] = None) -> None:
+        self.volume: float = volume
+        device_rate, device_channels = self._default_output_format()
+        self.samplerate: int = samplerate or device_rate
+        self.channels: int = channels or device_channels
+        self.cues: Dict[str, np.ndarray] = {}
+        self._lock: threading.Lock = threading.Lock()
+        self._current: Optional[np.ndarray] = None
+        self._position: int = 0
+        # (start, end) in time.monotonic() of the last cues, as measured by the output callback
+        self._audible: Deque[Tuple[float, float]] = deque(maxlen=4)
+        self._idle_frames: int = 0
+        self._stopping: bool = False
+        self._stream_lock: threading.Lock = threading.Lock()
+        self.stream: Optional[sd.OutputStream] = None
+        for name, path in sound_files.items():
+            try:
+                self.cues[name] = self._decode(path)
+            except (OSError, ValueError) as e:
+                print(f"Error: Could not load sound '{name}' from {path}: {e}")
+
+    @staticmethod
+    def _default_output_format() -> Tuple[int, int]:
+        """Rate and channel count (at most stereo) of the default output device, CD quality stereo without one."""
+        try:
+            device = sd.query_devices(kind="output")
+            return int(device["default_samplerate"]), max(1, min(2, int(device["max_output_channels"])))
+        except Exception as e:
+            print(f"Could not query the default output device, using 44.1 kHz stereo: {e}")
+            return 44100, 2
+
+    def _decode(self, path: Path) -> np.ndarray:
+        rate, data = read_wav(str(path))
+        # Convert integer PCM to float32 in [-1, 1]
+        if np.issubdtype(data.dtype, np.integer):
+            data = data.astype(np.float32) / np.iinfo(data.dtype).max
+        data = data.astype(np.float32)
+        if data.ndim == 1:
+            data = data[:, np.newaxis]
+        # Trim the silent tail, so the cue (and muting the microphone during it) ends when the sound does
+        audible = np.flatnonzero(np.abs(data).max(axis=1) > 10 ** (-50 / 20))
+        data = data[: audible[-1] + 1] if audible.size else data[:0]
+        if rate != self.samplerate:
+            data = resample_poly(data, self.samplerate, rate, axis=0).astype(np.float32)
+        if data.shape[1] != self.channels:
+            data = np.repeat(data.mean(axis=1, keepdims=True), self.channels, axis=1)
+        return np.ascontiguousarray(data)
+
+    def start(self) -> None:
+        """Open the output stream, it is started by the first cue. Without an output device the player stays silent."""
+        try:
+            self.stream = sd.OutputStream(
+                samplerate=self.samplerate,
+                channels=self.channels,
+                dtype="float32",
+                latency="low",
+                callback=self._callback,
+            )
+        except Exception as e:
+            print(f"Error: Could not open sound output stream: {e}")
+            self.stream = None
+
+    def _callback(self, outdata: np.ndarray, frames: int, time_info, status) -> None:
+        with self._lock:
+            current: Optional[np.ndarray] = self._current
+            position: int = self._position
+            if current is not None:
+                if position == 0:
+                    self._note_audible(time_info, len(current))
+                self._position += frames
+                if self._position >= len(current):
+                    self._current = None
+                self._idle_frames = 0
+            else:
+                self._idle_frames += frames
+                if self._idle_frames >= self.IDLE_STOP_SECONDS * self.samplerate:
+                    # Restarted by the next cue
+                    self._stopping = True
+                    outdata.fill(0)
+                    raise sd.CallbackStop
+        if current is None:
+            outdata.fill(0)
+            return
+        chunk: np.ndarray = current[position : position + frames]
+        outdata[: len(chunk)] = chunk
+        outdata[len(chunk) :] = 0
+
+    def _note_audible(self, time_info, length: int) -> None:
+        """Remember when a cue starting in this callback is heard, in time.monotonic(). Called with the lock held."""
+        now: float = time.monotonic()
+        delay: float = time_info.outputBufferDacTime - time_info.currentTime if time_info is not None else -1.0
+        if not 0.0 <= delay < 1.0:
+            # Host APIs without timestamps report 0, fall back to the stream's nominal latency
+            delay = self.stream.latency if self.stream is not None and isinstance(self.stream.latency, float) else 0.0
+        start: float = now + delay
+        if self._audible and self._audible[-1][1] > start:
+            # The previous cue is cut off by this one
+            self._audible[-1] = (self._audible[-1][0], start)
+        self._audible.append((start, start + length / self.samplerate))
+
+    def play(self, name: str) -> None:
+        """Start playing a cue, replacing any cue that is still playing."""
+        cue: Optional[np.ndarray] = self.cues.get(name)
+        if cue is None:
+            print(f"Warning: Sound '{name}' not found in sound_files")
+            return
+        if self.stream is None:
+            return
+        if self.volume != 1.0:
+            cue = cue * self.volume
+        with self._lock:
+            self._current = cue
+            self._position = 0
+            self._idle_frames = 0
+        self._ensure_running()
+
+    def _ensure_running(self) -> None:
+        with self._stream_lock:
+            if self.stream is None or (self.stream.active and not self._stopping):
+                return
+            try:
+                # A stream that stopped itself has to be stopped before it can start again
+                self.stream.stop()
+                self._stopping = False
+                self.stream.start()
+            except Exception as e:
+                print(f"Error: Could not start sound output stream: {e}")
+
+    def silence_cues(self, block: np.ndarray, start_time: float, samplerate: int) -> None:
+        """
+        Zero the samples of a recorded block that were captured while a cue was audible.
+
+        `start_time` is when the first sample of the block was captured, in time.monotonic().
+        """
+        with self._lock:
+            windows: List[Tuple[float, float]] = list(self._audible)
+        end_time: float = start_time + len(block) / samplerate
+        for cue_start, cue_end in windows:
+            cue_start -= self.MUTE_MARGIN_SECONDS
+            cue_end += self.MUTE_MARGIN_SECONDS
+            if cue_start < end_time and cue_end > start_time:
+                first: int = max(0, int((cue_start - start_time) * samplerate))
+                last: int = min(len(block), math.ceil((cue_end - start_time) * samplerate))
+                block[first:last] = 0.0
+
+    def stop(self) -> None:
+        with self._lock:
+            self._current = None
+
+    def close(self) -> None:
+        self.stop()
+        if self.stream is not None:
+            self.stream.stop()
+            self.stream.close()
+            self.stream = None
@@ -0,0 +1,56 @@
+from typing import Any, Callable, ClassVar, Dict, Optional, Tuple, Union
+from pathlib import Path
+import queue
+import numpy as np
+from PySide6.QtCore import QThread, Signal
+
+
+class TranscriptionThread(QThread):
+    """
+    A worker thread that transcribes recorded audio off the keyboard listener thread.
+
+    Recordings are processed in the order they were submitted, each with the profile
+    (language, decoding settings, ...) that was active when it was recorded. The thread
+    blocks on its queue while there is nothing to do, so it does not wake up between dictations.
+
+    Signals:
+        transcribed (str): Emitted with the text of every finished recording
+        error (str): Emitted if transcribing a recording raised
+        queue_empty (): Emitted when the last queued recording has been processed
+
+    Attributes:
+        transcribe_func (Callable): Transcribes one recording with its profile and returns the text
+    """
+
+    transcribed: ClassVar[Signal] = Signal(str)
+    error: ClassVar[Signal] = Signal(str)
+    queue_empty: ClassVar[Signal] = Signal()
+
+    def __init__(self, transcribe_func: Callable[[Union[np.ndarray, Path], Dict[str, Any]], str]) -> None:
+        super().__init__()
+        self.transcribe_func: Callable[[Union[np.ndarray, Path], Dict[str, Any]], str] = transcribe_func
+        self._queue: "queue.Queue[Optional[Tuple[Union[np.ndarray, Path], Dict[str, Any]]]]" = queue.Queue()
+
+    def submit(self, audio_data: Union[np.ndarray, Path], profile: Dict[str, Any]) -> None:
+        self._queue.put((audio_data, profile))
+
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def run(self) -> None:
+        while True:
+            job: Optional[Tuple[Union[np.ndarray, Path], Dict[str, Any]]] = self._queue.get()
+            if job is None:
+                return
+            try:
+                self.transcribed.emit(self.transcribe_func(*job))
+            except Exception as e:
+                error_msg: str = f"Error during transcription: {e}"
+                print(error_msg)
+                self.error.emit(error_msg)
+            if self._queue.empty():
+                self.queue_empty.emit()
+
+    def stop(self) -> None:
+        self._queue.put(None)
+        self.wait()
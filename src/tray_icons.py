@@ -0,0 +1,32 @@
+from typing import Dict, Tuple
+from PySide6.QtCore import Qt
+from PySide6.QtGui import QIcon, QPixmap, QPainter, QColor
+
+# Icons are rendered on first use and shared afterwards, the tray only swaps references
+_icon_cache: Dict[Tuple[str, Tuple[int, int, int]], QIcon] = {}
+
+
+def circle_icon(color: Tuple[int, int, int]) -> QIcon:
+    """Get a filled circle icon of the given RGB color."""
+    key: Tuple[str, Tuple[int, int, int]] = ("circle", color)
+    if key not in _icon_cache:
+        pixmap: QPixmap = QPixmap(64, 64)
+        pixmap.fill(Qt.transparent)
+        painter: QPainter = QPainter(pixmap)
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setBrush(QColor(*color))
+        painter.setPen(Qt.NoPen)
+        painter.drawEllipse(4, 4, 56, 56)
+        painter.end()
+        _icon_cache[key] = QIcon(pixmap)
+    return _icon_cache[key]
+
+
+def square_icon(color: Tuple[int, int, int]) -> QIcon:
+    """Get a filled square icon of the given RGB color."""
+    key: Tuple[str, Tuple[int, int, int]] = ("square", color)
+    if key not in _icon_cache:
+        pixmap: QPixmap = QPixmap(64, 64)
+        pixmap.fill(QColor(*color))
+        _icon_cache[key] = QIcon(pixmap)
+    return _icon_cache[key]
@@ -0,0 +1,84 @@
+"""AudioConditioner, fed block by block like the audio callback does."""
+
+import numpy as np
+
+from audio_conditioner import AudioConditioner
+
+RATE = 16000
+
+
+def condition(conditioner, audio, block_size=1600):
+    blocks = [conditioner.process(audio[i : i + block_size]) for i in range(0, len(audio), block_size)]
+    return np.concatenate(blocks + [conditioner.flush()])
+
+
+def noise(seconds, amplitude, seed=0):
+    return (np.random.default_rng(seed).standard_normal(int(seconds * RATE)) * amplitude).astype(np.float32)
+
+
+def rms_db(audio):
+    return 10 * np.log10(np.mean(audio.astype(np.float64) ** 2) + 1e-20)
+
+
+def test_output_is_as_long_as_the_input():
+    audio = noise(1.0, 0.05)
+    for block_size in (1600, 441, 100, 16000):
+        conditioner = AudioConditioner(RATE)
+        assert len(condition(conditioner, audio[:-37], block_size)) == len(audio) - 37
+
+
+def test_disabled_stages_leave_the_audio_alone():
+    audio = noise(0.5, 0.05)
+    conditioner = AudioConditioner(RATE, high_pass_hz=None, noise_reduction_db=None, target_dbfs=None)
+    np.testing.assert_array_equal(condition(conditioner, audio), audio)
+
+
+def test_high_pass_removes_dc_offset():
+    audio = noise(1.0, 0.01) + 0.3
+    conditioner = AudioConditioner(RATE, high_pass_hz=80.0, noise_reduction_db=None, target_dbfs=None)
+    output = condition(conditioner, audio)
+    assert abs(float(np.mean(output[RATE // 2 :]))) < 0.005
+
+
+def test_noise_gate_attenuates_stationary_noise():
+    audio = noise(2.0, 0.01)
+    conditioner = AudioConditioner(RATE, high_pass_hz=None, noise_reduction_db=12.0, target_dbfs=None)
+    output = condition(conditioner, audio)
+    assert rms_db(output[RATE:]) < rms_db(audio[RATE:]) - 6
+
+
+def test_gain_control_brings_quiet_speech_to_the_target():
+    tone = (0.01 * np.sqrt(2) * np.sin(2 * np.pi * 300 * np.arange(2 * RATE) / RATE)).astype(np.float32)
+    audio = np.concatenate((noise(0.5, 0.0005), tone))
+    conditioner = AudioConditioner(RATE, high_pass_hz=None, noise_reduction_db=None, target_dbfs=-20.0, max_gain_db=30.0)
+    output = condition(conditioner, audio)
+    # The tone is at -40 dBFS
+    assert abs(rms_db(output[-RATE // 2 :]) + 20.0) < 1.0
+
+
+def test_gain_control_is_limited_and_ignores_background_noise():
+    audio = noise(2.0, 0.003)
+    conditioner = AudioConditioner(RATE, high_pass_hz=None, noise_reduction_db=None, target_dbfs=-20.0, max_gain_db=20.0)
+    np.testing.assert_array_equal(condition(conditioner, audio), audio)
+    tone = (0.005 * np.sqrt(2) * np.sin(2 * np.pi * 300 * np.arange(2 * RATE) / RATE)).astype(np.float32)
+    conditioner = AudioConditioner(RATE, high_pass_hz=None, noise_reduction_db=None, target_dbfs=-20.0, max_gain_db=20.0)
+    output = condition(conditioner, np.concatenate((noise(0.5, 0.0003), tone)))
+    # The tone is at -46 dBFS, 20 dB short of the target
+    assert abs(rms_db(output[-RATE // 2 :]) + 26.0) < 1.0
+
+
+def test_muted_stretches_dont_make_noise_look_like_speech():
+    # A cue muted in the middle of a noisy background
+    audio = noise(3.0, 0.005)
+    audio[RATE : RATE + RATE // 2] = 0.0
+    conditioner = AudioConditioner(RATE, high_pass_hz=80.0, noise_reduction_db=None, target_dbfs=-20.0, max_gain_db=20.0)
+    output = condition(conditioner, audio)
+    assert abs(rms_db(output[2 * RATE :]) - rms_db(audio[2 * RATE :])) < 1.0
+
+
+def test_reset_forgets_the_previous_recording():
+    audio = noise(1.0, 0.05)
+    conditioner = AudioConditioner(RATE)
+    first = condition(conditioner, audio)
+    conditioner.reset()
+    np.testing.assert_allclose(condition(conditioner, audio), first, atol=1e-6)
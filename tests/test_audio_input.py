@@ -0,0 +1,61 @@
+"""StreamingResampler, fed block by block like the audio callback does."""
+
+import numpy as np
+import pytest
+
+from audio_input import StreamingResampler
+
+
+def tone(frequency, seconds, rate, amplitude=0.5):
+    return (amplitude * np.sin(2 * np.pi * frequency * np.arange(int(seconds * rate)) / rate)).astype(np.float32)
+
+
+def resample_in_blocks(resampler, audio, block_sizes):
+    output, position, i = [], 0, 0
+    while position < len(audio):
+        size = block_sizes[i % len(block_sizes)]
+        output.append(resampler.process(audio[position : position + size]))
+        position += size
+        i += 1
+    output.append(resampler.flush())
+    return np.concatenate(output)
+
+
+def rms_db(audio):
+    return 10 * np.log10(np.mean(audio.astype(np.float64) ** 2) + 1e-20)
+
+
+@pytest.mark.parametrize("in_rate", [44100, 48000, 22050, 8000])
+@pytest.mark.parametrize("frames", [1, 441, 12345, 48000])
+def test_output_length_matches_the_rate_ratio(in_rate, frames):
+    resampler = StreamingResampler(in_rate, 16000)
+    audio = np.random.default_rng(frames).standard_normal(frames).astype(np.float32)
+    output = resample_in_blocks(resampler, audio, [frames])
+    assert len(output) == -(-frames * 16000 // in_rate)
+
+
+def test_blocks_give_the_same_result_as_the_whole_recording():
+    audio = np.random.default_rng(0).standard_normal(44100).astype(np.float32)
+    whole = resample_in_blocks(StreamingResampler(44100, 16000), audio, [len(audio)])
+    blocks = resample_in_blocks(StreamingResampler(44100, 16000), audio, [512, 441, 1, 2048, 93])
+    assert len(blocks) == len(whole)
+    np.testing.assert_allclose(blocks, whole, atol=1e-5)
+
+
+def test_passband_is_kept_and_aliases_are_rejected():
+    resampler = StreamingResampler(48000, 16000)
+    kept = resample_in_blocks(resampler, tone(1000, 1.0, 48000), [480])
+    resampler = StreamingResampler(48000, 16000)
+    # Above the output's Nyquist frequency, would fold down to 4 kHz without the low-pass filter
+    aliased = resample_in_blocks(resampler, tone(12000, 1.0, 48000), [480])
+    steady = slice(1000, -1000)
+    assert abs(rms_db(kept[steady]) - rms_db(tone(1000, 1.0, 16000))) < 0.5
+    assert rms_db(aliased[steady]) < rms_db(kept[steady]) - 60
+
+
+def test_stereo_is_mixed_down():
+    left = tone(440, 0.1, 16000)
+    block = np.stack((left, np.zeros_like(left)), axis=1)
+    resampler = StreamingResampler(16000, 16000)
+    np.testing.assert_allclose(resampler.process(block), left / 2)
+    assert len(resampler.flush()) == 0
@@ -0,0 +1,75 @@
+"""Validation of config.json and the detection of edited keys."""
+
+import copy
+
+from config import DEFAULT_CONFIG, changed_keys, parse_config, validate_config
+
+
+def test_valid_config_has_no_problems():
+    config = copy.deepcopy(DEFAULT_CONFIG)
+    assert validate_config(config) == []
+    assert config == DEFAULT_CONFIG
+
+
+def test_invalid_values_are_replaced_by_their_defaults():
+    config = {"sound_volume": "loud", "device_mode": "gpu", "cuda_device": True, "hotkey_mode": "hold"}
+    problems = validate_config(config)
+    assert len(problems) == 3
+    assert config == {
+        "sound_volume": DEFAULT_CONFIG["sound_volume"],
+        "device_mode": DEFAULT_CONFIG["device_mode"],
+        "cuda_device": DEFAULT_CONFIG["cuda_device"],
+        "hotkey_mode": "hold",
+    }
+
+
+def test_invalid_keys_without_a_default_are_dropped():
+    config = {"output_sink": "fax"}
+    assert validate_config(config) == ["'output_sink' should be one of clipboard, paste, paste_restore, stream, type, got \"fax\""]
+    assert config == {}
+
+
+def test_volume_is_clamped():
+    config = {"sound_volume": 1.5}
+    assert len(validate_config(config)) == 1
+    assert config["sound_volume"] == 1.0
+
+
+def test_sections_are_checked_setting_by_setting():
+    config = {"idle_unload": {"enabled": "yes", "minutes": 7.5, "mode": "sleep"}, "two_pass": {"enabled": True}}
+    problems = validate_config(config)
+    assert problems == [
+        "'idle_unload.enabled' should be bool, got \"yes\"",
+        "'idle_unload.mode' should be one of cpu, int8, unload, got \"sleep\"",
+    ]
+    assert config["idle_unload"] == {**DEFAULT_CONFIG["idle_unload"], "minutes": 7.5}
+    # Missing settings are filled in
+    assert config["two_pass"] == {**DEFAULT_CONFIG["two_pass"], "enabled": True}
+
+
+def test_counts_must_be_whole_and_some_settings_may_be_null():
+    config = {
+        "decode_guards": {"min_repeats": 2.5},
+        "latency_slo": {"fallback_model": None},
+        "audio_processing": {"high_pass_hz": None, "target_dbfs": -18},
+    }
+    assert validate_config(config) == ["'decode_guards.min_repeats' should be int, got 2.5"]
+    assert config["decode_guards"]["min_repeats"] == DEFAULT_CONFIG["decode_guards"]["min_repeats"]
+    assert config["latency_slo"]["fallback_model"] is None
+    assert config["audio_processing"]["high_pass_hz"] is None
+    assert config["audio_processing"]["target_dbfs"] == -18
+
+
+def test_parse_config_merges_the_defaults():
+    config = parse_config('{"model": "small", "hotkey": ["ctrl", "space"]}')
+    assert config["model"] == "small"
+    assert config["hotkey"] == {"ctrl", "space"}
+    assert config["profiling"] == DEFAULT_CONFIG["profiling"]
+
+
+def test_changed_keys():
+    old = parse_config('{"model": "small"}')
+    new = parse_config('{"model": "small", "language": "de", "idle_unload": {"minutes": 5}}')
+    assert changed_keys(old, new) == {"language", "idle_unload"}
+    assert changed_keys(old, {**old, "output_sink": "type"}) == {"output_sink"}
+    assert changed_keys(old, copy.deepcopy(old)) == set()
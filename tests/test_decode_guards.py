@@ -0,0 +1,100 @@
+"""Decode guards, fed with segments shaped like the ones faster-whisper yields."""
+
+from types import SimpleNamespace
+
+from decode_guards import MAX_NEW_TOKENS_LIMIT, DecodeGuards, repeated_tail, timestamp_begin
+
+
+def segment(text, tokens=(), seek=0, temperature=0.0):
+    return SimpleNamespace(text=text, tokens=list(tokens), seek=seek, temperature=temperature)
+
+
+def test_repeated_tail_points_at_the_first_repetition():
+    words = "we should ship it it it it".split()
+    assert repeated_tail(words, min_repeats=4) == 4
+    words = "let me check a b a b a b a b".split()
+    assert repeated_tail(words, min_repeats=4) == 5
+
+
+def test_repeated_tail_ignores_short_repetitions():
+    assert repeated_tail("that is very very good".split(), min_repeats=4) is None
+    assert repeated_tail("no no no".split(), min_repeats=4) is None
+    assert repeated_tail([], min_repeats=4) is None
+
+
+def test_options_scale_the_token_budget_with_the_duration():
+    guards = DecodeGuards(tokens_per_second=8.0, min_tokens=16, max_fallbacks=2)
+    assert guards.options(1.0) == {"max_new_tokens": 24, "temperature": [0.0, 0.2, 0.4]}
+    # A window holds at most 30 seconds, and Whisper's own limit applies
+    assert guards.options(600.0)["max_new_tokens"] == MAX_NEW_TOKENS_LIMIT
+
+
+def test_check_segment_trims_a_looping_phrase():
+    guards = DecodeGuards(min_repeats=4)
+    guards.options(10.0)
+    assert guards.check_segment(segment(" I think so so so so")) == (" I think so", False)
+    assert guards.trips == {"repetition_trim": 1}
+
+
+def test_check_segment_keeps_a_phrase_said_twice():
+    guards = DecodeGuards(min_repeats=4)
+    guards.options(10.0)
+    assert guards.check_segment(segment(" Thank you, thank you.")) == (" Thank you, thank you.", False)
+    assert guards.check_segment(segment(" Next point.")) == (" Next point.", False)
+    # Held back until the next segment shows it isn't a loop
+    assert guards.check_segment(segment(" Next point.")) == ("", False)
+    assert guards.check_segment(segment(" Done.")) == (" Next point.  Done.", False)
+    assert guards.check_segment(segment(" Done.")) == ("", False)
+    assert guards.flush() == " Done."
+    assert guards.trips == {}
+
+
+def test_check_segment_stops_on_a_repeated_segment():
+    guards = DecodeGuards(min_repeats=3)
+    guards.options(60.0)
+    results = [guards.check_segment(segment(text)) for text in (" Okay.", " Thanks for watching.", " Thanks for watching.", " thanks for watching.")]
+    # Trimmed back to the first occurrence
+    assert results == [(" Okay.", False), (" Thanks for watching.", False), ("", False), ("", True)]
+    assert guards.flush() == ""
+    assert guards.trips == {"repetition_stop": 1}
+
+
+def test_check_segment_counts_text_tokens_per_window():
+    guards = DecodeGuards(tokens_per_second=8.0, min_tokens=16)
+    guards.options(1.0, timestamp_begin=50365)
+    guards.check_segment(segment(" First.", tokens=range(12), seek=0))
+    guards.check_segment(segment(" Second.", tokens=[50365, *range(12), 50400], seek=3000))
+    assert "token_cap" not in guards.trips
+    # Timestamp tokens don't count, 12 + 12 text tokens reach the budget of 24
+    guards.check_segment(segment(" Third.", tokens=[50400, *range(12), 50450], seek=3000))
+    assert guards.trips == {"token_cap": 1}
+
+
+def test_timestamp_tokens_count_without_a_tokenizer():
+    guards = DecodeGuards(tokens_per_second=8.0, min_tokens=16)
+    guards.options(1.0)
+    guards.check_segment(segment(" First.", tokens=[50365, *range(22), 50400]))
+    assert guards.trips == {"token_cap": 1}
+
+
+def test_timestamp_begin_follows_the_tokenizer():
+    tokenizer = SimpleNamespace(token_to_id={"<|notimestamps|>": 50363}.get)
+    assert timestamp_begin(SimpleNamespace(hf_tokenizer=tokenizer)) == 50364
+    assert timestamp_begin(SimpleNamespace()) is None
+
+
+def test_check_segment_counts_temperature_fallbacks():
+    guards = DecodeGuards(max_fallbacks=2)
+    guards.options(5.0)
+    guards.check_segment(segment(" Retried once.", temperature=0.2))
+    guards.check_segment(segment(" Retried twice.", temperature=0.4))
+    assert guards.trips == {"temperature_fallback": 2, "fallback_cap": 1}
+
+
+def test_options_reset_the_state_of_the_previous_decode():
+    guards = DecodeGuards(min_repeats=2)
+    guards.options(5.0)
+    guards.check_segment(segment(" Hello."))
+    guards.options(5.0)
+    assert guards.check_segment(segment(" Hello.")) == (" Hello.", False)
+    assert guards.trips == {}
@@ -0,0 +1,53 @@
+"""Searching the transcript history."""
+
+import pytest
+
+from history import TranscriptHistory
+
+
+@pytest.fixture
+def history(tmp_path):
+    history = TranscriptHistory(tmp_path / "history.db")
+    for text in ("Send the quarterly report to Anna", "Meeting moved to Thursday", "The report is done", "Reported the bug"):
+        history.add(text, "small", "en", duration=2.0, latency=0.5)
+    # Writes happen on the background thread, closing waits for them
+    history.close()
+    history = TranscriptHistory(tmp_path / "history.db")
+    yield history
+    history.close()
+
+
+def texts(rows):
+    return [row["text"] for row in rows]
+
+
+def test_empty_query_lists_the_newest_first(history):
+    assert texts(history.search("")) == ["Reported the bug", "The report is done", "Meeting moved to Thursday", "Send the quarterly report to Anna"]
+    assert texts(history.search("", limit=1)) == ["Reported the bug"]
+
+
+def test_all_words_have_to_match_as_prefixes(history):
+    assert texts(history.search("report")) == ["Reported the bug", "The report is done", "Send the quarterly report to Anna"]
+    assert texts(history.search("report ann")) == ["Send the quarterly report to Anna"]
+    assert texts(history.search("thurs")) == ["Meeting moved to Thursday"]
+    assert history.search("invoice") == []
+
+
+def test_query_syntax_is_not_interpreted(history):
+    assert texts(history.search('report" bug')) == ["Reported the bug"]
+    # OR is just another word that has to match
+    assert history.search("report OR bug") == []
+    assert history.search("NEAR(") == []
+
+
+def test_rows_carry_the_metadata(history):
+    row = history.search("meeting")[0]
+    assert row["model"] == "small"
+    assert row["language"] == "en"
+    assert row["duration"] == 2.0
+    assert row["audio_path"] is None
+
+
+def test_like_fallback_without_full_text_index(history):
+    history.has_fts = False
+    assert texts(history.search("report ann")) == ["Send the quarterly report to Anna"]
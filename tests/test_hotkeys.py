@@ -0,0 +1,104 @@
+"""HotkeyEngine matching, fed with pynput key events the way the keyboard listener delivers them.
+
+uv run --with pytest pytest
+"""
+
+import pytest
+from pynput import keyboard
+
+from hotkeys import HotkeyBinding, HotkeyEngine, normalize_key
+
+CTRL_SHIFT_SPACE = HotkeyBinding(["ctrl", "shift", "space"], mode="toggle")
+CTRL_ALT_G = HotkeyBinding(["ctrl", "alt", "g"], mode="hold", profile="german")
+
+
+def press(engine, *keys):
+    """Press the keys in order, returns what each press matched."""
+    return [engine.press(normalize_key(key)) for key in keys]
+
+
+def release(engine, *keys):
+    return [engine.release(normalize_key(key)) for key in keys]
+
+
+@pytest.fixture
+def engine():
+    return HotkeyEngine([HotkeyBinding(CTRL_SHIFT_SPACE.keys, "toggle"), HotkeyBinding(CTRL_ALT_G.keys, "hold", "german")])
+
+
+def test_normalize_folds_left_and_right_modifiers():
+    assert normalize_key(keyboard.Key.ctrl_l) == normalize_key(keyboard.Key.ctrl_r) == "ctrl"
+    assert normalize_key(keyboard.Key.shift_r) == "shift"
+    assert normalize_key(keyboard.Key.alt_l) == "alt"
+    assert normalize_key(keyboard.Key.space) == "space"
+
+
+def test_normalize_character_keys():
+    assert normalize_key(keyboard.KeyCode.from_vk(71)) == "g"
+    assert normalize_key(keyboard.KeyCode.from_char("G")) == "g"
+    # Control characters (ctrl + g typed on some layouts) can't be part of a hotkey
+    assert normalize_key(keyboard.KeyCode.from_char("\x07")) is None
+
+
+def test_press_matches_on_the_key_that_completes_the_chord(engine):
+    matches = press(engine, keyboard.Key.ctrl_l, keyboard.Key.shift, keyboard.Key.space)
+    assert matches[:2] == [None, None]
+    assert matches[2] is not None and matches[2].mode == "toggle"
+
+
+def test_press_order_does_not_matter(engine):
+    matches = press(engine, keyboard.Key.space, keyboard.Key.shift_r, keyboard.Key.ctrl_r)
+    assert matches[2] is not None and matches[2].keys == CTRL_SHIFT_SPACE.keys
+
+
+def test_auto_repeat_does_not_match_again(engine):
+    press(engine, keyboard.Key.ctrl, keyboard.Key.shift, keyboard.Key.space)
+    # Holding the chord makes the OS repeat the press of the last key
+    assert press(engine, keyboard.Key.space, keyboard.Key.space) == [None, None]
+
+
+def test_extra_key_prevents_the_match(engine):
+    matches = press(engine, keyboard.Key.ctrl, keyboard.Key.shift, keyboard.KeyCode.from_vk(65), keyboard.Key.space)
+    assert matches == [None, None, None, None]
+
+
+def test_chord_matches_again_after_release(engine):
+    press(engine, keyboard.Key.ctrl, keyboard.Key.shift, keyboard.Key.space)
+    release(engine, keyboard.Key.space)
+    assert press(engine, keyboard.Key.space)[0] is not None
+
+
+def test_release_of_toggle_chord_reports_nothing(engine):
+    press(engine, keyboard.Key.ctrl, keyboard.Key.shift, keyboard.Key.space)
+    assert release(engine, keyboard.Key.space, keyboard.Key.shift, keyboard.Key.ctrl) == [None, None, None]
+    assert not engine.any_pressed()
+
+
+def test_hold_binding_is_reported_once_when_the_chord_breaks(engine):
+    matches = press(engine, keyboard.Key.ctrl_l, keyboard.Key.alt_l, keyboard.KeyCode.from_vk(71))
+    assert matches[2] is not None and matches[2].mode == "hold" and matches[2].profile == "german"
+    assert engine.held is matches[2]
+    released = release(engine, keyboard.Key.alt_l, keyboard.KeyCode.from_vk(71), keyboard.Key.ctrl_l)
+    assert released[0] is matches[2]
+    assert released[1:] == [None, None]
+    assert engine.held is None
+
+
+def test_release_of_unrelated_key_keeps_the_hold(engine):
+    press(engine, keyboard.Key.ctrl, keyboard.Key.alt, keyboard.KeyCode.from_vk(71))
+    # Never pressed and not part of the chord
+    assert release(engine, keyboard.Key.shift) == [None]
+    assert engine.held is not None
+
+
+def test_modifier_only_bindings_are_ignored():
+    engine = HotkeyEngine([HotkeyBinding(["ctrl", "shift"])])
+    assert engine.bindings == []
+    assert press(engine, keyboard.Key.ctrl, keyboard.Key.shift) == [None, None]
+
+
+def test_set_bindings_drops_a_held_chord(engine):
+    press(engine, keyboard.Key.ctrl, keyboard.Key.alt, keyboard.KeyCode.from_vk(71))
+    engine.set_bindings([HotkeyBinding(["ctrl", "alt", "g"], "hold")])
+    assert engine.held is None
+    assert release(engine, keyboard.KeyCode.from_vk(71)) == [None]
@@ -0,0 +1,43 @@
+"""LatencyController levels and the settings they apply."""
+
+from latency_controller import LatencyController
+
+PROFILE = {"model": "large-v3", "language": "en", "beam_size": 5}
+
+
+def test_configured_level_keeps_the_profile():
+    controller = LatencyController()
+    assert controller.adjust(PROFILE, "base") is PROFILE
+
+
+def test_greedy_level_only_lowers_the_beam_size():
+    controller = LatencyController()
+    controller.level = 1
+    assert controller.adjust(PROFILE, "base") == {**PROFILE, "beam_size": 1, "latency_level": "greedy"}
+    assert PROFILE["beam_size"] == 5
+
+
+def test_fallback_level_switches_to_the_loaded_fallback_model():
+    controller = LatencyController()
+    controller.level = 2
+    assert controller.adjust(PROFILE, "base") == {**PROFILE, "model": "base", "beam_size": 1, "latency_level": "fallback_model"}
+    # Not loaded (yet), stay greedy on the configured model
+    assert controller.adjust(PROFILE, None)["model"] == "large-v3"
+
+
+def test_slow_dictations_step_down_and_fast_ones_step_back_up():
+    controller = LatencyController(target_seconds=1.0, min_samples=3, max_level=1)
+    assert controller.observe(5.0, 2.5) == ("configured", "greedy")
+    assert controller.adjust(PROFILE)["beam_size"] == 1
+    # Long clips don't count towards the target
+    assert controller.observe(60.0, 0.1) is None
+    results = [controller.observe(5.0, 0.3) for _ in range(3)]
+    assert results == [None, None, ("greedy", "configured")]
+    assert controller.adjust(PROFILE) is PROFILE
+
+
+def test_never_steps_below_max_level():
+    controller = LatencyController(target_seconds=1.0, min_samples=3, max_level=1)
+    assert controller.observe(5.0, 2.5) == ("configured", "greedy")
+    assert controller.observe(5.0, 2.5) is None
+    assert controller.level_name == "greedy"
@@ -0,0 +1,39 @@
+"""Replacing delivered text with as few keystrokes as possible."""
+
+import pytest
+
+import output_sinks
+from output_sinks import TypeSink, common_prefix_length, note_key_press
+
+
+def test_common_prefix_length():
+    assert common_prefix_length("Hello world.", "Hello, world.") == 5
+    assert common_prefix_length("same", "same") == 4
+    assert common_prefix_length("same", "same but longer") == 4
+    assert common_prefix_length("", "text") == 0
+    assert common_prefix_length("abc", "xbc") == 0
+
+
+@pytest.fixture
+def keystrokes(monkeypatch):
+    """What the sinks would have typed, as a list of ("erase", count) and ("type", text)."""
+    sent = []
+    monkeypatch.setattr(output_sinks, "erase_text", lambda count: sent.append(("erase", count)))
+    monkeypatch.setattr(output_sinks, "inject_text", lambda text: sent.append(("type", text)))
+    monkeypatch.setattr(output_sinks, "focused_window", lambda: 1)
+    return sent
+
+
+def test_replace_only_retypes_after_the_common_prefix(keystrokes):
+    sink = TypeSink()
+    sink.remember_target()
+    assert sink.replace("I red the book", "I read the book")
+    assert keystrokes == [("erase", 10), ("type", "ad the book")]
+
+
+def test_replace_leaves_the_text_alone_after_the_user_typed(keystrokes):
+    sink = TypeSink()
+    sink.remember_target()
+    note_key_press()
+    assert not sink.replace("draft", "final")
+    assert keystrokes == []
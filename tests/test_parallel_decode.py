@@ -0,0 +1,86 @@
+"""Splitting long recordings at pauses for the parallel decoder."""
+
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from parallel_decode import ParallelDecoder, merge_infos, split_on_silence
+
+RATE = 16000
+
+
+def speech(seconds, pauses=(), seed=0):
+    """
+    Noise in syllables of 200 ms with short gaps in between, standing in for speech, over a quiet
+    background. Each of `pauses` (in seconds) starts half a second of just the background.
+    """
+    samples = int(seconds * RATE)
+    envelope = np.where(np.arange(samples) % int(0.33 * RATE) < int(0.2 * RATE), 0.1, 0.003)
+    for start in pauses:
+        envelope[int(start * RATE) : int((start + 0.5) * RATE)] = 0.003
+    return (np.random.default_rng(seed).standard_normal(samples) * envelope).astype(np.float32)
+
+
+def assert_covers(chunks, length):
+    assert chunks[0][0] == 0
+    assert chunks[-1][1] == length
+    for (_, end), (start, _) in zip(chunks, chunks[1:]):
+        assert end == start
+
+
+def test_short_recordings_stay_in_one_piece():
+    audio = speech(20.0)
+    assert split_on_silence(audio, RATE) == [(0, len(audio))]
+    assert split_on_silence(np.zeros(0, dtype=np.float32), RATE) == [(0, 0)]
+
+
+def test_cuts_fall_into_the_pauses():
+    audio = speech(60.0, pauses=(15.0, 35.0, 50.0))
+    chunks = split_on_silence(audio, RATE)
+    assert_covers(chunks, len(audio))
+    assert len(chunks) == 3
+    # In the middle of the pause at 15 s, then of the one at 35 s, each within 10 to 28 s of the previous cut
+    assert abs(chunks[0][1] / RATE - 15.25) < 0.2
+    assert abs(chunks[1][1] / RATE - 35.25) < 0.2
+
+
+def test_recordings_without_pauses_are_cut_at_the_maximum_length():
+    audio = speech(70.0)
+    chunks = split_on_silence(audio, RATE, max_chunk_seconds=28.0)
+    assert_covers(chunks, len(audio))
+    assert all(end - start <= 28.0 * RATE for start, end in chunks)
+    assert len(chunks) == 3
+
+
+def info(language, probability, duration):
+    return SimpleNamespace(language=language, language_probability=probability, duration=duration, duration_after_vad=duration)
+
+
+def test_merged_info_covers_the_whole_recording():
+    merged = merge_infos([info("de", 0.6, 10.0), info("en", 0.9, 20.0), info("en", 0.7, 20.0)])
+    assert merged.language == "en"
+    assert merged.language_probability == pytest.approx(0.8)
+    assert merged.duration == merged.duration_after_vad == 50.0
+    # Ties go to the language detected first
+    assert merge_infos([info("de", 0.6, 10.0), info("en", 0.9, 10.0)]).language == "de"
+
+
+class ChunkModel:
+    """Reports each chunk's length and a language by the chunk's loudness."""
+
+    def transcribe(self, audio, **options):
+        seconds = len(audio) / RATE
+        language = "de" if np.abs(audio).max() > 1.0 else "en"
+        return iter([SimpleNamespace(text=f" {seconds:.0f} seconds")]), info(language, 0.9, seconds)
+
+
+def test_parallel_decoder_keeps_the_chunk_order():
+    audio = np.zeros(60 * RATE, dtype=np.float32)
+    audio[: 10 * RATE] = 2.0
+    decoder = ParallelDecoder(num_workers=3)
+    delivered = []
+    texts, merged = decoder.transcribe(ChunkModel(), audio, [(0, 10 * RATE), (10 * RATE, 35 * RATE), (35 * RATE, 60 * RATE)], on_chunk=delivered.append)
+    decoder.shutdown()
+    assert texts == delivered == [" 10 seconds", " 25 seconds", " 25 seconds"]
+    assert (merged.language, merged.duration) == ("en", 60.0)
@@ -0,0 +1,64 @@
+"""PromptBuilder trimming to its token budget, with a tokenizer that counts words."""
+
+from types import SimpleNamespace
+
+from prompt_builder import PromptBuilder
+
+
+class WordTokenizer:
+    def __init__(self):
+        self.calls = 0
+
+    def encode(self, text, add_special_tokens=True):
+        self.calls += 1
+        return SimpleNamespace(ids=text.split())
+
+
+def test_vocabulary_is_cut_in_file_order(tmp_path):
+    vocabulary_file = tmp_path / "vocabulary.txt"
+    vocabulary_file.write_text("# Terms\nalpha\nbeta\n\ngamma\ndelta\nepsilon\n", encoding="utf-8")
+    builder = PromptBuilder(vocabulary_file, max_tokens=6)
+    assert builder.build("Spoken {language}.", "en", WordTokenizer()) == "Spoken en. alpha, beta, gamma, delta."
+
+
+def test_template_is_kept_beyond_the_budget():
+    builder = PromptBuilder(max_tokens=2)
+    builder.add_transcript("Some earlier text.", "en")
+    assert builder.build("A long template in {language}.", "en", WordTokenizer()) == "A long template in en."
+
+
+def test_recent_transcripts_in_the_same_language_fill_the_rest():
+    builder = PromptBuilder(recent_count=3, max_tokens=10)
+    builder.add_transcript("one two three", "en")
+    builder.add_transcript("vier fünf", "de")
+    builder.add_transcript(" six seven eight nine ", "en")
+    tokenizer = WordTokenizer()
+    assert builder.build("Hello there.", "en", tokenizer) == "Hello there. one two three six seven eight nine"
+    # The newest transcript goes in first, older ones only while they fit
+    builder.max_tokens = 7
+    assert builder.build("Hello there.", "en", tokenizer) == "Hello there. six seven eight nine"
+    builder.recent_count = 1
+    assert builder.build("Hello there.", "de", tokenizer) == "Hello there. vier fünf"
+
+
+def test_token_counts_are_cached():
+    builder = PromptBuilder(max_tokens=50)
+    builder.add_transcript("cached text", "en")
+    tokenizer = WordTokenizer()
+    builder.build("Hello.", "en", tokenizer)
+    calls = tokenizer.calls
+    builder.build("Hello.", "en", tokenizer)
+    assert tokenizer.calls == calls
+
+
+def test_token_counts_are_kept_per_tokenizer():
+    builder = PromptBuilder(max_tokens=50)
+    builder.add_transcript("cached text", "en")
+    draft, final = WordTokenizer(), WordTokenizer()
+    builder.build("Hello.", "en", draft)
+    builder.build("Hello.", "en", final)
+    calls = draft.calls, final.calls
+    # Two-pass decodes alternate between the models, neither cache is dropped
+    builder.build("Hello.", "en", draft)
+    builder.build("Hello.", "en", final)
+    assert (draft.calls, final.calls) == calls